@@ -1,17 +1,19 @@
-from subprocess import Popen, PIPE, STDOUT
+import argparse
+import os
+from pathlib import Path
 
 from gunicorn.app.base import BaseApplication
 
 from src.settings import settings
-from src.main import app
+
+BASE_DIR = Path(__file__).parent
 
 
 class StandaloneApplication(BaseApplication):
     """Gunicorn-based application for running FastAPI with Uvicorn workers."""
 
-    def __init__(self, app, options=None):
+    def __init__(self, options=None):
         self.options = options or {}
-        self.application = app
         super().__init__()
 
     def load_config(self):
@@ -21,29 +23,91 @@ class StandaloneApplication(BaseApplication):
             self.cfg.set(key.lower(), value)
 
     def load(self):
-        return self.application
+        # Imported in the master with preload_app (shared copy-on-write by workers), otherwise in every worker
+        from src.main import app
 
+        return app
 
-if __name__ == "__main__":
-    # Initialize application options
+
+def get_workers_count() -> int:
+    """
+    Number of gunicorn workers, GUNICORN_WORKERS or the CPUs available to the process if it is 0 or less
+    """
+    if settings.gunicorn_workers > 0:
+        return settings.gunicorn_workers
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def worker_exit_hook(server, worker) -> None:
+    """
+    Gunicorn child_exit hook, runs in the master after a worker exits
+    """
+    from src.utils.metrics.prometheus_metrics import mark_worker_dead
+
+    mark_worker_dead(worker.pid)
+
+
+def setup_prometheus_multiprocess() -> None:
+    """
+    Point prometheus_client of the master and all workers to a clean multiprocess directory,
+    must run before the application and prometheus_client are imported
+    """
+    multiproc_dir = settings.prometheus_multiproc_dir
+    if not multiproc_dir:
+        return
+    # Metrics of a previous run would be added to the new ones
+    os.makedirs(multiproc_dir, exist_ok=True)
+    for file_name in os.listdir(multiproc_dir):
+        if file_name.endswith(".db"):
+            os.remove(os.path.join(multiproc_dir, file_name))
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = multiproc_dir
+
+
+def serve() -> None:
+    """
+    Run the application with gunicorn, migrations are not applied, see migrate
+    """
+    setup_prometheus_multiprocess()
     options = {
         "bind": f"{settings.fastapi_host}:{settings.fastapi_port}",
-        "workers": 1,
+        "workers": get_workers_count(),
         "accesslog": "-",
         "errorlog": "-",
         "worker_class": "uvicorn.workers.UvicornWorker",
         "reload": settings.local_development,
+        # Reload restarts workers from a fresh import, it does not work with a preloaded app
+        "preload_app": settings.gunicorn_preload_app and not settings.local_development,
+        "child_exit": worker_exit_hook,
     }
+    StandaloneApplication(options).run()
 
-    cmd = "alembic upgrade head || echo 'command failed' && true"
-    p = Popen(cmd, shell=True, stdin=PIPE, stdout=PIPE, stderr=STDOUT, close_fds=True)
-    output, _ = p.communicate()
 
-    if p.returncode == 0:
-        print("upgrade head success")
-    else:
-        print("upgrade head failed")
-        print("Output:", output.decode())
+def migrate() -> None:
+    """
+    Apply all migrations once and exit, run it before starting or scaling the application
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    alembic_config = Config(str(BASE_DIR / "alembic.ini"))
+    # script_location in alembic.ini is relative, resolve it against the project instead of the cwd
+    alembic_config.set_main_option("script_location", str(BASE_DIR / "migrations"))
+    command.upgrade(alembic_config, "head")
 
-    # Run the application
-    StandaloneApplication(app, options).run()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CheckBox API launcher")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=["serve", "migrate"],
+        default="serve",
+        help="serve: run the application (default), migrate: apply migrations and exit",
+    )
+    args = parser.parse_args()
+    if args.command == "migrate":
+        migrate()
+    else:
+        serve()
@@ -5,17 +5,43 @@ from fastapi import HTTPException
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import create_async_engine, async_scoped_session, async_sessionmaker
 
+from src.database.pool_metrics import TimedAsyncAdaptedQueuePool, instrument_pool
+from src.database.query_stats import instrument_engine
 from src.settings import settings
 from src.utils.logging.set_logging import set_logger
 
 logger = set_logger()
 
-engine = create_async_engine(settings.get_db_url(), future=True, echo=True)
+engine = create_async_engine(
+    settings.get_db_url(),
+    future=True,
+    echo=settings.db_echo,
+    poolclass=TimedAsyncAdaptedQueuePool,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_pre_ping=settings.db_pool_pre_ping,
+    pool_recycle=settings.db_pool_recycle,
+    # Prepared statements cached per connection by the asyncpg dialect, 0 disables the cache (pgbouncer)
+    connect_args={"prepared_statement_cache_size": settings.db_statement_cache_size},
+)
+# Per-request statement counts, reported by QueryStatsMiddleware
+instrument_engine(engine)
+# Pool usage gauges of the /metrics endpoint
+instrument_pool(engine)
 async_session_factory = async_sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
 
 async_scoped_session = async_scoped_session(async_session_factory, scopefunc=current_task)
 
 
+def get_session_factory() -> async_sessionmaker:
+    """
+    Get the database session factory.
+    Used by streaming responses, which outlive the session of get_db and open their own session.
+    """
+    return async_session_factory
+
+
 async def get_db() -> AsyncGenerator:
     """
     Get the database session
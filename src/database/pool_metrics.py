@@ -0,0 +1,84 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+from src.utils.metrics.prometheus_metrics import (
+    db_pool_capacity,
+    db_pool_checked_out,
+    db_pool_checkout_timeouts_total,
+    db_pool_checkout_wait_seconds,
+)
+
+
+class PoolCheckoutStats:
+    """
+    Per-worker statistics of connection checkouts from the engine pool.
+    The wait time of a checkout includes waiting for a free connection and opening a new one.
+    """
+
+    def __init__(self):
+        self.checkouts: int = 0
+        self.timeouts: int = 0
+        self.wait_seconds_total: float = 0.0
+        self.wait_seconds_max: float = 0.0
+
+    def observe(self, wait_seconds: float, timed_out: bool = False) -> None:
+        if timed_out:
+            self.timeouts += 1
+        else:
+            self.checkouts += 1
+        self.wait_seconds_total += wait_seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+
+    def reset(self) -> None:
+        self.__init__()
+
+
+pool_checkout_stats = PoolCheckoutStats()
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool which records checkout wait time into pool_checkout_stats and Prometheus metrics."""
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            wait_seconds = time.perf_counter() - start
+            pool_checkout_stats.observe(wait_seconds, timed_out=True)
+            db_pool_checkout_timeouts_total.inc()
+            db_pool_checkout_wait_seconds.observe(wait_seconds)
+            raise
+        wait_seconds = time.perf_counter() - start
+        pool_checkout_stats.observe(wait_seconds)
+        db_pool_checkout_wait_seconds.observe(wait_seconds)
+        return connection
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+    db_pool_checked_out.inc()
+
+
+def _on_checkin(dbapi_connection, connection_record) -> None:
+    db_pool_checked_out.dec()
+
+
+def instrument_pool(engine: AsyncEngine) -> None:
+    """Report capacity and checked out connections of the engine pool to Prometheus gauges."""
+    pool = engine.sync_engine.pool
+    if event.contains(pool, "checkout", _on_checkout):
+        return
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        capacity: int = pool.size() + max(pool._max_overflow, 0)
+
+        def on_connect(dbapi_connection, connection_record) -> None:
+            # Set by the process which opens connections, a preloading gunicorn master only imports the engine
+            db_pool_capacity.set(capacity)
+
+        event.listen(pool, "connect", on_connect)
+    event.listen(pool, "checkout", _on_checkout)
+    event.listen(pool, "checkin", _on_checkin)
@@ -0,0 +1,56 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class QueryStats:
+    """Number of SQL statements and their total execution time in a tracked block."""
+
+    def __init__(self):
+        self.count: int = 0
+        self.duration_seconds: float = 0.0
+
+
+# Stats of all tracked blocks the current task is in, a statement is added to each of them
+_active_query_stats: ContextVar[Tuple[QueryStats, ...]] = ContextVar("active_query_stats", default=())
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Count statements executed by the current task through instrumented engines inside the block.
+    Blocks can be nested, for example a test block around requests tracked by QueryStatsMiddleware.
+    """
+    query_stats = QueryStats()
+    token = _active_query_stats.set((*_active_query_stats.get(), query_stats))
+    try:
+        yield query_stats
+    finally:
+        _active_query_stats.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _active_query_stats.get():
+        # Statements of one connection run one after another, a failed one is overwritten by the next
+        conn.info["query_start_time"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    active_query_stats = _active_query_stats.get()
+    if not active_query_stats:
+        return
+    duration = time.perf_counter() - conn.info.pop("query_start_time", time.perf_counter())
+    for query_stats in active_query_stats:
+        query_stats.count += 1
+        query_stats.duration_seconds += duration
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Attach statement counting to the engine, statements outside of track_queries blocks are not timed."""
+    if not event.contains(engine.sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
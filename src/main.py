@@ -1,11 +1,20 @@
 from fastapi import FastAPI
 
+from starlette.exceptions import HTTPException as StarletteHTTPException
 from starlette.middleware.cors import CORSMiddleware
 
-from src.middleware.http_error_handling_middleware import ExceptionHandlerMiddleware
+from src.middleware.correlation_id_middleware import CorrelationIdMiddleware, REQUEST_ID_HEADER
+from src.middleware.http_error_handling_middleware import ExceptionHandlerMiddleware, http_exception_handler
+from src.middleware.prometheus_middleware import PrometheusMiddleware
+from src.middleware.query_stats_middleware import QueryStatsMiddleware, DB_QUERIES_HEADER, SERVER_TIMING_HEADER
 from src.services.auth.auth_router import oauth_router
+from src.services.auth.password_hashing import password_hasher
+from src.services.checks.check_idempotency import IDEMPOTENCY_KEY_HEADER, IDEMPOTENT_REPLAYED_HEADER
 from src.services.checks.check_router import check_router
-from src.utils.logging.set_logging import set_logger
+from src.services.metrics.metrics_router import metrics_router
+from src.utils.json.json_response import ORJSONModelResponse
+from src.utils.link.create_check_link import resolve_print_check_path
+from src.utils.logging.set_logging import set_logger, configure_logging
 from src.settings.checkbox_settings import settings
 
 from fastapi_cache import FastAPICache
@@ -22,22 +31,40 @@ app = FastAPI(
     description="CheckBox API",
     docs_url="/",
     swagger_ui_oauth2_redirect_url="/oauth2-redirect",
+    default_response_class=ORJSONModelResponse,
 )
 
 app.include_router(oauth_router)
 app.include_router(check_router)
+app.include_router(metrics_router)
 
 
 @app.on_event("startup")
 async def startup():
+    configure_logging()
     redis_url = settings.get_redis_url()
     redis = aioredis.from_url(redis_url)
     FastAPICache.init(RedisBackend(redis), prefix="fastapi-cache")
+    resolve_print_check_path(app)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    password_hasher.shutdown()
+    # Flush records still queued by enqueue=True sinks
+    await logger.complete()
 
 
 origins = ["*"]
 
+app.add_exception_handler(StarletteHTTPException, http_exception_handler)
 app.add_middleware(ExceptionHandlerMiddleware)
+if settings.prometheus_metrics_enabled:
+    # Outside of ExceptionHandlerMiddleware, so unhandled errors are recorded with the 500 they are answered with
+    app.add_middleware(PrometheusMiddleware)
+if settings.db_query_stats_headers:
+    app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(CorrelationIdMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -49,5 +76,8 @@ app.add_middleware(
         "Access-Control-Allow-Headers",
         "Access-Control-Allow-Origin",
         "Authorization",
+        REQUEST_ID_HEADER,
+        IDEMPOTENCY_KEY_HEADER,
     ],
+    expose_headers=[REQUEST_ID_HEADER, IDEMPOTENT_REPLAYED_HEADER, DB_QUERIES_HEADER, SERVER_TIMING_HEADER],
 )
@@ -0,0 +1,51 @@
+import re
+from uuid import uuid4
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Receive, Scope, Send, Message
+
+from src.utils.logging.set_logging import set_logger
+
+logger = set_logger()
+
+REQUEST_ID_HEADER = "X-Request-ID"
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+
+class CorrelationIdMiddleware:
+    """
+    Pure ASGI middleware which binds a correlation id to all log records of the request.
+    The id is taken from the X-Request-ID request header or generated, and returned in the response header.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = self.get_request_id(scope)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_id
+            await send(message)
+
+        with logger.contextualize(request_id=request_id):
+            await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def get_request_id(scope: Scope) -> str:
+        """
+        Get request id from the request header, a new one is generated if it is missing or malformed
+        :param scope: ASGI scope
+        :return: Request id
+        """
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+                if REQUEST_ID_PATTERN.match(request_id):
+                    return request_id
+                break
+        return uuid4().hex
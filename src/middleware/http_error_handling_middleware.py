@@ -1,6 +1,9 @@
-from fastapi import Request, HTTPException
+from fastapi import Request
+from fastapi.exception_handlers import http_exception_handler as default_http_exception_handler
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send, Message
 
 from src.services.auth.schemas.user_auth import HTTPExceptionModel
 from src.utils.logging.set_logging import set_logger
@@ -8,21 +11,49 @@ from src.utils.logging.set_logging import set_logger
 logger = set_logger()
 
 
-class ExceptionHandlerMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+async def http_exception_handler(request: Request, http_exception: StarletteHTTPException) -> Response:
+    """
+    Render HTTPException with {"error": ..., "message": ...} detail as HTTPExceptionModel.
+    Other details, for example "Not authenticated" of OAuth2PasswordBearer, are rendered by the FastAPI handler.
+    """
+    detail = http_exception.detail
+    if not isinstance(detail, dict) or "error" not in detail or "message" not in detail:
+        return await default_http_exception_handler(request, http_exception)
+    context = HTTPExceptionModel(error=detail["error"], message=detail["message"]).model_dump()
+    return JSONResponse(status_code=http_exception.status_code, content=context, headers=http_exception.headers)
+
+
+class ExceptionHandlerMiddleware:
+    """
+    Pure ASGI middleware which turns unhandled exceptions into a 500 JSON response.
+    Unlike BaseHTTPMiddleware it does not run the endpoint in a separate task and does not
+    re-stream the response body, so streaming responses pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
         try:
-            return await call_next(request)
-        except HTTPException as http_exception:
-            error = http_exception.__dict__.get("detail").get("error")
-            message = http_exception.__dict__.get("detail").get("message")
-            context = HTTPExceptionModel(error=error, message=message).dict()
-            return JSONResponse(
-                status_code=http_exception.status_code,
-                content=context,
-            )
-        except Exception as e:
-            # logger.exception(e)
-            return JSONResponse(
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            if response_started:
+                # Headers are already sent, the error can not be reported as a response anymore
+                raise
+            logger.exception(f"Unhandled error on {scope['method']} {scope['path']}")
+            response = JSONResponse(
                 status_code=500,
                 content={"error": "Internal Server Error", "message": "An unexpected error occurred."},
             )
+            await response(scope, receive, send)
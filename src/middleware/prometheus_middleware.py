@@ -0,0 +1,51 @@
+import time
+
+from starlette.types import ASGIApp, Receive, Scope, Send, Message
+
+from src.utils.metrics.prometheus_metrics import http_request_duration_seconds, http_requests_in_progress
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+def get_route_name(scope: Scope) -> str:
+    """
+    Name of the endpoint function which served the request, set by the router after routing.
+    Paths are not used as labels, a path with a check id or an unknown path would create a series per request.
+    """
+    endpoint = scope.get("endpoint")
+    return getattr(endpoint, "__name__", UNMATCHED_ROUTE)
+
+
+class PrometheusMiddleware:
+    """
+    Pure ASGI middleware which records latency of http requests per endpoint and the requests being served.
+    The latency covers sending the whole response body, so streamed receipts are measured until the last chunk.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method: str = scope["method"]
+        status_code: int = 500
+        # The route is known only after routing, so the gauge is labeled by method only
+        in_progress = http_requests_in_progress.labels(method=method)
+        in_progress.inc()
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            http_request_duration_seconds.labels(
+                method=method, route=get_route_name(scope), status=str(status_code)
+            ).observe(time.perf_counter() - start)
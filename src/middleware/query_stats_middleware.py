@@ -0,0 +1,36 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Receive, Scope, Send, Message
+
+from src.database.query_stats import track_queries
+
+DB_QUERIES_HEADER = "X-DB-Queries"
+SERVER_TIMING_HEADER = "Server-Timing"
+
+
+class QueryStatsMiddleware:
+    """
+    Pure ASGI middleware which reports SQL statements of the request in the X-DB-Queries and Server-Timing
+    response headers. Statements run after the response has started, for example by background tasks
+    or streaming responses, are not included.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with track_queries() as query_stats:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers[DB_QUERIES_HEADER] = str(query_stats.count)
+                    headers.append(
+                        SERVER_TIMING_HEADER,
+                        f'db;dur={query_stats.duration_seconds * 1000:.2f};desc="{query_stats.count} queries"',
+                    )
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
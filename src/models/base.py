@@ -4,7 +4,7 @@ from sqlalchemy.ext.declarative import as_declarative, declared_attr
 from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase
 from src.utils.logging.set_logging import set_logger
 
-logger = set_logger("WARNING")
+logger = set_logger()
 
 
 class Base(DeclarativeBase):
@@ -1,9 +1,9 @@
-from datetime import datetime
+from datetime import datetime, date
 from decimal import Decimal
 from typing import Literal, List, Optional
 from uuid import UUID
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index, UniqueConstraint
 
 from .base import Base
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -12,9 +12,13 @@ import src.services.checks.schemas.checks_schemas as schemas
 
 class Check(Base):
     __tablename__ = "checks"
+    __table_args__ = (
+        # User checks listing: filter by essence, order and keyset by (check_datetime, id)
+        Index("ix_checks_user_essence_datetime_id", "check_user_essence", "check_datetime", "id"),
+    )
 
     check_datetime: Mapped[datetime] = mapped_column(nullable=False, default=datetime.utcnow)
-    check_identifier: Mapped[UUID] = mapped_column(nullable=False)
+    check_identifier: Mapped[UUID] = mapped_column(nullable=False, unique=True, index=True)
     check_total_price: Mapped[Decimal] = mapped_column(nullable=False, default=0.00)
     check_purchasing_method: Mapped[Literal["cashless", "cash"]] = mapped_column(nullable=False)
     check_user_essence: Mapped[int] = mapped_column(ForeignKey("user_essence.id", ondelete="RESTRICT"))
@@ -37,6 +41,29 @@ class Check(Base):
         return f"<Check check_identifier={self.check_identifier}>"
 
 
+class UserDailySales(Base):
+    """
+    Per user daily sales aggregate, one row per (user essence, UTC day, purchasing method).
+    Maintained incrementally when checks are created, so reports do not scan the checks table.
+    """
+
+    __tablename__ = "user_daily_sales"
+    __table_args__ = (
+        # Upsert conflict target and range scan of user stats by day
+        UniqueConstraint("sales_user_essence", "sales_day", "sales_purchasing_method", name="uq_user_daily_sales_key"),
+    )
+
+    sales_user_essence: Mapped[int] = mapped_column(ForeignKey("user_essence.id", ondelete="CASCADE"))
+    sales_day: Mapped[date] = mapped_column(nullable=False)
+    sales_purchasing_method: Mapped[Literal["cashless", "cash"]] = mapped_column(nullable=False)
+    sales_checks_count: Mapped[int] = mapped_column(nullable=False, default=0)
+    sales_total_sum: Mapped[Decimal] = mapped_column(nullable=False, default=0.00)
+    sales_rest_sum: Mapped[Decimal] = mapped_column(nullable=False, default=0.00)
+
+    def __repr__(self) -> str:
+        return f"<UserDailySales sales_user_essence={self.sales_user_essence} sales_day={self.sales_day}>"
+
+
 class SoldProduct(Base):
     __tablename__ = "sold_products"
 
@@ -52,6 +79,7 @@ class SoldProduct(Base):
     sold_stock_id: Mapped[int] = mapped_column(ForeignKey("stock.id", ondelete="SET NULL"))
     sold_check_id: Mapped[int] = mapped_column(
         ForeignKey("checks.id", ondelete="RESTRICT"),
+        index=True,
     )
 
     def to_model_schema(self) -> schemas.ReadSoldProduct:
@@ -66,6 +94,7 @@ class SoldProduct(Base):
             sold_datetime=self.sold_datetime,
             sold_total_price=self.sold_total_price,
             sold_product_id=self.sold_product_id,
+            sold_stock_id=self.sold_stock_id,
             sold_check_id=self.sold_check_id,
         )
 
@@ -77,7 +106,7 @@ class Stock(Base):
     __tablename__ = "stock"
 
     product: Mapped["Product"] = relationship("Product", back_populates="product_stock")
-    product_id: Mapped[int] = mapped_column(ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True)
     quantity_in_stock: Mapped[float] = mapped_column(nullable=False)
     stock_last_update: Mapped[datetime] = mapped_column(nullable=False, default=datetime.utcnow)
     stock_product_identifier: Mapped[UUID] = mapped_column(nullable=False)
@@ -100,7 +129,7 @@ class Stock(Base):
 class ProductPrice(Base):
     __tablename__ = "product_price"
 
-    product_id: Mapped[int] = mapped_column(ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True)
     price: Mapped[Decimal] = mapped_column(nullable=False)
     discount: Mapped[Decimal] = mapped_column(nullable=False, default=0.00)
     discount_update: Mapped[datetime] = mapped_column(nullable=False, default=datetime.utcnow)
@@ -152,6 +181,7 @@ class UserEssence(Base):
     __tablename__ = "user_essence"
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"),
+        index=True,
     )
     user_checks: Mapped[Optional[List["Check"]]] = relationship()
 
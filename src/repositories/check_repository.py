@@ -1,11 +1,14 @@
-from typing import List, Any
+from datetime import datetime
+from typing import List, Any, Tuple, AsyncIterator
 from uuid import UUID
 
-from sqlalchemy import select, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, func, insert, tuple_, exists, Select, Row
+from sqlalchemy.orm import selectinload, noload
 
 from .sql_alchemy_repository import SQLAlchemyRepository
-from src.models.check_model import Check
+from src.models.check_model import Check, UserEssence, SoldProduct
+from src.models.user_model import User
+from ..services.checks.schemas.check_get_schema import FilteringParams
 
 
 class CheckRepository(SQLAlchemyRepository):
@@ -13,7 +16,143 @@ class CheckRepository(SQLAlchemyRepository):
 
     model = Check
 
+    async def create(self, data: dict) -> Check:
+        """Create check. Sold products of a new check are always empty, so they are not loaded."""
+        stmt = insert(self.model).values(**data).returning(self.model).options(noload(self.model.check_products))
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def create_many(self, data: List[dict]) -> List[Check]:
+        """Create several checks with multi-row statements, sold products of the new checks are not loaded."""
+        stmt = (
+            insert(self.model)
+            .returning(self.model, sort_by_parameter_order=True)
+            .options(noload(self.model.check_products))
+        )
+        result = await self.session.scalars(stmt, data)
+        return list(result.all())
+
     async def get_check_by_identifier(self, identifier: UUID) -> Check:
         """Get check by identifier."""
         stmt = select(self.model).where(self.model.check_identifier == identifier)
         return (await self.session.execute(stmt)).scalar_one_or_none()
+
+    async def check_exists(self, identifier: UUID) -> bool:
+        """Check whether the check with identifier exists, without loading it."""
+        stmt = select(exists().where(self.model.check_identifier == identifier))
+        return bool(await self.session.scalar(stmt))
+
+    async def get_check_receipt_rows(self, identifier: UUID) -> List[Row]:
+        """
+        Get everything needed to print the check in one statement: one row per sold product with
+        the check totals and the owner name. Only the printed columns are selected.
+        """
+        stmt = (
+            select(
+                self.model.check_datetime,
+                self.model.check_total_price,
+                self.model.check_purchasing_method,
+                self.model.check_rest,
+                User.first_name,
+                User.last_name,
+                SoldProduct.sold_product_title,
+                SoldProduct.sold_price,
+                SoldProduct.sold_quantity,
+                SoldProduct.sold_total_price,
+            )
+            .join(UserEssence, self.model.check_user_essence == UserEssence.id)
+            .join(User, UserEssence.user_id == User.id)
+            .outerjoin(SoldProduct, SoldProduct.sold_check_id == self.model.id)
+            .where(self.model.check_identifier == identifier)
+            .order_by(SoldProduct.id)
+        )
+        return list((await self.session.execute(stmt)).all())
+
+    async def get_user_checks(
+        self,
+        user_id: int,
+        filter_params: FilteringParams = FilteringParams(),
+        sorting_rule: str = "asc",
+        limit: int | None = None,
+        offset: int | None = None,
+        after: Tuple[datetime, int] | None = None,
+    ) -> List[Check]:
+        """
+        Get one page of user checks, sold products are loaded for the page checks only.
+        With `after` (check datetime and id of the last seen check) the page starts right after
+        that check in the sorting order, which is an index range scan instead of OFFSET.
+        """
+        stmt = self._filter_user_checks(select(self.model), user_id, filter_params)
+        position = tuple_(self.model.check_datetime, self.model.id)
+        if sorting_rule == "asc":
+            if after:
+                stmt = stmt.where(position > tuple_(*after))
+            stmt = stmt.order_by(self.model.check_datetime.asc(), self.model.id.asc())
+        elif sorting_rule == "desc":
+            if after:
+                stmt = stmt.where(position < tuple_(*after))
+            stmt = stmt.order_by(self.model.check_datetime.desc(), self.model.id.desc())
+        stmt = stmt.limit(limit).offset(offset)
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def stream_user_checks_with_products(
+        self,
+        user_id: int,
+        filter_params: FilteringParams = FilteringParams(),
+        sorting_rule: str = "asc",
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Row]:
+        """
+        Stream user checks joined with their sold products through a server-side cursor.
+        Rows of one check are consecutive, a check without sold products has one row with empty product columns.
+        """
+        stmt = select(
+            self.model.check_identifier,
+            self.model.check_datetime,
+            self.model.check_purchasing_method,
+            self.model.check_total_price,
+            self.model.check_rest,
+            SoldProduct.sold_product_id,
+            SoldProduct.sold_product_title,
+            SoldProduct.sold_price,
+            SoldProduct.sold_discount,
+            SoldProduct.sold_quantity,
+            SoldProduct.sold_total_price,
+            SoldProduct.sold_units,
+        ).outerjoin(SoldProduct, SoldProduct.sold_check_id == self.model.id)
+        stmt = self._filter_user_checks(stmt, user_id, filter_params)
+        if sorting_rule == "asc":
+            stmt = stmt.order_by(self.model.check_datetime.asc(), self.model.id.asc(), SoldProduct.id.asc())
+        elif sorting_rule == "desc":
+            stmt = stmt.order_by(self.model.check_datetime.desc(), self.model.id.desc(), SoldProduct.id.asc())
+        result = await self.session.stream(stmt.execution_options(yield_per=batch_size))
+        async for row in result:
+            yield row
+
+    async def count_user_checks(self, user_id: int, filter_params: FilteringParams = FilteringParams()) -> int:
+        """Count user checks matching the filters."""
+        stmt = self._filter_user_checks(select(func.count(self.model.id)), user_id, filter_params)
+        return (await self.session.execute(stmt)).scalar_one()
+
+    def _filter_user_checks(self, stmt: Select, user_id: int, filter_params: FilteringParams) -> Select:
+        """Apply user and filtering params conditions to the checks query."""
+        stmt = stmt.join(UserEssence, self.model.check_user_essence == UserEssence.id).where(
+            UserEssence.user_id == user_id
+        )
+        if filter_params.start_date:
+            stmt = stmt.filter(self.model.check_datetime >= filter_params.start_date)
+        if filter_params.end_date:
+            stmt = stmt.filter(self.model.check_datetime <= filter_params.end_date)
+        if filter_params.total_price and filter_params.total_price_filtering_rule:
+            if filter_params.total_price_filtering_rule == "gt":
+                stmt = stmt.filter(self.model.check_total_price > filter_params.total_price)
+            elif filter_params.total_price_filtering_rule == "ge":
+                stmt = stmt.filter(self.model.check_total_price >= filter_params.total_price)
+            elif filter_params.total_price_filtering_rule == "lt":
+                stmt = stmt.filter(self.model.check_total_price < filter_params.total_price)
+            elif filter_params.total_price_filtering_rule == "le":
+                stmt = stmt.filter(self.model.check_total_price <= filter_params.total_price)
+        if filter_params.purchase_type:
+            stmt = stmt.filter(self.model.check_purchasing_method == filter_params.purchase_type)
+        return stmt
@@ -17,6 +17,12 @@ class AbstractRepository(ABC):
             Parameters:
                 data (dict): A dictionary containing the data to be added.
 
+        create_many(data: List[dict]):
+            Asynchronously adds several new entries to the database with multi-row statements.
+            Returned entries keep the order of data.
+            Parameters:
+                data (List[dict]): A list of dictionaries containing the data to be added.
+
         update(unit_id: int, data: dict):
             Asynchronously updates an existing entry in the database.
             Parameters:
@@ -49,6 +55,10 @@ class AbstractRepository(ABC):
     async def create(self, data: dict):
         raise NotImplementedError
 
+    @abstractmethod
+    async def create_many(self, data: List[dict]):
+        raise NotImplementedError
+
     @abstractmethod
     async def update(self, unit_id: int, data: dict):
         raise NotImplementedError
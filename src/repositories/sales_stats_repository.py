@@ -0,0 +1,59 @@
+from datetime import date
+from typing import List
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from .sql_alchemy_repository import SQLAlchemyRepository
+from src.models.check_model import UserDailySales, UserEssence
+
+
+class SalesStatsRepository(SQLAlchemyRepository):
+    """UserDailySales repository class."""
+
+    model = UserDailySales
+
+    async def add_sales(self, data: List[dict]) -> None:
+        """
+        Add checks count and sums to the daily sales rows with one upsert, missing rows are created.
+        Keys must be unique within data. Rows are upserted in key order, so concurrent
+        check creation of one user waits on the row lock and can not deadlock.
+        :param data: List of dicts with sales_user_essence, sales_day, sales_purchasing_method,
+            sales_checks_count, sales_total_sum and sales_rest_sum
+        """
+        data = sorted(
+            data,
+            key=lambda row: (row["sales_user_essence"], row["sales_day"], row["sales_purchasing_method"]),
+        )
+        stmt = insert(self.model).values(data)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_user_daily_sales_key",
+            set_={
+                "sales_checks_count": self.model.sales_checks_count + stmt.excluded.sales_checks_count,
+                "sales_total_sum": self.model.sales_total_sum + stmt.excluded.sales_total_sum,
+                "sales_rest_sum": self.model.sales_rest_sum + stmt.excluded.sales_rest_sum,
+            },
+        )
+        await self.session.execute(stmt)
+
+    async def get_user_sales(
+        self,
+        user_id: int,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        purchase_type: str | None = None,
+    ) -> List[UserDailySales]:
+        """Get daily sales rows of the user in the day range, both ends included, ordered by day."""
+        stmt = (
+            select(self.model)
+            .join(UserEssence, self.model.sales_user_essence == UserEssence.id)
+            .where(UserEssence.user_id == user_id)
+        )
+        if start_date:
+            stmt = stmt.where(self.model.sales_day >= start_date)
+        if end_date:
+            stmt = stmt.where(self.model.sales_day <= end_date)
+        if purchase_type:
+            stmt = stmt.where(self.model.sales_purchasing_method == purchase_type)
+        stmt = stmt.order_by(self.model.sales_day.asc(), self.model.sales_purchasing_method.asc())
+        return list((await self.session.execute(stmt)).scalars().all())
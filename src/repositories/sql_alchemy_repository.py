@@ -17,6 +17,13 @@ class SQLAlchemyRepository(AbstractRepository):
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def create_many(self, data: List[dict]) -> List[model]:
+        # Executemany form: rendered as multi-row INSERTs in pages, so large batches stay under
+        # the bind parameter limit, and RETURNING rows keep the order of data
+        stmt = insert(self.model).returning(self.model, sort_by_parameter_order=True)
+        result = await self.session.scalars(stmt, data)
+        return list(result.all())
+
     async def update(self, unit_id: int, data: dict) -> model:
         stmt = update(self.model).values(**data).filter_by(id=unit_id).returning(self.model)
         result = await self.session.execute(stmt)
@@ -1,3 +1,9 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List
+
+from sqlalchemy import select, update, values, column, Integer, Float
+
 from .sql_alchemy_repository import SQLAlchemyRepository
 from src.models.check_model import Stock
 
@@ -6,3 +12,55 @@ class StockRepository(SQLAlchemyRepository):
     """User repository class."""
 
     model = Stock
+
+    async def lock_quantities(self, stock_ids: List[int]) -> Dict[int, float]:
+        """
+        Read and lock quantity in stock of several stock rows until the end of the transaction.
+        Rows are locked in id order, so concurrent lockers can not deadlock.
+        :param stock_ids: List of stock ids
+        :return: Quantity in stock, key is stock id
+        """
+        stmt = (
+            select(self.model.id, self.model.quantity_in_stock)
+            .where(self.model.id.in_(stock_ids))
+            .order_by(self.model.id)
+            .with_for_update()
+        )
+        return {row.id: row.quantity_in_stock for row in (await self.session.execute(stmt)).all()}
+
+    async def reserve_quantities(self, quantities: Dict[int, Decimal]) -> List[int]:
+        """
+        Decrease quantity in stock for several stock rows with one conditional set-based UPDATE.
+        A row is decreased only if it still holds enough units, so the sufficiency check and
+        the write are a single atomic statement and concurrent checks can not oversell.
+        Rows are locked in id order first, so concurrent checks with overlapping products
+        can not deadlock on the row locks taken by the join.
+        :param quantities: Quantity to subtract, key is stock id
+        :return: List of stock ids which have not enough units in stock
+        """
+        stock_values = values(column("id", Integer), column("quantity", Float), name="stock_values").data(
+            [(stock_id, float(quantity)) for stock_id, quantity in quantities.items()]
+        )
+        locked_stock = (
+            select(self.model.id)
+            .where(self.model.id.in_(list(quantities)))
+            .order_by(self.model.id)
+            .with_for_update()
+            .cte("locked_stock")
+        )
+        stmt = (
+            update(self.model)
+            .where(
+                self.model.id == locked_stock.c.id,
+                self.model.id == stock_values.c.id,
+                self.model.quantity_in_stock >= stock_values.c.quantity,
+            )
+            .values(
+                quantity_in_stock=self.model.quantity_in_stock - stock_values.c.quantity,
+                stock_last_update=datetime.utcnow(),
+            )
+            .returning(self.model.id)
+            .execution_options(synchronize_session=False)
+        )
+        reserved_ids = set((await self.session.execute(stmt)).scalars().all())
+        return [stock_id for stock_id in quantities if stock_id not in reserved_ids]
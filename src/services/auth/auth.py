@@ -5,16 +5,17 @@ from joserfc.errors import BadSignatureError
 from joserfc.jwt import Token
 from pydantic import ValidationError
 
-from src.database.database_connect import get_db
 from src.models.user_model import User
 from src.repositories.user_repository import UsersRepository
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordBearer
 from datetime import datetime
 
+from src.services.auth.token_claims_cache import token_claims_cache
 from src.services.auth.auth_utils import decode_access_token, get_password_hash, verify_password, create_access_token
 from src.services.auth.schemas.user_auth import UserRead, JWTToken, TokenPayload, UserCreate, HTTPExceptionModel
 
+from src.settings.checkbox_settings import settings
 from src.utils.logging.set_logging import set_logger
 from src.services.auth.auth_http_exceptions import (
     user_not_found,
@@ -41,16 +42,18 @@ async def get_user_by_email(email: str, db_session: AsyncSession) -> UserRead:
     return await user_repo.get_user_by_email(email)
 
 
-async def get_current_user(
-    token: Annotated[str, Depends(oauth2_bearer)], db_session: Annotated[AsyncSession, Depends(get_db)]
-) -> Union[TokenPayload, HTTPExceptionModel]:
+async def get_current_user(token: Annotated[str, Depends(oauth2_bearer)]) -> Union[TokenPayload, HTTPExceptionModel]:
     """
-    Get current user by token
+    Get current user by token. The token is verified without db access,
+    verified claims are cached per worker until the token expires.
     :param token: Bearer token
-    :param db_session: db async session`
     :return: User instance if token is valid otherwise HTTPException instance
     :raises: HTTPException
     """
+    if settings.token_cache_enabled:
+        cached_payload: TokenPayload | None = token_claims_cache.get(token)
+        if cached_payload is not None:
+            return cached_payload
     try:
         token_decode: Token = decode_access_token(token)
         token_claims: Dict[str, Any] = token_decode.claims
@@ -59,10 +62,12 @@ async def get_current_user(
             raise token_exception()
         if not payload.sub or not payload.user_id:
             raise token_exception()
-        return payload
     except (BadSignatureError, ValidationError) as ex:
         logger.error(ex)
         raise token_exception()
+    if settings.token_cache_enabled:
+        token_claims_cache.put(token, payload)
+    return payload
 
 
 async def authenticate_user(email: str, password: str, db_session: AsyncSession) -> Union[JWTToken, HTTPExceptionModel]:
@@ -77,7 +82,7 @@ async def authenticate_user(email: str, password: str, db_session: AsyncSession)
     user: UserRead = await get_user_by_email(email, db_session)
     if not user:
         raise user_not_found()
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password(password, user.hashed_password):
         raise password_incorrect()
     if not user.is_active:
         raise user_is_not_active()
@@ -97,7 +102,7 @@ async def registration_user(user: UserCreate, db_session: AsyncSession) -> Union
     if exist_user:
         raise user_exists()
     create_user_dict: dict = user.dict()
-    create_user_dict["hashed_password"] = get_password_hash(create_user_dict.pop("password"))
+    create_user_dict["hashed_password"] = await get_password_hash(create_user_dict.pop("password"))
     create_user_dict["is_active"] = True
     create_user_dict["is_superuser"] = False
     create_user_dict["registration_datetime"] = datetime.utcnow()
@@ -50,3 +50,14 @@ def user_is_not_active() -> HTTPException:
         },
         status_code=status.HTTP_401_UNAUTHORIZED,
     )
+
+
+def password_hashing_busy() -> HTTPException:
+    return HTTPException(
+        detail={
+            "error": "Service is busy",
+            "message": "Too many authentication requests, please try again later",
+        },
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "1"},
+    )
@@ -6,37 +6,36 @@ from joserfc.jwt import Token
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.repositories.user_repository import UsersRepository
+from src.services.auth.password_hashing import password_hasher
 from src.services.auth.schemas.user_auth import JWTToken
 from src.settings.checkbox_settings import settings
 
-from passlib.context import CryptContext
-
-bcrypt_context = CryptContext(schemes=["sha256_crypt"], deprecated="auto")
-
 SECRET_KEY: str = settings.jwt_secret_signature.get_secret_value()
 ALGORITHM: str = settings.algorithm
 EXPIRE_TIME: int = settings.jwt_expire_time
+# Imported once, key import is not free and the secret does not change while the worker runs
+SECRET_JWK: OctKey = OctKey.import_key(SECRET_KEY)
 
 
-def get_password_hash(password: str) -> str:
+async def get_password_hash(password: str) -> str:
     """
-    Hash password
+    Hash password in the password hashing pool
     """
-    return bcrypt_context.hash(password)
+    return await password_hasher.hash(password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
-    Verify password
+    Verify password in the password hashing pool
     :param plain_password: User input password
     :param hashed_password: Hashed password from db
     :return: True if password is correct otherwise False
     """
-    return bcrypt_context.verify(plain_password, hashed_password)
+    return await password_hasher.verify(plain_password, hashed_password)
 
 
 def decode_access_token(token: str) -> Token:
-    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    return jwt.decode(token, SECRET_JWK, algorithms=[ALGORITHM])
 
 
 async def create_access_token(
@@ -52,13 +51,12 @@ async def create_access_token(
     """
     header = {"alg": ALGORITHM}
     claims = {"sub": email, "user_id": user_id}
-    key = OctKey.import_key(SECRET_KEY)
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(seconds=EXPIRE_TIME)
     claims.update({"exp": expire})
-    token = jwt.encode(header, claims, key)
+    token = jwt.encode(header, claims, SECRET_JWK)
     await update_last_login(user_id, db_session)
     return JWTToken(access_token=token, token_type="bearer", expires_in=EXPIRE_TIME)
 
@@ -0,0 +1,95 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Literal, Optional
+
+from passlib.context import CryptContext
+
+from src.services.auth.auth_http_exceptions import password_hashing_busy
+from src.settings.checkbox_settings import settings
+
+bcrypt_context = CryptContext(schemes=["sha256_crypt"], deprecated="auto")
+
+
+def hash_password(password: str) -> str:
+    """
+    Hash password, CPU bound, runs in the executor of PasswordHasher
+    """
+    return bcrypt_context.hash(password)
+
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify password, CPU bound, runs in the executor of PasswordHasher
+    """
+    return bcrypt_context.verify(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Runs password hashing and verification in a bounded executor, out of the event loop.
+
+    At most `workers` jobs run at once and at most `queue_size` more wait for a worker.
+    Jobs above that are rejected with password_hashing_busy (HTTPException, 503),
+    so a login storm can not pile up unbounded work on the worker.
+    """
+
+    def __init__(self, executor_type: Literal["process", "thread"], workers: int, queue_size: int):
+        self.executor_type = executor_type
+        self.workers = workers
+        self.queue_size = queue_size
+        self._executor: Optional[Executor] = None
+        self._pending: int = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                # Spawned workers do not inherit the event loop, db pool and redis sockets of the app
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hashing")
+        return self._executor
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self._pending >= self.workers + self.queue_size:
+            raise password_hashing_busy()
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """
+        Hash password
+        :param password: Plain password
+        :return: Hashed password
+        """
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        Verify password
+        :param plain_password: User input password
+        :param hashed_password: Hashed password from db
+        :return: True if password is correct otherwise False
+        """
+        return await self._run(check_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    executor_type=settings.password_hash_executor,
+    workers=settings.password_hash_workers,
+    queue_size=settings.password_hash_queue_size,
+)
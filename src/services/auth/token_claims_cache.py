@@ -0,0 +1,70 @@
+import hashlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+from src.services.auth.schemas.user_auth import TokenPayload
+from src.settings.checkbox_settings import settings
+from src.utils.metrics.prometheus_metrics import cache_requests_total
+
+TOKEN_CLAIMS_CACHE = "token_claims"
+
+
+class TokenClaimsCache:
+    """
+    Per-worker LRU cache of verified token claims, key is sha256 of the token.
+
+    An entry lives until the token expires, so a cached token is never accepted after its exp.
+    Only tokens with a valid signature and claims are put into the cache.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._claims: OrderedDict[bytes, TokenPayload] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._claims)
+
+    @staticmethod
+    def token_key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[TokenPayload]:
+        """
+        Get verified claims of the token.
+
+        :param token: Bearer token.
+        :return: TokenPayload or None if the token is not cached or is expired.
+        """
+        key = self.token_key(token)
+        payload = self._claims.get(key)
+        if payload is None:
+            cache_requests_total.labels(cache=TOKEN_CLAIMS_CACHE, result="miss").inc()
+            return None
+        if payload.exp < datetime.utcnow().timestamp():
+            del self._claims[key]
+            cache_requests_total.labels(cache=TOKEN_CLAIMS_CACHE, result="miss").inc()
+            return None
+        self._claims.move_to_end(key)
+        cache_requests_total.labels(cache=TOKEN_CLAIMS_CACHE, result="hit").inc()
+        return payload
+
+    def put(self, token: str, payload: TokenPayload) -> None:
+        """
+        Cache verified claims of the token, evicting the least recently used ones above max_size.
+
+        :param token: Bearer token.
+        :param payload: Verified token claims.
+        :return: None
+        """
+        key = self.token_key(token)
+        self._claims[key] = payload
+        self._claims.move_to_end(key)
+        while len(self._claims) > self.max_size:
+            self._claims.popitem(last=False)
+
+    def clear(self) -> None:
+        self._claims.clear()
+
+
+token_claims_cache = TokenClaimsCache(max_size=settings.token_cache_max_size)
@@ -1,13 +1,18 @@
 from datetime import datetime
 from decimal import Decimal
-from pprint import pprint
 from typing import List, Tuple, Dict
 from uuid import uuid4
 
+from fastapi import BackgroundTasks, HTTPException
+from sqlalchemy import Row
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .check_http_exception import some_products_not_found, product_conflicts
+from .check_print import build_receipt_data, warm_receipt_cache
+from .product_catalog_cache import product_catalog_cache
+from .receipt_cache import get_receipt_cache_backend
+from .sales_stats import add_checks_to_sales_stats
 from .schemas.check_create_query_schema import (
     QueryCheck,
     QueryProduct,
@@ -21,33 +26,36 @@ from .schemas.checks_schemas import (
     SoldProductCreate,
     ReadCheck,
     ReadSoldProduct,
-    ReadProduct,
     ReadProductPrice,
-    ReadStockWithoutSales,
+    CatalogProduct,
     ReadUserEssence,
     UserEssenceCreate,
-    UpdateCheck,
-    StockUpdate,
 )
+from .schemas.print_schema import ReceiptData
 from src.models.check_model import Check, SoldProduct, Product, UserEssence
 from src.repositories.product_repository import ProductRepository
 from src.utils.logging.set_logging import set_logger
+from src.utils.metrics.prometheus_metrics import stock_reservation_conflicts_total
 from src.services.auth.schemas.user_auth import TokenPayload
 from src.repositories.essence_repository import UserEssenceRepository
 from src.repositories.check_repository import CheckRepository
 from src.repositories.sold_product_repository import SoldProductRepository
 from src.repositories.stock_repository import StockRepository
-from src.utils.convert.number_to_decimal import number_to_decimal
 from starlette.requests import Request
 from pydantic_core import Url
 
 from src.utils.link.create_check_link import get_check_link
+from src.settings.checkbox_settings import settings
 
 logger = set_logger()
 
 
 async def create_check(
-    request: Request, check_create_data: QueryCheck, db_session: AsyncSession, user: TokenPayload
+    request: Request,
+    check_create_data: QueryCheck,
+    db_session: AsyncSession,
+    user: TokenPayload,
+    background_tasks: BackgroundTasks | None = None,
 ) -> AnswerCheck:
     """
     Start process create new check
@@ -55,10 +63,11 @@ async def create_check(
     :param check_create_data: Input data for check creation
     :param db_session: AsyncSession db
     :param user: User token payload
+    :param background_tasks: Background tasks of the response, used to warm the receipt cache
     :return: AnswerCheck instance
     """
     try:
-        return await create_check_start(request, check_create_data, db_session, user)
+        return await create_check_start(request, check_create_data, db_session, user, background_tasks)
     except SQLAlchemyError as e:
         logger.exception("Database error occurred while creating check")
         raise e
@@ -68,7 +77,11 @@ async def create_check(
 
 
 async def create_check_start(
-    request: Request, check_create_data: QueryCheck, db_session: AsyncSession, user: TokenPayload
+    request: Request,
+    check_create_data: QueryCheck,
+    db_session: AsyncSession,
+    user: TokenPayload,
+    background_tasks: BackgroundTasks | None = None,
 ) -> AnswerCheck:
     # check_create_data = await float_to_decimal(check_create_data)
     """
@@ -77,34 +90,40 @@ async def create_check_start(
     :param check_create_data: Input data for check creation
     :param db_session:  AsyncSession db
     :param user: User token payload
+    :param background_tasks: Background tasks of the response, used to warm the receipt cache
     :return: AnswerCheck instance
     """
     product_names: List[str] = [product.name for product in check_create_data.products]
-    product_repo: ProductRepository = ProductRepository(session=db_session)
-
-    products_in_db: List[Product] = await product_repo.get_all_by_names(product_names)
-
-    found_product_names = {product.product_title for product in products_in_db}
-    not_found_products = set(product_names) - set(found_product_names)
-    if not_found_products:
-        error_msg = f"Some products not found: {', '.join(not_found_products)}"
-        raise some_products_not_found(error_msg)
-    products_dict: Dict[str, ReadProduct] = {
-        product.product_title: fetch_and_create_read_product(product) for product in products_in_db
-    }
-    await validate_quantity_and_price(check_create_data, products_dict)
+    products_dict: Dict[str, CatalogProduct] = await get_catalog_products(product_names, db_session)
+    await validate_check_products(check_create_data, products_dict)
+    await reserve_stock(products_dict, check_create_data.products, db_session)
     user_essence: ReadUserEssence = await check_user_essence(db_session, user)
-    new_check: ReadCheck = await check_entity_create(check_create_data, user_essence, db_session)
-    sold_products, updated_products_dict = await create_sold_product_entity(
+    check_total_price: Decimal = calculate_check_total(check_create_data.products)
+    new_check: ReadCheck = await check_entity_create(check_create_data, user_essence, check_total_price, db_session)
+    await add_checks_to_sales_stats([new_check], db_session)
+    sold_products: List[SoldProductCreate] = await create_sold_product_entity(
         products_dict, check_create_data.products, new_check
     )
-    updated_check: ReadCheck = await check_update(new_check, sold_products, db_session, check_create_data)
-    await update_stock(updated_products_dict, db_session)
+    created_sold_products: List[ReadSoldProduct] = await sold_products_create(sold_products, db_session)
+    new_check.check_products = created_sold_products
+    if background_tasks is not None and user_essence.owner_name and get_receipt_cache_backend() is not None:
+        receipt_data: ReceiptData = build_receipt_data(user_essence.owner_name, new_check)
+        # Runs after the response is sent, so after get_db has committed the check
+        background_tasks.add_task(warm_receipt_cache, new_check.check_identifier, receipt_data)
 
+    return await build_answer_check(request, new_check, check_create_data.payment.amount)
+
+
+async def build_answer_check(request: Request, new_check: ReadCheck, payment_amount: Decimal) -> AnswerCheck:
+    """
+    Build the answer for a created check
+    :param request: Request
+    :param new_check: Created check entity with created sold products
+    :param payment_amount: Payment amount from the input data
+    :return: AnswerCheck instance
+    """
     link: Url = await get_check_link(new_check.check_identifier, request)
-    answer_payment: AnswerPayment = AnswerPayment(
-        type=updated_check.check_purchasing_method, amount=check_create_data.payment.amount
-    )
+    answer_payment: AnswerPayment = AnswerPayment(type=new_check.check_purchasing_method, amount=payment_amount)
     answer_products: List[AnswerProduct] = [
         AnswerProduct(
             name=product.sold_product_title,
@@ -112,66 +131,139 @@ async def create_check_start(
             quantity=product.sold_quantity,
             total=product.sold_price * product.sold_quantity,
         )
-        for product in updated_check.check_products
+        for product in new_check.check_products
     ]
     answer_check: AnswerCheck = AnswerCheck(
-        check_id=updated_check.check_identifier,
+        check_id=new_check.check_identifier,
         products=answer_products,
         payment=answer_payment,
-        total=updated_check.check_total_price,
-        rest=updated_check.check_rest,
-        created_at=updated_check.check_datetime.isoformat(),
+        total=new_check.check_total_price,
+        rest=new_check.check_rest,
+        created_at=new_check.check_datetime.isoformat(),
         url=link,
     )
 
     return answer_check
 
 
-async def update_stock(
-    updated_products_dict: Dict[str, ReadProduct],
+async def get_catalog_products(product_names: List[str], db_session: AsyncSession) -> Dict[str, CatalogProduct]:
+    """
+    Get products by names from the product catalog cache, products missing in the cache are loaded from db
+    :param product_names: List of product names
+    :param db_session: AsyncSession db
+    :return: Found products dict, key is product name
+    """
+    use_cache: bool = settings.product_cache_enabled and await product_catalog_cache.sync_version()
+    if use_cache:
+        products_dict, missing_names = product_catalog_cache.get_many(product_names)
+    else:
+        products_dict, missing_names = {}, product_names
+    if missing_names:
+        product_repo: ProductRepository = ProductRepository(session=db_session)
+        products_in_db: List[Product] = await product_repo.get_all_by_names(missing_names)
+        loaded_products: List[CatalogProduct] = [
+            fetch_and_create_catalog_product(product) for product in products_in_db
+        ]
+        if use_cache:
+            product_catalog_cache.put_many(loaded_products)
+        products_dict.update({product.product_title: product for product in loaded_products})
+    return products_dict
+
+
+async def reserve_stock(
+    products_dict: Dict[str, CatalogProduct],
+    product_query: List[QueryProduct],
     db_session: AsyncSession,
 ) -> None:
     """
-    Update stock in db
-    :param updated_products_dict: updated products dict
+    Check and decrease stock of all check products with one atomic statement
+    :param products_dict: Products dict from db, key is product name
+    :param product_query: List of QueryProduct
     :param db_session: AsyncSession db
-    :return: None
+    :return: None or raise product_conflicts (HTTPException, 409), the transaction is rolled back by get_db
     """
+    quantities, stock_products = calculate_stock_quantities(products_dict, product_query)
     stock_repo: StockRepository = StockRepository(session=db_session)
-    for _, product in updated_products_dict.items():
-        stock_to_update: StockUpdate = StockUpdate(
-            quantity_in_stock=product.product_stock.quantity_in_stock,
-            stock_last_update=product.product_stock.stock_last_update,
-        )
-        await stock_repo.update(product.product_stock.id, stock_to_update.dict())
+    not_enough_stock_ids: List[int] = await stock_repo.reserve_quantities(quantities)
+    if not_enough_stock_ids:
+        stock_reservation_conflicts_total.labels(operation="single").inc()
+        raise not_enough_stock(stock_products, not_enough_stock_ids)
+
+
+def calculate_stock_quantities(
+    products_dict: Dict[str, CatalogProduct], product_query: List[QueryProduct]
+) -> Tuple[Dict[int, Decimal], Dict[int, str]]:
+    """
+    Sum up quantities of the check products per stock row
+    :param products_dict: Products dict from db, key is product name
+    :param product_query: List of QueryProduct
+    :return: Quantities to subtract and product names, key is stock id
+    """
+    quantities: Dict[int, Decimal] = {}
+    stock_products: Dict[int, str] = {}
+    for q_product in product_query:
+        stock_id: int = products_dict[q_product.name].stock_id
+        quantities[stock_id] = quantities.get(stock_id, Decimal(0)) + q_product.quantity
+        stock_products[stock_id] = q_product.name
+    return quantities, stock_products
+
+
+def not_enough_stock(stock_products: Dict[int, str], not_enough_stock_ids: List[int]) -> HTTPException:
+    """
+    Build the conflict for check products which have not enough units in stock
+    :param stock_products: Product names, key is stock id
+    :param not_enough_stock_ids: List of stock ids which have not enough units in stock
+    :return: product_conflicts (HTTPException, 409)
+    """
+    return product_conflicts(
+        [f"Product {stock_products[stock_id]} has not enough units in stock" for stock_id in not_enough_stock_ids]
+    )
 
 
 async def check_user_essence(db_session: AsyncSession, user: TokenPayload) -> ReadUserEssence:
     """
-    Get user essence
+    Get user essence with the owner name, the essence is created on the first check of the user
     :param db_session: AsyncSession db
     :param user: user token payload
     :return: ReadUserEssence instance
     """
     user_essence_repo = UserEssenceRepository(session=db_session)
-    user_essence: UserEssence = await user_essence_repo.get_user_essence_by_user_id(user.user_id)
-    if not user_essence:
+    user_essence: Row | None = await user_essence_repo.get_user_essence_with_owner(user.user_id)
+    owner_name: str | None = f"{user_essence.first_name} {user_essence.last_name}" if user_essence else None
+    if user_essence is None or user_essence.essence_id is None:
         user_essence_create: UserEssenceCreate = UserEssenceCreate(user_id=user.user_id)
         new_user_essence: UserEssence = await user_essence_repo.create(user_essence_create.dict())
-        return ReadUserEssence(id=new_user_essence.id, user_id=new_user_essence.user_id, user_checks=[])
-    return ReadUserEssence(id=user_essence.id, user_id=user_essence.user_id, user_checks=user_essence.user_checks)
+        return ReadUserEssence(
+            id=new_user_essence.id, user_id=new_user_essence.user_id, owner_name=owner_name, user_checks=[]
+        )
+    return ReadUserEssence(id=user_essence.essence_id, user_id=user.user_id, owner_name=owner_name, user_checks=[])
 
 
 async def check_entity_create(
-    check_create_data: QueryCheck, user_essence: ReadUserEssence, db_session: AsyncSession
+    check_create_data: QueryCheck, user_essence: ReadUserEssence, check_total_price: Decimal, db_session: AsyncSession
 ) -> ReadCheck:
     """
-    Create empty check entity
+    Create check entity with precalculated totals
     :param check_create_data: input data for check creation
     :param user_essence: User essence instance
+    :param check_total_price: Check total price
     :param db_session: AsyncSession db
     :return: ReadCheck instance
     """
+    check_data: dict = build_check_data(check_create_data, user_essence, check_total_price)
+    check_repo = CheckRepository(session=db_session)
+    new_check: Check = await check_repo.create(check_data)
+    return read_created_check(new_check)
+
+
+def build_check_data(check_create_data: QueryCheck, user_essence: ReadUserEssence, check_total_price: Decimal) -> dict:
+    """
+    Build check row data with precalculated totals
+    :param check_create_data: input data for check creation
+    :param user_essence: User essence instance
+    :param check_total_price: Check total price
+    :return: Check row data
+    """
     check_payment: QueryPayment = check_create_data.payment
     check: CheckCreate = CheckCreate(
         check_datetime=datetime.utcnow(),
@@ -179,62 +271,70 @@ async def check_entity_create(
         check_purchasing_method=check_payment.type,
         check_user_essence=user_essence.id,
     )
-    check_repo = CheckRepository(session=db_session)
-    new_check: Check = await check_repo.create(check.dict())
-    return new_check.to_model_schema()
+    check_data: dict = check.dict()
+    check_data["check_total_price"] = check_total_price
+    check_data["check_rest"] = check_payment.amount - check_total_price
+    return check_data
 
 
-async def check_update(
-    new_check: ReadCheck,
-    sold_products: List[SoldProductCreate],
-    db_session: AsyncSession,
-    check_create_data: QueryCheck,
-) -> ReadCheck:
+def read_created_check(new_check: Check) -> ReadCheck:
+    """
+    Create ReadCheck instance from a just inserted check, its sold products are not inserted yet
+    :param new_check: Check instance
+    :return: ReadCheck instance
     """
-    Update check entity
-    :param new_check: Empty check entity
+    return ReadCheck(
+        id=new_check.id,
+        check_datetime=new_check.check_datetime,
+        check_identifier=new_check.check_identifier,
+        check_total_price=new_check.check_total_price,
+        check_purchasing_method=new_check.check_purchasing_method,
+        check_user_essence=new_check.check_user_essence,
+        check_rest=new_check.check_rest,
+        check_products=[],
+    )
+
+
+def calculate_check_total(product_query: List[QueryProduct]) -> Decimal:
+    """
+    Calculate check total price from the input data
+    :param product_query: List of QueryProduct, prices are already validated against db
+    :return: Check total price
+    """
+    return sum((q_product.quantity * q_product.price for q_product in product_query), Decimal(0))
+
+
+async def sold_products_create(
+    sold_products: List[SoldProductCreate], db_session: AsyncSession
+) -> List[ReadSoldProduct]:
+    """
+    Insert all sold products of the check with one statement
     :param sold_products: List of sold products
     :param db_session: AsyncSession db
-    :param check_create_data: Input data for check creation
-    :return: ReadCheck instance
+    :return: List of ReadSoldProduct
     """
     sold_product_repo: SoldProductRepository = SoldProductRepository(session=db_session)
-    check_total_price: Decimal = Decimal(new_check.check_total_price)
-    for sold_product in sold_products:
-        s_product: dict = sold_product.dict()
-        sold_p: ReadSoldProduct = await sold_product_repo.create(s_product)
-        check_total_price += sold_p.sold_total_price
-    new_check.check_total_price = check_total_price
-    new_check.check_rest = check_create_data.payment.amount - check_total_price
-    update_check: UpdateCheck = UpdateCheck(
-        check_total_price=new_check.check_total_price, check_rest=new_check.check_rest
+    created: List[SoldProduct] = await sold_product_repo.create_many(
+        [sold_product.dict() for sold_product in sold_products]
     )
-    check_repo = CheckRepository(session=db_session)
-    updated_check_from_db: Check = await check_repo.update(new_check.id, update_check.dict())
-    updated_check: ReadCheck = updated_check_from_db.to_model_schema()
-    return updated_check
+    return [sold_product.to_model_schema() for sold_product in created]
 
 
 async def create_sold_product_entity(
-    products_dict: Dict[str, ReadProduct], product_query: List["QueryProduct"], new_check: ReadCheck
-) -> Tuple[List["SoldProductCreate"], Dict[str, ReadProduct]]:
+    products_dict: Dict[str, CatalogProduct], product_query: List["QueryProduct"], new_check: ReadCheck
+) -> List["SoldProductCreate"]:
     """
     Create sold product entity
     :param products_dict: Products dict from db, key is product name
     :param product_query: List of QueryProduct
-    :param new_check: Empty check entity
+    :param new_check: Created check entity
 
-    :return: Tuple of List of SoldProductCreate and updated products dict
+    :return: List of SoldProductCreate
     """
     sold_products: List["SoldProductCreate"] = []
+    sold_datetime: datetime = datetime.utcnow()
     for q_product in product_query:
         product = products_dict[q_product.name]
-        store_product = product.product_stock
-        new_quantity = number_to_decimal(store_product.quantity_in_stock) - q_product.quantity
-        store_product.quantity_in_stock = new_quantity
-        store_product.stock_last_update = datetime.utcnow()
-        product.product_stock = store_product
-        products_dict[q_product.name] = product
         sold_product: SoldProductCreate = SoldProductCreate(
             sold_product_title=product.product_title,
             sold_product_description=product.product_description,
@@ -242,19 +342,36 @@ async def create_sold_product_entity(
             sold_price=product.product_price.price,
             sold_units=product.product_units,
             sold_quantity=q_product.quantity,
-            sold_datetime=datetime.utcnow(),
+            sold_datetime=sold_datetime,
             sold_total_price=q_product.quantity * product.product_price.price,
-            sold_stock_id=store_product.id,
+            sold_stock_id=product.stock_id,
             sold_check_id=new_check.id,
             sold_product_id=product.product_identifier,
         )
         sold_products.append(sold_product)
-    return sold_products, products_dict
+    return sold_products
+
+
+async def validate_check_products(check_create_data: QueryCheck, products_dict: Dict[str, CatalogProduct]) -> None:
+    """
+    Validate that all check products exist and match db data
+    :param check_create_data: input data for check creation
+    :param products_dict: Products dict from db, key is product name
+    :return: None or raise some_products_not_found or product_conflicts (HTTPException, 409)
+    """
+    not_found_products = {product.name for product in check_create_data.products} - set(products_dict)
+    if not_found_products:
+        error_msg = f"Some products not found: {', '.join(not_found_products)}"
+        raise some_products_not_found(error_msg)
+    await validate_quantity_and_price(check_create_data, products_dict)
 
 
-async def validate_quantity_and_price(check_create_data: QueryCheck, product_from_db: Dict[str, ReadProduct]) -> None:
+async def validate_quantity_and_price(
+    check_create_data: QueryCheck, product_from_db: Dict[str, CatalogProduct]
+) -> None:
     """
-    Validate input check data and db data
+    Validate input check data and db data.
+    Stock sufficiency is checked by reserve_stock together with the stock decrease.
     :param check_create_data: input data for check creation
     :param product_from_db: info about products from db
     :return: None or raise product_conflicts (HTTPException, 409)
@@ -262,8 +379,6 @@ async def validate_quantity_and_price(check_create_data: QueryCheck, product_fro
     errors_msg: List[str] = []
     for q_product in check_create_data.products:
         product = product_from_db[q_product.name]
-        if product.product_stock.quantity_in_stock < q_product.quantity:
-            errors_msg.append(f"Product {q_product.name} has not enough units in stock")
         if product.product_min_quantity_sell > q_product.quantity:
             errors_msg.append(f"Product {q_product.name} has quantity less than minimum sell quantity")
         if product.product_price.price != q_product.price:
@@ -273,13 +388,13 @@ async def validate_quantity_and_price(check_create_data: QueryCheck, product_fro
     return
 
 
-def fetch_and_create_read_product(product_from_db: Product) -> ReadProduct:
+def fetch_and_create_catalog_product(product_from_db: Product) -> CatalogProduct:
     """
-    Load product from db and create ReadProduct instance
-    :param product_from_db: Product instance
-    :return: ReadProduct instance
+    Load product from db and create CatalogProduct instance
+    :param product_from_db: Product instance with loaded price and stock
+    :return: CatalogProduct instance
     """
-    return ReadProduct(
+    return CatalogProduct(
         id=product_from_db.id,
         product_identifier=product_from_db.product_identifier,
         product_title=product_from_db.product_title,
@@ -296,13 +411,5 @@ def fetch_and_create_read_product(product_from_db: Product) -> ReadProduct:
                 price_update=product_from_db.product_price.price_update,
             )
         ),
-        product_stock=(
-            ReadStockWithoutSales(
-                id=product_from_db.product_stock.id,
-                product_id=product_from_db.product_stock.product_id,
-                quantity_in_stock=product_from_db.product_stock.quantity_in_stock,
-                stock_last_update=product_from_db.product_stock.stock_last_update,
-                stock_product_identifier=product_from_db.product_stock.stock_product_identifier,
-            )
-        ),
+        stock_id=product_from_db.product_stock.id,
     )
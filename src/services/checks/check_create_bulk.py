@@ -0,0 +1,195 @@
+from decimal import Decimal
+from typing import List, Dict
+
+from fastapi import HTTPException
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+
+from .check_http_exception import product_conflicts
+from .check_create import (
+    get_catalog_products,
+    validate_check_products,
+    calculate_stock_quantities,
+    not_enough_stock,
+    check_user_essence,
+    calculate_check_total,
+    build_check_data,
+    read_created_check,
+    create_sold_product_entity,
+    sold_products_create,
+    build_answer_check,
+)
+from .sales_stats import add_checks_to_sales_stats
+from .schemas.check_create_query_schema import QueryCheck, AnswerCheck, AnswerBulkCheck, AnswerBulkCheckItem
+from .schemas.checks_schemas import CatalogProduct, ReadCheck, ReadSoldProduct, ReadUserEssence, SoldProductCreate
+from src.models.check_model import Check
+from src.repositories.check_repository import CheckRepository
+from src.repositories.stock_repository import StockRepository
+from src.services.auth.schemas.user_auth import TokenPayload, HTTPExceptionModel
+from src.utils.logging.set_logging import set_logger
+from src.utils.metrics.prometheus_metrics import stock_reservation_conflicts_total
+
+logger = set_logger()
+
+
+async def create_checks_bulk(
+    request: Request, checks_create_data: List[QueryCheck], db_session: AsyncSession, user: TokenPayload
+) -> AnswerBulkCheck:
+    """
+    Start process create several checks at once
+    :param request: Request
+    :param checks_create_data: Input data for checks creation
+    :param db_session: AsyncSession db
+    :param user: User token payload
+    :return: AnswerBulkCheck instance
+    """
+    try:
+        return await create_checks_bulk_start(request, checks_create_data, db_session, user)
+    except SQLAlchemyError as e:
+        logger.exception("Database error occurred while creating checks")
+        raise e
+    except Exception as e:
+        logger.exception("An unexpected error occurred")
+        raise e
+
+
+async def create_checks_bulk_start(
+    request: Request, checks_create_data: List[QueryCheck], db_session: AsyncSession, user: TokenPayload
+) -> AnswerBulkCheck:
+    """
+    Main function for bulk check creation.
+    Each check is validated and reserved on its own, a failed check does not fail the others.
+    Products are loaded once for all checks, stock is decreased with one statement and
+    checks and sold products are inserted with multi-row statements.
+    :param request: Request
+    :param checks_create_data: Input data for checks creation
+    :param db_session: AsyncSession db
+    :param user: User token payload
+    :return: AnswerBulkCheck instance with results in the order of the input checks
+    """
+    product_names: List[str] = list(
+        {product.name for check_create_data in checks_create_data for product in check_create_data.products}
+    )
+    products_dict: Dict[str, CatalogProduct] = await get_catalog_products(product_names, db_session)
+
+    errors: Dict[int, HTTPException] = {}
+    for index, check_create_data in enumerate(checks_create_data):
+        try:
+            await validate_check_products(check_create_data, products_dict)
+        except HTTPException as e:
+            errors[index] = e
+    valid_checks: Dict[int, QueryCheck] = {
+        index: check_create_data for index, check_create_data in enumerate(checks_create_data) if index not in errors
+    }
+    errors.update(await reserve_stock_bulk(valid_checks, products_dict, db_session))
+    accepted_checks: Dict[int, QueryCheck] = {
+        index: check_create_data for index, check_create_data in valid_checks.items() if index not in errors
+    }
+    created_checks: Dict[int, AnswerCheck] = await checks_entities_create(
+        request, accepted_checks, products_dict, db_session, user
+    )
+
+    results: List[AnswerBulkCheckItem] = []
+    for index in range(len(checks_create_data)):
+        if index in created_checks:
+            results.append(AnswerBulkCheckItem(index=index, status="created", check=created_checks[index]))
+        else:
+            error: HTTPExceptionModel = HTTPExceptionModel(**errors[index].detail)
+            results.append(AnswerBulkCheckItem(index=index, status="failed", error=error))
+    return AnswerBulkCheck(created=len(created_checks), failed=len(errors), results=results)
+
+
+async def reserve_stock_bulk(
+    checks_create_data: Dict[int, QueryCheck], products_dict: Dict[str, CatalogProduct], db_session: AsyncSession
+) -> Dict[int, HTTPException]:
+    """
+    Reserve stock for several checks. Stock rows of all checks are locked and read with one statement,
+    checks are served in order while units last and the stock is decreased in aggregate with one statement.
+    :param checks_create_data: Validated input data for checks creation, key is check index
+    :param products_dict: Products dict from db, key is product name
+    :param db_session: AsyncSession db
+    :return: product_conflicts (HTTPException, 409) of checks without enough units in stock, key is check index
+    """
+    if not checks_create_data:
+        return {}
+    stock_ids: List[int] = list(
+        {
+            products_dict[product.name].stock_id
+            for check_create_data in checks_create_data.values()
+            for product in check_create_data.products
+        }
+    )
+    stock_repo: StockRepository = StockRepository(session=db_session)
+    available: Dict[int, Decimal] = {
+        stock_id: Decimal(str(quantity)) for stock_id, quantity in (await stock_repo.lock_quantities(stock_ids)).items()
+    }
+    reserved: Dict[int, Decimal] = {}
+    errors: Dict[int, HTTPException] = {}
+    for index, check_create_data in checks_create_data.items():
+        quantities, stock_products = calculate_stock_quantities(products_dict, check_create_data.products)
+        not_enough_stock_ids: List[int] = [
+            stock_id for stock_id, quantity in quantities.items() if available.get(stock_id, Decimal(0)) < quantity
+        ]
+        if not_enough_stock_ids:
+            stock_reservation_conflicts_total.labels(operation="bulk").inc()
+            errors[index] = not_enough_stock(stock_products, not_enough_stock_ids)
+            continue
+        for stock_id, quantity in quantities.items():
+            available[stock_id] -= quantity
+            reserved[stock_id] = reserved.get(stock_id, Decimal(0)) + quantity
+    if reserved:
+        # Rows are locked, so the aggregate decrease can not run out of units
+        not_reserved_ids: List[int] = await stock_repo.reserve_quantities(reserved)
+        if not_reserved_ids:
+            raise product_conflicts(
+                [f"Stock {stock_id} has not enough units in stock" for stock_id in not_reserved_ids]
+            )
+    return errors
+
+
+async def checks_entities_create(
+    request: Request,
+    checks_create_data: Dict[int, QueryCheck],
+    products_dict: Dict[str, CatalogProduct],
+    db_session: AsyncSession,
+    user: TokenPayload,
+) -> Dict[int, AnswerCheck]:
+    """
+    Insert checks and their sold products with multi-row statements
+    :param request: Request
+    :param checks_create_data: Validated input data with reserved stock, key is check index
+    :param products_dict: Products dict from db, key is product name
+    :param db_session: AsyncSession db
+    :param user: User token payload
+    :return: Created checks, key is check index
+    """
+    if not checks_create_data:
+        return {}
+    user_essence: ReadUserEssence = await check_user_essence(db_session, user)
+    check_repo: CheckRepository = CheckRepository(session=db_session)
+    created: List[Check] = await check_repo.create_many(
+        [
+            build_check_data(check_create_data, user_essence, calculate_check_total(check_create_data.products))
+            for check_create_data in checks_create_data.values()
+        ]
+    )
+    new_checks: Dict[int, ReadCheck] = {
+        index: read_created_check(new_check) for index, new_check in zip(checks_create_data, created)
+    }
+    await add_checks_to_sales_stats(list(new_checks.values()), db_session)
+
+    sold_products: List[SoldProductCreate] = []
+    for index, check_create_data in checks_create_data.items():
+        sold_products.extend(
+            await create_sold_product_entity(products_dict, check_create_data.products, new_checks[index])
+        )
+    created_sold_products: List[ReadSoldProduct] = await sold_products_create(sold_products, db_session)
+    checks_by_id: Dict[int, ReadCheck] = {new_check.id: new_check for new_check in new_checks.values()}
+    for sold_product in created_sold_products:
+        checks_by_id[sold_product.sold_check_id].check_products.append(sold_product)
+
+    return {
+        index: await build_answer_check(request, new_check, checks_create_data[index].payment.amount)
+        for index, new_check in new_checks.items()
+    }
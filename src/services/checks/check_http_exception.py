@@ -20,3 +20,28 @@ def check_not_exist(msg: List[str]) -> HTTPException:
 
 def page_number_out_of_bounds(msg: List[str]) -> HTTPException:
     return HTTPException(detail={"error": "Out of bounds", "message": msg}, status_code=status.HTTP_409_CONFLICT)
+
+
+def invalid_cursor(msg: List[str]) -> HTTPException:
+    return HTTPException(detail={"error": "Invalid cursor", "message": msg}, status_code=status.HTTP_400_BAD_REQUEST)
+
+
+def invalid_date_range(msg: List[str]) -> HTTPException:
+    return HTTPException(
+        detail={"error": "Invalid date range", "message": msg}, status_code=status.HTTP_400_BAD_REQUEST
+    )
+
+
+def idempotency_key_reused(msg: List[str]) -> HTTPException:
+    return HTTPException(
+        detail={"error": "Idempotency key reused", "message": msg},
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+    )
+
+
+def idempotency_request_in_progress(msg: List[str]) -> HTTPException:
+    return HTTPException(
+        detail={"error": "Request in progress", "message": msg},
+        status_code=status.HTTP_409_CONFLICT,
+        headers={"Retry-After": "1"},
+    )
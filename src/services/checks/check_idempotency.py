@@ -0,0 +1,187 @@
+import asyncio
+import hashlib
+import time
+from typing import Optional, Tuple
+from uuid import uuid4
+
+import orjson
+from fastapi import BackgroundTasks
+from fastapi_cache.backends.redis import RedisBackend
+from redis.asyncio.client import AbstractRedis
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+
+from .check_create import create_check
+from .check_http_exception import idempotency_key_reused, idempotency_request_in_progress
+from .schemas.check_create_query_schema import QueryCheck, AnswerCheck
+from src.services.auth.schemas.user_auth import TokenPayload
+from src.settings.checkbox_settings import settings
+from src.utils.cache.cache_backend import get_cache_backend, build_cache_key
+from src.utils.logging.set_logging import set_logger
+
+logger = set_logger()
+
+IDEMPOTENCY_NAMESPACE = "idempotency"
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+IDEMPOTENT_REPLAYED_HEADER = "Idempotent-Replayed"
+# Deletes the lock only if it is still held by the caller, an expired lock may be taken by another request
+RELEASE_LOCK_SCRIPT = "if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end return 0"
+
+
+def get_idempotency_redis() -> Optional[AbstractRedis]:
+    """Get Redis client of the cache backend initialized at startup, None if idempotency is disabled."""
+    if not settings.idempotency_enabled:
+        return None
+    backend = get_cache_backend()
+    if not isinstance(backend, RedisBackend):
+        return None
+    return backend.redis
+
+
+def idempotency_cache_key(user_id: int, idempotency_key: str) -> str:
+    """
+    Build the cache key of a stored response, keys of different users do not collide.
+
+    :param user_id: User id.
+    :param idempotency_key: Idempotency-Key header value.
+    :return: str: Cache key.
+    """
+    return build_cache_key(IDEMPOTENCY_NAMESPACE, user_id, idempotency_key)
+
+
+def request_fingerprint(check_create_data: QueryCheck) -> str:
+    """Fingerprint of the request body, a key reused with another body is rejected."""
+    return hashlib.sha256(check_create_data.model_dump_json().encode()).hexdigest()
+
+
+def render_answer_check(answer_check: AnswerCheck) -> bytes:
+    """Render the answer like ORJSONModelResponse does, so a replay is byte for byte the first response."""
+    return answer_check.__pydantic_serializer__.to_json(answer_check, by_alias=True)
+
+
+async def create_check_idempotent(
+    request: Request,
+    check_create_data: QueryCheck,
+    db_session: AsyncSession,
+    user: TokenPayload,
+    idempotency_key: str,
+    background_tasks: BackgroundTasks | None = None,
+) -> Tuple[bytes, bool]:
+    """
+    Create check once per idempotency key.
+    The first request takes a lock and creates the check, its response is stored after the commit.
+    Duplicates get the stored response, concurrent ones wait for the lock without touching db.
+    Error responses are not stored, the lock is released and the next retry runs again.
+    Without Redis the check is created without deduplication.
+    :param request: Request
+    :param check_create_data: Input data for check creation
+    :param db_session: AsyncSession db
+    :param user: User token payload
+    :param idempotency_key: Idempotency-Key header value
+    :param background_tasks: Background tasks of the response, used to warm the receipt cache
+    :return: Rendered AnswerCheck and whether it is a replay of a stored response,
+        or raise idempotency_key_reused (HTTPException, 422) or idempotency_request_in_progress (HTTPException, 409)
+    """
+    redis: Optional[AbstractRedis] = get_idempotency_redis()
+    key: str = idempotency_cache_key(user.user_id, idempotency_key)
+    fingerprint: str = request_fingerprint(check_create_data)
+    lock_token: Optional[str] = None
+    if redis is not None:
+        try:
+            stored, lock_token = await wait_for_stored_response_or_lock(redis, key, fingerprint)
+        except (RedisError, OSError) as e:
+            logger.warning(f"Idempotency store failed, check is created without deduplication: {e}")
+        else:
+            if stored is not None:
+                return stored, True
+
+    try:
+        answer_check: AnswerCheck = await create_check(request, check_create_data, db_session, user, background_tasks)
+        body: bytes = render_answer_check(answer_check)
+        if lock_token is not None:
+            # A stored response must refer to a committed check, get_db commits only after the endpoint returns
+            await db_session.commit()
+            await store_response(redis, key, fingerprint, body)
+        return body, False
+    finally:
+        if lock_token is not None:
+            await release_idempotency_lock(redis, key, lock_token)
+
+
+async def wait_for_stored_response_or_lock(
+    redis: AbstractRedis, key: str, fingerprint: str
+) -> Tuple[Optional[bytes], Optional[str]]:
+    """
+    Wait until the response of the key is stored or the lock of the key is taken by the caller
+    :param redis: Redis client
+    :param key: Cache key of the stored response
+    :param fingerprint: Request body fingerprint
+    :return: Stored response and None, or None and the lock token
+    """
+    deadline: float = time.monotonic() + settings.idempotency_lock_wait
+    while True:
+        stored: Optional[bytes] = await get_stored_response(redis, key, fingerprint)
+        if stored is not None:
+            return stored, None
+        lock_token: str = uuid4().hex
+        if await redis.set(f"{key}:lock", lock_token, nx=True, ex=settings.idempotency_lock_ttl):
+            # The first request may have stored its response and released the lock after the read above
+            stored = await get_stored_response(redis, key, fingerprint)
+            if stored is not None:
+                await release_idempotency_lock(redis, key, lock_token)
+                return stored, None
+            return None, lock_token
+        if time.monotonic() >= deadline:
+            raise idempotency_request_in_progress(
+                [f"Request with this {IDEMPOTENCY_KEY_HEADER} is still in progress, retry later"]
+            )
+        await asyncio.sleep(settings.idempotency_poll_interval)
+
+
+async def get_stored_response(redis: AbstractRedis, key: str, fingerprint: str) -> Optional[bytes]:
+    """
+    Get stored response of the key
+    :param redis: Redis client
+    :param key: Cache key of the stored response
+    :param fingerprint: Request body fingerprint
+    :return: Stored response, None if it is not stored, or raise idempotency_key_reused (HTTPException, 422)
+    """
+    stored = await redis.get(key)
+    if stored is None:
+        return None
+    stored_response: dict = orjson.loads(stored)
+    if stored_response["fingerprint"] != fingerprint:
+        raise idempotency_key_reused([f"{IDEMPOTENCY_KEY_HEADER} was already used with another request body"])
+    return stored_response["body"].encode()
+
+
+async def store_response(redis: AbstractRedis, key: str, fingerprint: str, body: bytes) -> None:
+    """
+    Store the response of the key for settings.idempotency_ttl seconds, Redis failures are logged and ignored
+    :param redis: Redis client
+    :param key: Cache key of the stored response
+    :param fingerprint: Request body fingerprint
+    :param body: Rendered AnswerCheck
+    :return: None
+    """
+    try:
+        await redis.set(
+            key, orjson.dumps({"fingerprint": fingerprint, "body": body.decode()}), ex=settings.idempotency_ttl
+        )
+    except (RedisError, OSError) as e:
+        logger.warning(f"Idempotency store write failed: {e}")
+
+
+async def release_idempotency_lock(redis: AbstractRedis, key: str, lock_token: str) -> None:
+    """
+    Release the lock of the key if it is still held, Redis failures are logged, the lock expires anyway
+    :param redis: Redis client
+    :param key: Cache key of the stored response
+    :param lock_token: Token the lock was taken with
+    :return: None
+    """
+    try:
+        await redis.eval(RELEASE_LOCK_SCRIPT, 1, f"{key}:lock", lock_token)
+    except (RedisError, OSError) as e:
+        logger.warning(f"Idempotency lock release failed: {e}")
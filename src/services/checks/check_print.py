@@ -1,18 +1,17 @@
-from typing import List
+from typing import Iterable, List
 from uuid import UUID
 
+from sqlalchemy import Row
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.models.check_model import Check, UserEssence
-from src.models.user_model import User
 from src.repositories.check_repository import CheckRepository
-from src.repositories.essence_repository import UserEssenceRepository
-from src.repositories.user_repository import UsersRepository
-from src.services.auth.schemas.user_auth import UserRead
 from src.services.checks.check_http_exception import check_not_exist
-from src.services.checks.schemas.checks_schemas import ReadCheck
+from src.services.checks.schemas.checks_schemas import ReadCheck, ReadSoldProduct
+from src.services.checks.receipt_cache import get_cached_receipt, set_cached_receipt
+from src.services.checks.receipt_render import ReceiptFormat, render_receipt
 from src.services.checks.schemas.print_schema import ReceiptData, Item
+from src.settings.checkbox_settings import settings
 from src.utils.logging.set_logging import set_logger
 
 logger = set_logger()
@@ -22,11 +21,25 @@ async def print_receipt(
     db: AsyncSession,
     check_identifier: UUID,
     str_length: int = 50,
-) -> str:
+    receipt_format: ReceiptFormat = "html",
+) -> bytes:
+    """
+    Get rendered receipt, from the receipt cache if possible.
+
+    :param db: AsyncSession: Database session.
+    :param check_identifier: UUID: Check identifier.
+    :param str_length: int: Line width for the receipt.
+    :param receipt_format: html, text, escpos or pdf.
+    :return: bytes: Rendered receipt.
+    """
     try:
+        cached_receipt: bytes | None = await get_cached_receipt(check_identifier, str_length, receipt_format)
+        if cached_receipt is not None:
+            return cached_receipt
         data: ReceiptData = await get_check_data(db, check_identifier)
-        recept_list: List[str] = generate_receipt(data=data, line_width=str_length)
-        return receipt_to_html(recept_list)
+        receipt: bytes = render_receipt(data, str_length, receipt_format)
+        await set_cached_receipt(check_identifier, str_length, receipt, receipt_format)
+        return receipt
     except SQLAlchemyError as e:
         logger.exception("Database error occurred while creating check")
         raise e
@@ -35,31 +48,77 @@ async def print_receipt(
         raise e
 
 
+async def ensure_receipt_exists(
+    db: AsyncSession,
+    check_identifier: UUID,
+    str_length: int = 50,
+    receipt_format: ReceiptFormat = "html",
+) -> None:
+    """
+    Make sure the receipt can be printed before answering a conditional request with 304.
+    A cached receipt is enough, otherwise the check is looked up in the database.
+
+    :param db: AsyncSession: Database session.
+    :param check_identifier: UUID: Check identifier.
+    :param str_length: int: Line width for the receipt.
+    :param receipt_format: html, text, escpos or pdf.
+    :return: None
+    """
+    if await get_cached_receipt(check_identifier, str_length, receipt_format) is not None:
+        return
+    if not await CheckRepository(db).check_exists(check_identifier):
+        raise check_not_exist([f"Check with identifier {check_identifier} does not exist"])
+
+
 async def get_check_data(db: AsyncSession, check_identifier: UUID) -> ReceiptData:
     """
-    Get check data from the database.
+    Get check data from the database with one query.
 
     :param db: AsyncSession: Database session.
     :param check_identifier: str: Check identifier.
-    :param str_length: int: Line width for the receipt.
     :return: ReceiptData: Receipt data.
     """
-    check_data: CheckRepository = CheckRepository(db)
-    check: Check = await check_data.get_check_by_identifier(check_identifier)
-    if not check:
+    check_repo: CheckRepository = CheckRepository(db)
+    rows: List[Row] = await check_repo.get_check_receipt_rows(check_identifier)
+    if not rows:
         raise check_not_exist([f"Check with identifier {check_identifier} does not exist"])
-    check_dict: ReadCheck = check.to_model_schema()
-    user_essence_repo = UserEssenceRepository(db)
-    essence: UserEssence = await user_essence_repo.get_by_id(check_dict.check_user_essence)
-    user_repo: UsersRepository = UsersRepository(db)
-    user: User = await user_repo.get_by_id(essence.user_id)
-    user_item: UserRead = user.to_model_schema()
+    check = rows[0]
+    return make_receipt_data(
+        check.first_name + " " + check.last_name,
+        check,
+        [row for row in rows if row.sold_product_title is not None],
+    )
+
+
+def build_receipt_data(owner_name: str, check_dict: ReadCheck) -> ReceiptData:
+    """
+    Build receipt data from the check and its sold products.
+
+    :param owner_name: str: Check owner first and last name.
+    :param check_dict: ReadCheck: Check with sold products.
+    :return: ReceiptData: Receipt data.
+    """
+    return make_receipt_data(owner_name, check_dict, check_dict.check_products)
+
+
+def make_receipt_data(
+    owner_name: str, check: ReadCheck | Row, products: Iterable[ReadSoldProduct | Row]
+) -> ReceiptData:
+    """
+    Build receipt data from check and sold product fields, shared by the db rows and the created check.
+
+    :param owner_name: str: Check owner first and last name.
+    :param check: ReadCheck | Row: Check with check_total_price, check_purchasing_method, check_rest
+        and check_datetime.
+    :param products: Sold products with sold_quantity, sold_price, sold_product_title and sold_total_price.
+    :return: ReceiptData: Receipt data.
+    """
     return ReceiptData(
-        owner_name=user_item.first_name + " " + user_item.last_name,
-        total=check_dict.check_total_price,
-        purchasing_method=check_dict.check_purchasing_method,
-        rest=check_dict.check_rest,
-        date=check_dict.check_datetime.strftime("%Y-%m-%d %H:%M:%S"),
+        owner_name=owner_name,
+        total=check.check_total_price,
+        purchasing_method=check.check_purchasing_method,
+        rest=check.check_rest,
+        date=check.check_datetime.strftime("%Y-%m-%d %H:%M:%S"),
         items=[
             Item(
                 quantity=product.sold_quantity,
@@ -67,57 +126,18 @@ async def get_check_data(db: AsyncSession, check_identifier: UUID) -> ReceiptDat
                 description=product.sold_product_title,
                 total_price=product.sold_total_price,
             )
-            for product in check_dict.check_products
+            for product in products
         ],
     )
 
 
-def generate_receipt(data: ReceiptData, line_width=50) -> List[str]:
+async def warm_receipt_cache(check_identifier: UUID, data: ReceiptData) -> None:
     """
-    Generates a formatted receipt with enhanced formatting.
+    Render the HTML receipt with the default line width and store it in the receipt cache.
 
+    :param check_identifier: UUID: Check identifier.
     :param data: ReceiptData: Receipt data.
-    :param line_width: int: Line width for the receipt.
-    :return: List[str]: Formatted receipt.
-    """
-
-    def format_money(amount):
-        return f"{amount:,.2f}"
-
-    receipt = []
-    # Header
-    receipt.append(data.owner_name.center(line_width))
-    receipt.append("=" * line_width)
-
-    # Body
-    for item in data.items:
-        item_line = f"{item.quantity:.2f} x {format_money(item.unit_price)}".ljust(line_width - 20)
-        item_line += format_money(item.total_price).rjust(20)
-        receipt.append(item_line)
-        receipt.append(item.description)
-        receipt.append("-" * line_width)
-
-    # Footer
-    receipt.append("=" * line_width)
-    receipt.append(f"{'SUM'.rjust(line_width - 20)}{format_money(data.total).rjust(20)}")
-    receipt.append(f"{data.purchasing_method.rjust(line_width - 20)}{format_money(data.total + data.rest).rjust(20)}")
-    receipt.append(f"{'Rest'.rjust(line_width - 20)}{format_money(data.rest).rjust(20)}")
-    receipt.append("=" * line_width)
-    receipt.append(data.date.center(line_width))
-    receipt.append(data.thank_you_message.center(line_width))
-
-    return receipt
-
-
-def receipt_to_html(receipt_lines: List[str]) -> str:
-    """
-    Convert receipt lines to HTML.
-    :param receipt_lines: list of receipt lines
-    :return: html string
+    :return: None
     """
-    html_output = "<!DOCTYPE html><html><head><title>Receipt</title></head><body><pre>"
-    for line in receipt_lines:
-        html_output += line + "<br>"
-    html_output += "</pre></body></html>"
-    print("!!!!!!!!!!!!!!!!!!!!1", html_output)
-    return html_output
+    receipt: bytes = render_receipt(data, settings.check_default_line_width)
+    await set_cached_receipt(check_identifier, settings.check_default_line_width, receipt)
@@ -1,21 +1,33 @@
 from decimal import Decimal
-from typing import Annotated, Literal
+from typing import Annotated, Literal, List
 from uuid import UUID
 
-from fastapi import routing, Depends, Query
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import routing, Depends, Query, BackgroundTasks, Body, Header
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from starlette import status
 from starlette.requests import Request
-from starlette.responses import HTMLResponse
+from starlette.responses import Response, StreamingResponse
 
-from src.database.database_connect import get_db
+from src.database.database_connect import get_db, get_session_factory
 from src.services.auth.auth import get_current_user
 from src.services.auth.schemas.user_auth import HTTPExceptionModel, TokenPayload
 from src.services.checks.check_create import create_check
-from src.services.checks.check_print import print_receipt
+from src.services.checks.check_create_bulk import create_checks_bulk
+from src.services.checks.check_idempotency import (
+    create_check_idempotent,
+    IDEMPOTENCY_KEY_HEADER,
+    IDEMPOTENT_REPLAYED_HEADER,
+)
+from src.services.checks.check_print import print_receipt, ensure_receipt_exists
+from src.services.checks.export_check import export_user_checks, EXPORT_MEDIA_TYPES
 from src.services.checks.get_check import get_user_checks
-from src.services.checks.schemas.check_create_query_schema import QueryCheck, AnswerCheck
-from src.services.checks.schemas.check_get_schema import BaseGetCheck
+from src.services.checks.receipt_cache import receipt_etag, receipt_cache_control
+from src.services.checks.receipt_render import ReceiptFormat, RECEIPT_MEDIA_TYPES
+from src.services.checks.sales_stats import get_user_sales_stats
+from src.services.checks.schemas.check_create_query_schema import QueryCheck, AnswerCheck, AnswerBulkCheck
+from src.services.checks.schemas.check_get_schema import BaseGetCheck, FilteringParams
+from src.services.checks.schemas.sales_stats_schema import SalesStats
+from src.utils.json.json_response import ORJSONModelResponse
 from src.utils.logging.set_logging import set_logger
 from src.settings.checkbox_settings import settings
 
@@ -29,21 +41,60 @@ DATE_PATTERN = r"^\d{4}-([0][1-9]|1[0-2])-([0][1-9]|[1-2]\d|3[01])$"
     "/create",
     response_model=AnswerCheck,
     status_code=status.HTTP_201_CREATED,
-    description="Check creation. Returns check data.",
+    description="Check creation. Returns check data. Requests with an Idempotency-Key header create the check "
+    "once, retries with the same key get the first response with the Idempotent-Replayed header.",
     responses={
         409: {
             "model": HTTPExceptionModel,
             "description": "Error creating error massages",
         },
+        422: {
+            "model": HTTPExceptionModel,
+            "description": "Idempotency-Key was already used with another request body",
+        },
     },
 )
 async def create_check_endpoint(
     request: Request,
     check_create_data: QueryCheck,
+    background_tasks: BackgroundTasks,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    user: Annotated[TokenPayload, Depends(get_current_user)],
+    idempotency_key: Annotated[
+        str | None,
+        Header(
+            alias=IDEMPOTENCY_KEY_HEADER,
+            description="Unique key of the check chosen by the client, for example UUID, reused on retries",
+            min_length=1,
+            max_length=255,
+        ),
+    ] = None,
+) -> Response:
+    if idempotency_key is not None:
+        body, replayed = await create_check_idempotent(
+            request, check_create_data, db, user, idempotency_key, background_tasks
+        )
+        headers = {IDEMPOTENT_REPLAYED_HEADER: "true"} if replayed else None
+        return Response(body, status_code=status.HTTP_201_CREATED, media_type="application/json", headers=headers)
+    answer_check: AnswerCheck = await create_check(request, check_create_data, db, user, background_tasks)
+    return ORJSONModelResponse(answer_check, status_code=status.HTTP_201_CREATED)
+
+
+@check_router.post(
+    "/create/bulk",
+    response_model=AnswerBulkCheck,
+    status_code=status.HTTP_200_OK,
+    description="Bulk check creation, for example replay of checks queued offline. "
+    "Returns per-check results in the order of the request, a failed check does not fail the others.",
+)
+async def create_checks_bulk_endpoint(
+    request: Request,
+    checks_create_data: Annotated[List[QueryCheck], Body(min_length=1, max_length=settings.bulk_check_max_size)],
     db: Annotated[AsyncSession, Depends(get_db)],
     user: Annotated[TokenPayload, Depends(get_current_user)],
-) -> AnswerCheck:
-    return await create_check(request, check_create_data, db, user)
+) -> ORJSONModelResponse:
+    answer_bulk_check: AnswerBulkCheck = await create_checks_bulk(request, checks_create_data, db, user)
+    return ORJSONModelResponse(answer_bulk_check, status_code=status.HTTP_200_OK)
 
 
 @check_router.get(
@@ -94,7 +145,23 @@ async def get_check_endpoint(
     ] = None,
     page: Annotated[int, Query(title="page", description="Page number", ge=1)] = 1,
     size: Annotated[int, Query(title="size", description="Page size", ge=1, le=100)] = 10,
-) -> BaseGetCheck:
+    cursor: Annotated[
+        str | None,
+        Query(
+            title="cursor",
+            description="Opaque cursor from next_cursor of the previous page. When set, page is ignored",
+            max_length=128,
+        ),
+    ] = None,
+    link_format: Annotated[
+        Literal["absolute", "relative"],
+        Query(
+            title="linkFormat",
+            description="absolute: every check has its print url, relative: the response has one relative "
+            "url_template for all checks. Default is absolute",
+        ),
+    ] = "absolute",
+) -> ORJSONModelResponse:
     result: BaseGetCheck = await get_user_checks(
         request,
         db,
@@ -107,25 +174,102 @@ async def get_check_endpoint(
         purchase_type,
         page,
         size,
+        cursor,
+        link_format,
+    )
+    return ORJSONModelResponse(result, status_code=status.HTTP_200_OK)
+
+
+@check_router.get(
+    "/stats",
+    response_model=SalesStats,
+    status_code=status.HTTP_200_OK,
+    description="Get user daily sales split by purchasing method. Answered from daily aggregates "
+    "maintained on check creation, days are UTC.",
+    responses={
+        400: {
+            "model": HTTPExceptionModel,
+            "description": "Invalid date range",
+        },
+    },
+)
+async def get_sales_stats_endpoint(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    user: Annotated[TokenPayload, Depends(get_current_user)],
+    start_date: Annotated[
+        str | None,
+        Query(
+            title="startDate",
+            pattern=DATE_PATTERN,
+            description="Range start day, included, iso format YYYY-MM-DD",
+        ),
+    ] = None,
+    end_date: Annotated[
+        str | None,
+        Query(
+            title="endDate",
+            pattern=DATE_PATTERN,
+            description="Range end day, included, iso format YYYY-MM-DD",
+        ),
+    ] = None,
+    purchase_type: Annotated[
+        Literal["cashless", "cash"] | None,
+        Query(title="purchaseType", description="Filtering purchase type. Valid value: cashless, cash"),
+    ] = None,
+) -> ORJSONModelResponse:
+    result: SalesStats = await get_user_sales_stats(db, user, start_date, end_date, purchase_type)
+    return ORJSONModelResponse(result, status_code=status.HTTP_200_OK)
+
+
+@check_router.get(
+    "/export",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    description="Export all user checks with sold products as NDJSON (one check per line) or CSV "
+    "(one sold product per line). The export is streamed, so it is not limited by page size.",
+    responses={
+        200: {"content": {media_type: {} for media_type in EXPORT_MEDIA_TYPES.values()}},
+    },
+)
+async def export_check_endpoint(
+    session_factory: Annotated[async_sessionmaker, Depends(get_session_factory)],
+    user: Annotated[TokenPayload, Depends(get_current_user)],
+    filter_params: Annotated[FilteringParams, Depends()],
+    sorting_rule: Annotated[
+        Literal["asc", "desc"],
+        Query(title="sortingRule", description="Sorting rule, asc or desc. Default is asc"),
+    ] = "asc",
+    export_format: Annotated[
+        Literal["ndjson", "csv"],
+        Query(title="format", description="Export format, ndjson or csv. Default is ndjson", alias="format"),
+    ] = "ndjson",
+) -> StreamingResponse:
+    return StreamingResponse(
+        export_user_checks(session_factory, user, filter_params, sorting_rule, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="checks.{export_format}"'},
     )
-    return result
 
 
 @check_router.get(
     "/printcheck",
-    response_class=HTMLResponse,
+    response_class=Response,
     status_code=status.HTTP_200_OK,
-    description="Print check by check identifier",
+    description="Print check by check identifier as HTML, plain text, ESC/POS commands for thermal printers or PDF",
     name=settings.print_check_endpoint_name,
     responses={
+        200: {"content": {media_type: {} for media_type in RECEIPT_MEDIA_TYPES.values()}},
+        304: {
+            "description": "Receipt is not modified, the If-None-Match header matches the receipt ETag",
+        },
         404: {
             "model": HTTPExceptionModel,
             "description": "Error creating error massages",
         },
     },
 )
-# @cache(coder=ORJsonCoder) !!!! Uncomment this line to enable caching in production
 async def print_check_endpoint(
+    request: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
     check_identifier: Annotated[
         UUID, Query(title="checkIdentifier", description="Check identifier", alias=settings.check_identifier)
@@ -141,6 +285,17 @@ async def print_check_endpoint(
             default_factory=lambda: settings.check_default_line_width,
         ),
     ],
-) -> HTMLResponse:
-    recept: str = await print_receipt(db, check_identifier, str_length)
-    return HTMLResponse(recept)
+    receipt_format: Annotated[
+        ReceiptFormat,
+        Query(title="format", description="Receipt format, html, text, escpos or pdf. Default is html", alias="format"),
+    ] = "html",
+) -> Response:
+    headers = {
+        "ETag": receipt_etag(check_identifier, str_length, receipt_format),
+        "Cache-Control": receipt_cache_control(),
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        await ensure_receipt_exists(db, check_identifier, str_length, receipt_format)
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    receipt: bytes = await print_receipt(db, check_identifier, str_length, receipt_format)
+    return Response(receipt, media_type=RECEIPT_MEDIA_TYPES[receipt_format], headers=headers)
@@ -0,0 +1,142 @@
+import csv
+import io
+from typing import AsyncIterator, Literal, List, Dict, Any
+
+import orjson
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.repositories.check_repository import CheckRepository
+from src.services.auth.schemas.user_auth import TokenPayload
+from src.services.checks.schemas.check_get_schema import FilteringParams
+from src.utils.convert.money import to_money
+from src.utils.logging.set_logging import set_logger
+
+logger = set_logger()
+
+# Size of the text buffered before it is sent to the client
+EXPORT_CHUNK_SIZE = 64 * 1024
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+CSV_HEADER = [
+    "check_id",
+    "created_at",
+    "purchasing_method",
+    "total_price",
+    "check_rest",
+    "product_id",
+    "product_name",
+    "product_price",
+    "product_discount",
+    "product_quantity",
+    "product_total_price",
+    "product_units",
+]
+
+
+async def export_user_checks(
+    session_factory: async_sessionmaker,
+    user: TokenPayload,
+    filter_params: FilteringParams,
+    sorting_rule: Literal["asc", "desc"] = "asc",
+    export_format: Literal["ndjson", "csv"] = "ndjson",
+) -> AsyncIterator[str]:
+    """
+    Stream all user checks with sold products.
+    The generator opens its own session, because it runs after the request dependencies are closed.
+    :param session_factory: Database session factory
+    :param user: User token payload
+    :param filter_params: Checks filtering params
+    :param sorting_rule: Sorting rule, asc or desc
+    :param export_format: ndjson, one check with its products per line, or csv, one sold product per line
+    :return: Async iterator of text chunks
+    """
+    lines = format_ndjson_lines if export_format == "ndjson" else format_csv_lines
+    buffer: List[str] = []
+    buffer_size = 0
+    async with session_factory() as session:
+        check_repo: CheckRepository = CheckRepository(session)
+        rows: AsyncIterator[Row] = check_repo.stream_user_checks_with_products(
+            user.user_id, filter_params, sorting_rule
+        )
+        try:
+            async for line in lines(rows):
+                buffer.append(line)
+                buffer_size += len(line)
+                if buffer_size >= EXPORT_CHUNK_SIZE:
+                    yield "".join(buffer)
+                    buffer, buffer_size = [], 0
+        except Exception:
+            logger.exception("An unexpected error occurred while exporting checks")
+            raise
+    if buffer:
+        yield "".join(buffer)
+
+
+async def format_ndjson_lines(rows: AsyncIterator[Row]) -> AsyncIterator[str]:
+    """
+    Group consecutive rows of one check into a json line
+    :param rows: Check rows joined with sold products
+    :return: Async iterator of json lines
+    """
+    check: Dict[str, Any] | None = None
+    async for row in rows:
+        if check is None or check["id"] != row.check_identifier:
+            if check is not None:
+                yield orjson.dumps(check, default=str).decode() + "\n"
+            check = {
+                "id": row.check_identifier,
+                "created_at": row.check_datetime,
+                "purchasing_method": row.check_purchasing_method,
+                "total_price": to_money(row.check_total_price),
+                "check_rest": to_money(row.check_rest),
+                "check_products": [],
+            }
+        if row.sold_product_id is not None:
+            check["check_products"].append(
+                {
+                    "product_id": row.sold_product_id,
+                    "product_name": row.sold_product_title,
+                    "product_price": to_money(row.sold_price),
+                    "product_discount": row.sold_discount,
+                    "product_quantity": row.sold_quantity,
+                    "product_total_price": to_money(row.sold_total_price),
+                    "product_units": row.sold_units,
+                }
+            )
+    if check is not None:
+        yield orjson.dumps(check, default=str).decode() + "\n"
+
+
+async def format_csv_lines(rows: AsyncIterator[Row]) -> AsyncIterator[str]:
+    """
+    Format every row as a csv line, check columns are repeated for each sold product
+    :param rows: Check rows joined with sold products
+    :return: Async iterator of csv lines
+    """
+    line = io.StringIO()
+    writer = csv.writer(line)
+
+    def format_line(values: List[Any]) -> str:
+        line.seek(0)
+        line.truncate()
+        writer.writerow(values)
+        return line.getvalue()
+
+    yield format_line(CSV_HEADER)
+    async for row in rows:
+        yield format_line(
+            [
+                row.check_identifier,
+                row.check_datetime.isoformat(),
+                row.check_purchasing_method,
+                to_money(row.check_total_price),
+                to_money(row.check_rest),
+                row.sold_product_id,
+                row.sold_product_title,
+                to_money(row.sold_price) if row.sold_price is not None else None,
+                row.sold_discount,
+                row.sold_quantity,
+                to_money(row.sold_total_price) if row.sold_total_price is not None else None,
+                row.sold_units,
+            ]
+        )
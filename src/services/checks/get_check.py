@@ -1,27 +1,26 @@
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
-from typing import Literal, List, Union
+from typing import Literal, List, Union, Tuple
 
-from pydantic_core import Url
 from sqlalchemy.exc import SQLAlchemyError
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.requests import Request
 
-from src.repositories.essence_repository import UserEssenceRepository
+from src.models.check_model import Check
+from src.repositories.check_repository import CheckRepository
 from src.services.auth.schemas.user_auth import TokenPayload
-from src.services.checks.check_http_exception import page_number_out_of_bounds
+from src.services.checks.check_http_exception import page_number_out_of_bounds, invalid_cursor
 from src.services.checks.schemas.check_get_schema import (
     CheckGet,
     CheckProductGet,
     BaseGetCheck,
-    Pagination,
     FilteringParams,
     PaginationInfo,
 )
-from src.services.checks.schemas.checks_schemas import ReadCheck
-from src.utils.convert.number_to_decimal import number_to_decimal
-from src.utils.link.create_check_link import get_check_link
+from src.utils.convert.money import to_money_many
+from src.utils.cursor.check_cursor import decode_check_cursor, encode_check_cursor, hash_cursor_filters
+from src.utils.link.create_check_link import get_check_link_template, build_check_link
 from src.utils.logging.set_logging import set_logger
 
 logger = set_logger()
@@ -39,6 +38,8 @@ async def get_user_checks(
     purchase_type: Literal["cashless", "cash"] | None = None,
     page: int = 1,
     size: int = 10,
+    cursor: str | None = None,
+    link_format: Literal["absolute", "relative"] = "absolute",
 ) -> BaseGetCheck:
     try:
         return await get_user_checks_processing(
@@ -53,6 +54,8 @@ async def get_user_checks(
             purchase_type=purchase_type,
             page=page,
             size=size,
+            cursor=cursor,
+            link_format=link_format,
         )
 
     except SQLAlchemyError as e:
@@ -75,6 +78,8 @@ async def get_user_checks_processing(
     purchase_type: Literal["cashless", "cash"] | None = None,
     page: int = 1,
     size: int = 10,
+    cursor: str | None = None,
+    link_format: Literal["absolute", "relative"] = "absolute",
 ) -> BaseGetCheck:
     """
     Get user checks info
@@ -88,9 +93,11 @@ async def get_user_checks_processing(
     :param purchase_type: The check purchasing type, cashless or cash
     :param page: Page number
     :param size: Page size
+    :param cursor: Opaque cursor of the last seen check, keyset pagination is used instead of page when set
+    :param link_format: absolute: every check has its print url, relative: one relative url template for all checks
     :return: List of user checks
     """
-    user_essence_repository = UserEssenceRepository(db)
+    check_repository = CheckRepository(db)
     filtering_params = FilteringParams(
         start_date=start_date,
         end_date=end_date,
@@ -99,39 +106,69 @@ async def get_user_checks_processing(
         purchase_type=purchase_type,
     )
 
-    offset = await set_limit_offset(page, size)
-    filter_data = await user_essence_repository.get_user_essence_by_user_id(
-        filter_params=filtering_params, sorting_rule=sorting_rule, user_id=user.user_id, offset=offset
-    )
-    if not filter_data:
-        pagination = await pagination_calculation(page, size, [])
+    filters_hash: str = hash_cursor_filters(filtering_params.model_dump(mode="json"))
+
+    pagination_info: PaginationInfo | None = None
+    if cursor:
+        try:
+            after_datetime, after_id, cursor_sorting_rule, cursor_filters_hash = decode_check_cursor(cursor)
+        except ValueError:
+            raise invalid_cursor(["Cursor is malformed, use next_cursor from the previous page"])
+        # A cursor continues the range of the query it was issued for, other sorting or filters would skip checks
+        if cursor_sorting_rule != sorting_rule or cursor_filters_hash != filters_hash:
+            raise invalid_cursor(["Cursor was issued for another sorting rule or filters, start from the first page"])
+        after: Tuple[datetime, int] = (after_datetime, after_id)
+        # One extra row tells whether a next page exists without counting all checks
+        checks: List[Check] = await check_repository.get_user_checks(
+            user_id=user.user_id, filter_params=filtering_params, sorting_rule=sorting_rule, limit=size + 1, after=after
+        )
+        has_next_page: bool = len(checks) > size
+        checks = checks[:size]
     else:
-        pagination = await pagination_calculation(page, size, filter_data.user_checks)
+        total_elements: int = await check_repository.count_user_checks(user.user_id, filtering_params)
+        pagination_info = await pagination_calculation(page, size, total_elements)
+        offset = await set_limit_offset(page, size)
+        checks = await check_repository.get_user_checks(
+            user_id=user.user_id, filter_params=filtering_params, sorting_rule=sorting_rule, limit=size, offset=offset
+        )
+        has_next_page = pagination_info.next_page is not None
+    next_cursor: str | None = None
+    if has_next_page and checks:
+        next_cursor = encode_check_cursor(checks[-1].check_datetime, checks[-1].id, sorting_rule, filters_hash)
+    link_template: str = get_check_link_template(request, link_format)
     checks_list: List[CheckGet] = []
-    for check in pagination.checks:
+    for check in checks:
+        total_price, check_rest = to_money_many((check.check_total_price, check.check_rest))
         check_dict = {
             "id": check.check_identifier,
             "created_at": check.check_datetime,
             "purchasing_method": check.check_purchasing_method,
-            "total_price": number_to_decimal(check.check_total_price),
-            "check_rest": number_to_decimal(check.check_rest),
+            "total_price": total_price,
+            "check_rest": check_rest,
             "check_products": [],
         }
         for product in check.check_products:
+            product_price, product_total_price = to_money_many((product.sold_price, product.sold_total_price))
             product_dict = {
                 "product_id": product.sold_product_id,
                 "product_name": product.sold_product_title,
-                "product_price": number_to_decimal(product.sold_price),
+                "product_price": product_price,
                 "product_discount": product.sold_discount,
                 "product_quantity": product.sold_quantity,
-                "product_total_price": number_to_decimal(product.sold_total_price),
+                "product_total_price": product_total_price,
                 "product_units": product.sold_units,
             }
             check_dict["check_products"].append(CheckProductGet(**product_dict))
-        link: Url = await get_check_link(check.check_identifier, request)
-        checks_list.append(CheckGet(**check_dict, url=link))
-
-    return BaseGetCheck(pagination=pagination.pagination_info, checks=checks_list)
+        if link_format == "absolute":
+            check_dict["url"] = build_check_link(link_template, check.check_identifier)
+        checks_list.append(CheckGet(**check_dict))
+
+    return BaseGetCheck(
+        pagination=pagination_info,
+        checks=checks_list,
+        next_cursor=next_cursor,
+        url_template=link_template if link_format == "relative" else None,
+    )
 
 
 async def set_limit_offset(page: int, size: int) -> int:
@@ -148,26 +185,26 @@ async def set_limit_offset(page: int, size: int) -> int:
 async def pagination_calculation(
     page: int,
     size: int,
-    items: List[ReadCheck],
-) -> Pagination:
-    check_count, total_pages, previous_page, next_page = await count_all_user_checks(len(items), size, page)
-    pagination_info: PaginationInfo = PaginationInfo(
+    total_elements: int,
+) -> PaginationInfo:
+    """
+    Build pagination info from the total number of matching checks
+    :param page: Page number
+    :param size: Page size
+    :param total_elements: Total number of checks, counted in db
+    :return: PaginationInfo instance
+    """
+    check_count, total_pages, previous_page, next_page = await count_all_user_checks(total_elements, size, page)
+    return PaginationInfo(
         total_pages=total_pages,
         total_elements=check_count,
         previous_page=previous_page,
         next_page=next_page,
     )
-    start_index = (page - 1) * size
-    end_index = start_index + size
-    paginated_list: List[ReadCheck] = items[start_index:end_index]
-    return Pagination(
-        pagination_info=pagination_info,
-        checks=paginated_list,
-    )
 
 
 async def count_all_user_checks(
-    total_elements_query: int,
+    total_elements: int,
     size: int,
     page: int,
 ) -> tuple[int, int, Union[int, None], Union[int, None]]:
@@ -178,16 +215,10 @@ async def count_all_user_checks(
     :param page: Page number
     :return: Tuple of total elements, total pages, previous page and next page
     """
-    if total_elements_query == 0 and page != 1:
-        raise page_number_out_of_bounds(["Page number is out of bounds"])
-    total_elements = total_elements_query + ((page - 1) * size)
-    print(total_elements, size, page)
     if total_elements == 0:
+        if page != 1:
+            raise page_number_out_of_bounds(["Page number is out of bounds"])
         return 0, 0, None, None
-    if total_elements < size:
-        return total_elements, 1, None, None
-    if total_elements == size:
-        return total_elements, 1, None, None
     total_pages = total_elements // size
     if total_elements % size != 0:
         total_pages += 1
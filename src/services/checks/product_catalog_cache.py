@@ -0,0 +1,120 @@
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from redis.exceptions import RedisError
+
+from src.services.checks.schemas.checks_schemas import CatalogProduct
+from src.settings.checkbox_settings import settings
+from src.utils.cache.cache_backend import get_cache_backend, build_cache_key
+from src.utils.logging.set_logging import set_logger
+from src.utils.metrics.prometheus_metrics import cache_requests_total
+
+logger = set_logger()
+
+PRODUCT_CATALOG_VERSION_KEY = "product_catalog:version"
+PRODUCT_CATALOG_CACHE = "product_catalog"
+
+
+class ProductCatalogCache:
+    """
+    Per-worker LRU cache of catalog products, key is product title.
+
+    Entries expire after `ttl` seconds. All entries are dropped when the catalog version shared
+    through the cache backend changes, see bump_product_catalog_version.
+    """
+
+    def __init__(self, max_size: int, ttl: int):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._products: OrderedDict[str, Tuple[float, CatalogProduct]] = OrderedDict()
+        self._version: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+    def get_many(self, names: List[str]) -> Tuple[Dict[str, CatalogProduct], List[str]]:
+        """
+        Get cached products.
+
+        :param names: List of product titles.
+        :return: Tuple of found products dict (key is product title) and titles which are not cached.
+        """
+        now = time.monotonic()
+        found: Dict[str, CatalogProduct] = {}
+        missing: List[str] = []
+        for name in dict.fromkeys(names):
+            entry = self._products.get(name)
+            if entry is None or entry[0] < now:
+                self._products.pop(name, None)
+                missing.append(name)
+                continue
+            self._products.move_to_end(name)
+            found[name] = entry[1]
+        cache_requests_total.labels(cache=PRODUCT_CATALOG_CACHE, result="hit").inc(len(found))
+        cache_requests_total.labels(cache=PRODUCT_CATALOG_CACHE, result="miss").inc(len(missing))
+        return found, missing
+
+    def put_many(self, products: List[CatalogProduct]) -> None:
+        """
+        Cache products, evicting the least recently used ones above max_size.
+
+        :param products: List of CatalogProduct.
+        :return: None
+        """
+        expires_at = time.monotonic() + self.ttl
+        for product in products:
+            self._products[product.product_title] = (expires_at, product)
+            self._products.move_to_end(product.product_title)
+        while len(self._products) > self.max_size:
+            self._products.popitem(last=False)
+
+    def set_version(self, version: Optional[str]) -> None:
+        """
+        Apply the shared catalog version, the cache is cleared when it differs from the last seen one.
+
+        :param version: Catalog version from the cache backend, None if it is not set.
+        :return: None
+        """
+        if version != self._version:
+            self.clear()
+            self._version = version
+
+    def clear(self) -> None:
+        self._products.clear()
+
+    async def sync_version(self) -> bool:
+        """
+        Read the shared catalog version from the cache backend.
+
+        :return: bool: False if the version can not be read, cached products must not be used then.
+        """
+        backend = get_cache_backend()
+        if backend is None:
+            return True
+        try:
+            version = await backend.get(build_cache_key(PRODUCT_CATALOG_VERSION_KEY))
+        except (RedisError, OSError) as e:
+            logger.warning(f"Product catalog version read failed: {e}")
+            self.clear()
+            return False
+        self.set_version(version.decode() if isinstance(version, bytes) else version)
+        return True
+
+
+product_catalog_cache = ProductCatalogCache(max_size=settings.product_cache_max_size, ttl=settings.product_cache_ttl)
+
+
+async def bump_product_catalog_version() -> None:
+    """
+    Invalidate product catalog caches of all workers.
+    Call it after products or prices are changed.
+
+    :return: None
+    """
+    backend = get_cache_backend()
+    if backend is None:
+        product_catalog_cache.clear()
+        return
+    await backend.set(build_cache_key(PRODUCT_CATALOG_VERSION_KEY), uuid4().hex.encode())
@@ -0,0 +1,100 @@
+from typing import Optional
+from uuid import UUID
+
+from fastapi_cache.backends import Backend
+from redis.exceptions import RedisError
+
+from src.settings.checkbox_settings import settings
+from src.utils.cache.cache_backend import get_cache_backend, build_cache_key
+from src.utils.logging.set_logging import set_logger
+from src.utils.metrics.prometheus_metrics import cache_requests_total
+
+logger = set_logger()
+
+# Bump when the receipt layout changes, so cached receipts and client ETags are not reused
+RECEIPT_LAYOUT_VERSION = 2
+RECEIPT_CACHE_NAMESPACE = "receipt"
+RECEIPT_CACHE = "receipt"
+
+
+def receipt_cache_key(check_identifier: UUID, str_length: int, receipt_format: str = "html") -> str:
+    """
+    Build the cache key of a rendered receipt.
+
+    :param check_identifier: UUID: Check identifier.
+    :param str_length: int: Receipt line width.
+    :param receipt_format: str: Receipt format.
+    :return: str: Cache key.
+    """
+    return build_cache_key(
+        RECEIPT_CACHE_NAMESPACE, f"v{RECEIPT_LAYOUT_VERSION}", check_identifier, str_length, receipt_format
+    )
+
+
+def receipt_etag(check_identifier: UUID, str_length: int, receipt_format: str = "html") -> str:
+    """
+    Build the ETag of a rendered receipt. Checks are immutable, so the ETag depends only on the key.
+
+    :param check_identifier: UUID: Check identifier.
+    :param str_length: int: Receipt line width.
+    :param receipt_format: str: Receipt format.
+    :return: str: Quoted ETag value.
+    """
+    return f'"{check_identifier}-{str_length}-{receipt_format}-v{RECEIPT_LAYOUT_VERSION}"'
+
+
+def receipt_cache_control() -> str:
+    """Cache-Control header value for rendered receipts."""
+    return f"public, max-age={settings.receipt_cache_ttl}, immutable"
+
+
+def get_receipt_cache_backend() -> Optional[Backend]:
+    """Get cache backend initialized at startup, None if cache is disabled or not initialized."""
+    if not settings.receipt_cache_enabled:
+        return None
+    return get_cache_backend()
+
+
+async def get_cached_receipt(check_identifier: UUID, str_length: int, receipt_format: str = "html") -> Optional[bytes]:
+    """
+    Get rendered receipt from the cache.
+
+    :param check_identifier: UUID: Check identifier.
+    :param str_length: int: Receipt line width.
+    :param receipt_format: str: Receipt format.
+    :return: bytes | None: Rendered receipt or None on cache miss or cache failure.
+    """
+    backend = get_receipt_cache_backend()
+    if backend is None:
+        return None
+    try:
+        receipt = await backend.get(receipt_cache_key(check_identifier, str_length, receipt_format))
+    except (RedisError, OSError) as e:
+        logger.warning(f"Receipt cache read failed: {e}")
+        cache_requests_total.labels(cache=RECEIPT_CACHE, result="error").inc()
+        return None
+    cache_requests_total.labels(cache=RECEIPT_CACHE, result="miss" if receipt is None else "hit").inc()
+    return receipt
+
+
+async def set_cached_receipt(
+    check_identifier: UUID, str_length: int, receipt: bytes, receipt_format: str = "html"
+) -> None:
+    """
+    Store rendered receipt in the cache. Cache failures are logged and ignored.
+
+    :param check_identifier: UUID: Check identifier.
+    :param str_length: int: Receipt line width.
+    :param receipt: bytes: Rendered receipt.
+    :param receipt_format: str: Receipt format.
+    :return: None
+    """
+    backend = get_receipt_cache_backend()
+    if backend is None:
+        return
+    try:
+        await backend.set(
+            receipt_cache_key(check_identifier, str_length, receipt_format), receipt, expire=settings.receipt_cache_ttl
+        )
+    except (RedisError, OSError) as e:
+        logger.warning(f"Receipt cache write failed: {e}")
@@ -0,0 +1,180 @@
+from functools import lru_cache
+from html import escape
+from typing import Callable, Dict, List, Literal
+
+from src.services.checks.schemas.print_schema import ReceiptData, Item
+
+ReceiptFormat = Literal["html", "text", "escpos", "pdf"]
+RECEIPT_MEDIA_TYPES: Dict[str, str] = {
+    "html": "text/html; charset=utf-8",
+    "text": "text/plain; charset=utf-8",
+    "escpos": "application/octet-stream",
+    "pdf": "application/pdf",
+}
+# Width of the right column with amounts, the left column takes the rest of the line
+AMOUNT_WIDTH = 20
+
+HTML_HEAD = '<!DOCTYPE html><html><head><meta charset="utf-8"><title>Receipt</title></head><body><pre>'
+HTML_TAIL = "</pre></body></html>"
+
+# ESC @ resets the printer, ESC t 46 selects WPC1251, which covers latin and cyrillic product names
+ESCPOS_INIT = b"\x1b@\x1bt\x2e"
+ESCPOS_ENCODING = "cp1251"
+# GS V 66 3 feeds three lines past the cutter and cuts the paper
+ESCPOS_CUT = b"\n\x1dV\x42\x03"
+
+# Courier glyphs are 0.6 em wide, so a line of line_width characters fits the page exactly
+PDF_FONT_SIZE = 8
+PDF_LEADING = 10
+PDF_MARGIN = 12
+# Standard PDF fonts are not embedded and support WinAnsi (cp1252) only, other characters are printed as "?"
+PDF_ENCODING = "cp1252"
+
+
+class ReceiptLayout:
+    """
+    Receipt layout of one line width, compiled into format templates once.
+
+    Padding, separators and labels are part of the templates, rendering formats the header, one template
+    per item and the footer, and joins them once.
+    """
+
+    def __init__(self, line_width: int):
+        self.line_width = line_width
+        label_width = max(line_width - AMOUNT_WIDTH, 0)
+        separator = "=" * line_width
+        self._header = f"{{owner_name:^{line_width}}}\n{separator}\n".format
+        self._item_left = "{quantity:.2f} x {unit_price:,.2f}".format
+        self._item = (
+            f"{{left:<{label_width}}}{{total_price:>{AMOUNT_WIDTH},.2f}}\n{{description}}\n{'-' * line_width}\n"
+        ).format
+        self._footer = (
+            f"{separator}\n"
+            f"{'SUM':>{label_width}}{{total:>{AMOUNT_WIDTH},.2f}}\n"
+            f"{{purchasing_method:>{label_width}}}{{paid:>{AMOUNT_WIDTH},.2f}}\n"
+            f"{'Rest':>{label_width}}{{rest:>{AMOUNT_WIDTH},.2f}}\n"
+            f"{separator}\n"
+            f"{{date:^{line_width}}}\n"
+            f"{{thank_you_message:^{line_width}}}"
+        ).format
+
+    def render_item(self, item: Item) -> str:
+        return self._item(
+            left=self._item_left(quantity=item.quantity, unit_price=item.unit_price),
+            total_price=item.total_price,
+            description=item.description,
+        )
+
+    def render(self, data: ReceiptData) -> str:
+        """
+        Render receipt as plain text lines separated by "\\n", without a trailing newline.
+
+        :param data: ReceiptData: Receipt data.
+        :return: str: Receipt text.
+        """
+        return "".join(
+            [
+                self._header(owner_name=data.owner_name),
+                *map(self.render_item, data.items),
+                self._footer(
+                    total=data.total,
+                    purchasing_method=data.purchasing_method,
+                    paid=data.total + data.rest,
+                    rest=data.rest,
+                    date=data.date,
+                    thank_you_message=data.thank_you_message,
+                ),
+            ]
+        )
+
+
+@lru_cache(maxsize=128)
+def get_receipt_layout(line_width: int) -> ReceiptLayout:
+    """Compiled layout of the line width, shared by all receipts of this width."""
+    return ReceiptLayout(line_width)
+
+
+def render_text(text: str, line_width: int) -> bytes:
+    return f"{text}\n".encode()
+
+
+def render_html(text: str, line_width: int) -> bytes:
+    # The text is escaped once here, cached receipts are served as they are
+    return f"{HTML_HEAD}{escape(text)}{HTML_TAIL}".encode()
+
+
+def render_escpos(text: str, line_width: int) -> bytes:
+    return ESCPOS_INIT + text.encode(ESCPOS_ENCODING, errors="replace") + ESCPOS_CUT
+
+
+def render_pdf(text: str, line_width: int) -> bytes:
+    """
+    Render a one page PDF sized to the receipt, like a thermal printer roll.
+
+    :param text: str: Receipt text.
+    :param line_width: int: Receipt line width.
+    :return: bytes: PDF document.
+    """
+    encoded: bytes = text.encode(PDF_ENCODING, errors="replace")
+    lines: List[bytes] = encoded.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)").split(b"\n")
+    width = round(line_width * PDF_FONT_SIZE * 0.6 + 2 * PDF_MARGIN)
+    height = len(lines) * PDF_LEADING + 2 * PDF_MARGIN
+    content = b"".join(
+        [
+            b"BT /F1 %d Tf %d TL %d %d Td\n("
+            % (PDF_FONT_SIZE, PDF_LEADING, PDF_MARGIN, height - PDF_MARGIN - PDF_FONT_SIZE),
+            b") Tj T*\n(".join(lines),
+            b") Tj\nET",
+        ]
+    )
+    return build_pdf(
+        [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 4 0 R >> >> "
+            b"/Contents 5 0 R >>" % (width, height),
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>",
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content),
+        ]
+    )
+
+
+def build_pdf(objects: List[bytes]) -> bytes:
+    """
+    Build a PDF document, the first object is the catalog.
+
+    :param objects: List of object bodies, object numbers start from 1.
+    :return: bytes: PDF document.
+    """
+    parts: List[bytes] = [b"%PDF-1.4\n"]
+    offsets: List[int] = []
+    offset = len(parts[0])
+    for number, body in enumerate(objects, start=1):
+        part = b"%d 0 obj\n%s\nendobj\n" % (number, body)
+        offsets.append(offset)
+        offset += len(part)
+        parts.append(part)
+    parts.append(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    parts.extend(b"%010d 00000 n \n" % object_offset for object_offset in offsets)
+    parts.append(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, offset))
+    return b"".join(parts)
+
+
+RECEIPT_RENDERERS: Dict[str, Callable[[str, int], bytes]] = {
+    "html": render_html,
+    "text": render_text,
+    "escpos": render_escpos,
+    "pdf": render_pdf,
+}
+
+
+def render_receipt(data: ReceiptData, line_width: int = 50, receipt_format: ReceiptFormat = "html") -> bytes:
+    """
+    Render receipt in the format.
+
+    :param data: ReceiptData: Receipt data.
+    :param line_width: int: Line width for the receipt.
+    :param receipt_format: html, text, escpos (thermal printer commands) or pdf.
+    :return: bytes: Rendered receipt.
+    """
+    return RECEIPT_RENDERERS[receipt_format](get_receipt_layout(line_width).render(data), line_width)
@@ -0,0 +1,107 @@
+from datetime import date
+from decimal import Decimal
+from typing import List, Literal, Dict, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .check_http_exception import invalid_date_range
+from .schemas.checks_schemas import ReadCheck
+from .schemas.sales_stats_schema import DailySalesStats, SalesStats
+from src.models.check_model import UserDailySales
+from src.repositories.sales_stats_repository import SalesStatsRepository
+from src.services.auth.schemas.user_auth import TokenPayload
+from src.utils.convert.money import to_money
+from src.utils.logging.set_logging import set_logger
+
+logger = set_logger()
+
+
+async def add_checks_to_sales_stats(new_checks: List[ReadCheck], db_session: AsyncSession) -> None:
+    """
+    Add created checks to the daily sales aggregates within the check creation transaction,
+    so the aggregates are committed or rolled back together with the checks
+    :param new_checks: List of created checks
+    :param db_session: AsyncSession db
+    :return: None
+    """
+    if not new_checks:
+        return
+    sales_stats_repo: SalesStatsRepository = SalesStatsRepository(session=db_session)
+    await sales_stats_repo.add_sales(build_sales_data(new_checks))
+
+
+def build_sales_data(new_checks: List[ReadCheck]) -> List[dict]:
+    """
+    Sum up checks per (user essence, UTC day, purchasing method)
+    :param new_checks: List of created checks
+    :return: Daily sales rows data, one per key
+    """
+    sales: Dict[Tuple[int, date, str], dict] = {}
+    for new_check in new_checks:
+        key = (new_check.check_user_essence, new_check.check_datetime.date(), new_check.check_purchasing_method)
+        row: dict | None = sales.get(key)
+        if row is None:
+            sales[key] = {
+                "sales_user_essence": key[0],
+                "sales_day": key[1],
+                "sales_purchasing_method": key[2],
+                "sales_checks_count": 1,
+                "sales_total_sum": new_check.check_total_price,
+                "sales_rest_sum": new_check.check_rest,
+            }
+        else:
+            row["sales_checks_count"] += 1
+            row["sales_total_sum"] += new_check.check_total_price
+            row["sales_rest_sum"] += new_check.check_rest
+    return list(sales.values())
+
+
+async def get_user_sales_stats(
+    db: AsyncSession,
+    user: TokenPayload,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    purchase_type: Literal["cashless", "cash"] | None = None,
+) -> SalesStats:
+    """
+    Get user daily sales in the day range from the aggregates, the checks table is not read
+    :param db: Database session
+    :param user: User token payload
+    :param start_date: Range start day, iso format YYYY-MM-DD, included
+    :param end_date: Range end day, iso format YYYY-MM-DD, included
+    :param purchase_type: The check purchasing type, cashless or cash
+    :return: SalesStats instance or raise invalid_date_range (HTTPException, 400)
+    """
+    try:
+        start_day: date | None = date.fromisoformat(start_date) if start_date else None
+        end_day: date | None = date.fromisoformat(end_date) if end_date else None
+    except ValueError:
+        raise invalid_date_range(["Date does not exist, use iso format YYYY-MM-DD"])
+    if start_day and end_day and start_day > end_day:
+        raise invalid_date_range(["Start date is after end date"])
+    try:
+        sales_stats_repo: SalesStatsRepository = SalesStatsRepository(session=db)
+        daily_sales: List[UserDailySales] = await sales_stats_repo.get_user_sales(
+            user_id=user.user_id, start_date=start_day, end_date=end_day, purchase_type=purchase_type
+        )
+    except SQLAlchemyError as e:
+        logger.exception("Database error occurred while getting sales stats")
+        raise e
+
+    days: List[DailySalesStats] = [
+        DailySalesStats(
+            day=sales.sales_day,
+            purchasing_method=sales.sales_purchasing_method,
+            checks_count=sales.sales_checks_count,
+            total_sum=to_money(sales.sales_total_sum),
+            rest_sum=to_money(sales.sales_rest_sum),
+        )
+        for sales in daily_sales
+    ]
+    return SalesStats(
+        days=days,
+        checks_count=sum(day.checks_count for day in days),
+        total_sum=sum((day.total_sum for day in days), Decimal("0.00")),
+        rest_sum=sum((day.rest_sum for day in days), Decimal("0.00")),
+    )
@@ -1,12 +1,13 @@
 from datetime import datetime
-from typing import List, Dict, Any, Literal
+from typing import List, Dict, Any, Literal, Optional
 from decimal import Decimal
 from uuid import UUID
 
 from pydantic_core import Url
 from typing_extensions import Self
 
-from src.utils.convert.number_to_decimal import number_to_decimal
+from src.services.auth.schemas.user_auth import HTTPExceptionModel
+from src.utils.convert.money import to_money
 from src.utils.validators.decimal_pleaces import validate_decimal_places
 
 from pydantic import BaseModel, Field, ConfigDict, field_validator, model_validator
@@ -95,7 +96,7 @@ class AnswerCheck(BaseModel):
 
     @field_validator("total", "rest", mode="after")
     def set_places(cls, value):
-        return number_to_decimal(value)
+        return to_money(value)
 
 
 class AnswerProduct(BaseModel):
@@ -113,7 +114,7 @@ class AnswerProduct(BaseModel):
 
     @field_validator("price", "quantity", "total", mode="after")
     def set_places(cls, value):
-        return number_to_decimal(value)
+        return to_money(value)
 
 
 class AnswerPayment(BaseModel):
@@ -130,4 +131,33 @@ class AnswerPayment(BaseModel):
 
     @field_validator("amount", mode="after")
     def set_places(cls, value):
-        return number_to_decimal(value)
+        return to_money(value)
+
+
+class AnswerBulkCheckItem(BaseModel):
+    """
+    AnswerBulkCheckItem schema, result of one check of the bulk creation
+    """
+
+    model_config = ConfigDict(
+        title="AnswerBulkCheckItem",
+    )
+
+    index: int = Field(ge=0, description="Position of the check in the request", example=0)
+    status: Literal["created", "failed"] = Field(description="Check creation status", example="created")
+    check: Optional["AnswerCheck"] = Field(default=None, description="Created check, set if the check is created")
+    error: Optional[HTTPExceptionModel] = Field(default=None, description="Creation error, set if the check is failed")
+
+
+class AnswerBulkCheck(BaseModel):
+    """
+    AnswerBulkCheck schema
+    """
+
+    model_config = ConfigDict(
+        title="AnswerBulkCheck",
+    )
+
+    created: int = Field(ge=0, description="Number of created checks", example=2)
+    failed: int = Field(ge=0, description="Number of failed checks", example=1)
+    results: List["AnswerBulkCheckItem"] = Field(description="Results in the order of the request checks")
@@ -460,6 +460,33 @@ class ReadProduct(ProductCreate):
     )
 
 
+class CatalogProduct(ProductCreate):
+    """
+    Represents the immutable part of a product used for check creation.
+    It is kept in the per-worker product catalog cache, so it holds no stock quantity.
+    """
+
+    model_config = ConfigDict(
+        title="CatalogProduct",
+        from_attributes=True,
+        frozen=True,
+    )
+    id: int = Field(
+        title="productId",
+        description="The product id",
+        example="1",
+    )
+    product_price: "ReadProductPrice" = Field(
+        title="productPrice",
+        description="The product price",
+    )
+    stock_id: int = Field(
+        title="stockId",
+        description="The product stock id",
+        example="1",
+    )
+
+
 class UserEssenceCreate(BaseModel):
     """
     Represents a user essence model used to collect all necessary data to create a new user essence.
@@ -492,6 +519,12 @@ class ReadUserEssence(UserEssenceCreate):
         description="The user essence id",
         example="1",
     )
+    owner_name: Optional[str] = Field(
+        default=None,
+        title="ownerName",
+        description="The user first and last name, printed on receipts",
+        example="John Doe",
+    )
 
     user_checks: Optional[List["ReadCheck"]] = Field(
         title="userChecks",
@@ -0,0 +1,62 @@
+from datetime import date
+from decimal import Decimal
+from typing import Literal, List
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class DailySalesStats(BaseModel):
+    model_config = ConfigDict(
+        title="DailySalesStats",
+    )
+    day: date = Field(
+        title="day",
+        description="The sales day, UTC",
+        example="2024-05-06",
+    )
+    purchasing_method: Literal["cashless", "cash"] = Field(
+        title="purchasingMethod",
+        description="The checks purchasing method",
+        example="cash",
+    )
+    checks_count: int = Field(
+        title="checksCount",
+        description="The number of checks",
+        example=12,
+    )
+    total_sum: Decimal = Field(
+        title="totalSum",
+        description="The sum of the checks total price",
+        example="1200.00",
+    )
+    rest_sum: Decimal = Field(
+        title="restSum",
+        description="The sum of the checks exchange",
+        example="35.50",
+    )
+
+
+class SalesStats(BaseModel):
+    model_config = ConfigDict(
+        title="SalesStats",
+    )
+    days: List[DailySalesStats] = Field(
+        default_factory=list,
+        title="days",
+        description="Daily sales split by purchasing method, ordered by day. Days without checks are omitted",
+    )
+    checks_count: int = Field(
+        title="checksCount",
+        description="The number of checks in the range",
+        example=12,
+    )
+    total_sum: Decimal = Field(
+        title="totalSum",
+        description="The sum of the checks total price in the range",
+        example="1200.00",
+    )
+    rest_sum: Decimal = Field(
+        title="restSum",
+        description="The sum of the checks exchange in the range",
+        example="35.50",
+    )
@@ -0,0 +1,32 @@
+from fastapi import routing
+from starlette import status
+from starlette.responses import Response
+
+from src.database.database_connect import engine
+from src.services.metrics.pool_metrics import get_pool_metrics
+from src.services.metrics.schemas.pool_metrics_schema import PoolMetrics
+from src.utils.metrics.prometheus_metrics import render_metrics
+
+metrics_router = routing.APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@metrics_router.get(
+    "",
+    response_class=Response,
+    status_code=status.HTTP_200_OK,
+    description="Prometheus metrics of all workers: request latency per endpoint, requests in progress, "
+    "db pool usage, cache hits and misses, stock reservation conflicts",
+)
+async def get_prometheus_metrics_endpoint() -> Response:
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
+
+
+@metrics_router.get(
+    "/pool",
+    response_model=PoolMetrics,
+    status_code=status.HTTP_200_OK,
+    description="Db connection pool usage and checkout wait time of the worker which serves the request",
+)
+async def get_pool_metrics_endpoint() -> PoolMetrics:
+    return get_pool_metrics(engine.pool)
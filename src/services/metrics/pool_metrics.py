@@ -0,0 +1,29 @@
+from sqlalchemy.pool import QueuePool
+
+from src.database.pool_metrics import PoolCheckoutStats, pool_checkout_stats
+from src.services.metrics.schemas.pool_metrics_schema import PoolMetrics
+
+
+def get_pool_metrics(pool: QueuePool, stats: PoolCheckoutStats = pool_checkout_stats) -> PoolMetrics:
+    """
+    Get current usage and checkout statistics of the engine pool
+    :param pool: Engine pool
+    :param stats: Checkout statistics of the pool
+    :return: PoolMetrics instance
+    """
+    max_overflow: int = pool._max_overflow
+    capacity: int = pool.size() + max(max_overflow, 0)
+    checked_out: int = pool.checkedout()
+    return PoolMetrics(
+        pool_size=pool.size(),
+        max_overflow=max_overflow,
+        checked_out=checked_out,
+        checked_in=pool.checkedin(),
+        overflow=max(pool.overflow(), 0),
+        saturation=checked_out / capacity if capacity else 0.0,
+        checkouts=stats.checkouts,
+        checkout_timeouts=stats.timeouts,
+        checkout_wait_seconds_total=stats.wait_seconds_total,
+        checkout_wait_seconds_avg=stats.wait_seconds_total / stats.checkouts if stats.checkouts else 0.0,
+        checkout_wait_seconds_max=stats.wait_seconds_max,
+    )
@@ -0,0 +1,25 @@
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class PoolMetrics(BaseModel):
+    """
+    PoolMetrics schema, db connection pool usage of one worker
+    """
+
+    model_config = ConfigDict(
+        title="PoolMetrics",
+    )
+
+    pool_size: int = Field(ge=0, description="Number of connections kept in the pool", example=10)
+    max_overflow: int = Field(description="Number of connections allowed above pool size", example=10)
+    checked_out: int = Field(ge=0, description="Number of connections in use", example=3)
+    checked_in: int = Field(ge=0, description="Number of idle connections in the pool", example=7)
+    overflow: int = Field(ge=0, description="Number of open connections above pool size", example=0)
+    saturation: float = Field(
+        ge=0, description="Share of connections in use of pool size plus max overflow", example=0.15
+    )
+    checkouts: int = Field(ge=0, description="Number of connection checkouts", example=1500)
+    checkout_timeouts: int = Field(ge=0, description="Number of checkouts failed by pool timeout", example=0)
+    checkout_wait_seconds_total: float = Field(ge=0, description="Total checkout wait time in seconds", example=0.4)
+    checkout_wait_seconds_avg: float = Field(ge=0, description="Average checkout wait time in seconds", example=0.0003)
+    checkout_wait_seconds_max: float = Field(ge=0, description="Maximum checkout wait time in seconds", example=0.02)
@@ -1,5 +1,6 @@
 import os.path
 from pathlib import Path
+from typing import Literal
 
 from pydantic import SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -27,10 +28,40 @@ class Settings(BaseSettings):
         log_level (str): Defines the severity level of logs to capture.
         json_logs (bool): Determines if logs should be output in JSON format.
         gunicorn_workers (int): Number of worker processes for handling requests, used when running with Gunicorn.
+            0 or less uses the number of CPUs available to the process.
+        gunicorn_preload_app (bool): Imports the application once in the gunicorn master before forking workers.
         fastapi_host (str): Hostname to bind the FastAPI application to.
         fastapi_port (str): Port to bind the FastAPI application to.
         jwt_secret_signature (SecretStr): Secret key used for signing JWTs, stored as a secret.
         api_prefix (str): Prefix for API routes, typically used for versioning or endpoint grouping.
+        receipt_cache_enabled (bool): Enables the Redis cache of rendered receipts.
+        receipt_cache_ttl (int): Time to live of cached receipts in seconds, also used as Cache-Control max-age.
+        product_cache_enabled (bool): Enables the per-worker product catalog cache used by check creation.
+        product_cache_max_size (int): Maximum number of products kept in the catalog cache of one worker.
+        product_cache_ttl (int): Time to live of cached products in seconds, bounds staleness of direct db changes.
+        bulk_check_max_size (int): Maximum number of checks in one bulk creation request.
+        token_cache_enabled (bool): Enables the per-worker cache of verified token claims.
+        token_cache_max_size (int): Maximum number of tokens kept in the claims cache of one worker.
+        password_hash_executor (str): Where password hashing runs, "process" or "thread" pool.
+        password_hash_workers (int): Number of concurrent password hashing jobs of one worker.
+        password_hash_queue_size (int): Number of password hashing jobs waiting for the pool, more are rejected.
+        idempotency_enabled (bool): Deduplicates check creation retries by the Idempotency-Key header in Redis.
+        idempotency_ttl (int): Seconds a check creation response is kept for replay.
+        idempotency_lock_ttl (int): Seconds after which the lock of an unfinished request expires.
+        idempotency_lock_wait (float): Seconds a duplicate request waits for the first one to finish.
+        idempotency_poll_interval (float): Seconds between checks of a waiting duplicate request.
+        db_echo (bool): Logs every SQL statement, for debugging only.
+        db_pool_size (int): Number of connections kept in the pool of one worker.
+        db_max_overflow (int): Number of connections allowed above the pool size.
+        db_pool_timeout (float): Seconds to wait for a free connection before failing.
+        db_pool_pre_ping (bool): Checks a connection with a ping on checkout.
+        db_pool_recycle (int): Seconds after which a connection is reopened, -1 disables it.
+        db_statement_cache_size (int): Number of prepared statements cached per connection, 0 disables it.
+        db_query_stats_headers (bool): Reports SQL statements count and time of a request in the X-DB-Queries
+            and Server-Timing response headers.
+        prometheus_metrics_enabled (bool): Records request latency and requests in progress for the /metrics endpoint.
+        prometheus_multiproc_dir (str): Directory where gunicorn workers keep their Prometheus metrics,
+            cleared by `run.py serve` on start. Empty keeps metrics in the memory of the process.
 
     Methods:
         get_db_url() -> str:
@@ -61,6 +92,7 @@ class Settings(BaseSettings):
     log_level: str
     json_logs: bool
     gunicorn_workers: int
+    gunicorn_preload_app: bool = True
     fastapi_host: str
     fastapi_port: str
     jwt_secret_signature: SecretStr
@@ -72,6 +104,34 @@ class Settings(BaseSettings):
     print_check_endpoint_name: str
     str_length: str = "str_length"
     check_identifier: str = "check_identifier"
+    receipt_cache_enabled: bool = True
+    receipt_cache_ttl: int = 86400
+    product_cache_enabled: bool = True
+    product_cache_max_size: int = 1024
+    product_cache_ttl: int = 60
+    bulk_check_max_size: int = 1000
+    token_cache_enabled: bool = True
+    token_cache_max_size: int = 4096
+    password_hash_executor: Literal["process", "thread"] = "process"
+    password_hash_workers: int = 2
+    password_hash_queue_size: int = 32
+    idempotency_enabled: bool = True
+    idempotency_ttl: int = 86400
+    idempotency_lock_ttl: int = 30
+    idempotency_lock_wait: float = 10
+    idempotency_poll_interval: float = 0.05
+    # Db engine settings
+    db_echo: bool = False
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_pre_ping: bool = True
+    db_pool_recycle: int = 1800
+    db_statement_cache_size: int = 500
+    db_query_stats_headers: bool = True
+    # Prometheus settings
+    prometheus_metrics_enabled: bool = True
+    prometheus_multiproc_dir: str = "/tmp/checkbox_prometheus"
 
     def get_test_db_url(self) -> str:
         """
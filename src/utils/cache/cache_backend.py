@@ -0,0 +1,26 @@
+from typing import Optional
+
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends import Backend
+
+
+def get_cache_backend() -> Optional[Backend]:
+    """
+    Get cache backend initialized at startup.
+
+    :return: Backend | None: Cache backend or None if the cache is not initialized.
+    """
+    try:
+        return FastAPICache.get_backend()
+    except AssertionError:
+        return None
+
+
+def build_cache_key(*parts: object) -> str:
+    """
+    Build a cache key with the prefix used at cache initialization.
+
+    :param parts: Key parts, joined with a colon.
+    :return: str: Cache key.
+    """
+    return ":".join([FastAPICache.get_prefix(), *(str(part) for part in parts)])
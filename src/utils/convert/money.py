@@ -0,0 +1,33 @@
+from decimal import Decimal, Context, ROUND_HALF_UP
+from typing import Iterable, List
+
+MONEY_PLACES = Decimal("0.01")
+MONEY_CONTEXT = Context(prec=28, rounding=ROUND_HALF_UP)
+# Bound method, calling it is cheaper than Decimal.quantize with a context keyword argument
+_quantize = MONEY_CONTEXT.quantize
+
+
+def to_money(number: float | Decimal | int) -> Decimal:
+    """
+    Normalize a number to a money Decimal with 2 places, rounding half up.
+    Decimal and int are quantized directly, float goes through its shortest repr,
+    so 1.005 is 1.01 and not the 1.00 of its binary expansion.
+    :param number: float, Decimal or int
+    :return: Decimal
+    """
+    if isinstance(number, float):
+        return _quantize(Decimal(repr(number)), MONEY_PLACES)
+    if isinstance(number, (Decimal, int)):
+        return _quantize(number, MONEY_PLACES)
+    raise ValueError("Input must be a float, Decimal or int")
+
+
+def to_money_many(numbers: Iterable[float | Decimal | int]) -> List[Decimal]:
+    """
+    Normalize several numbers to money Decimals, see to_money
+    :param numbers: Iterable of float, Decimal or int
+    :return: List of Decimal
+    """
+    places = MONEY_PLACES
+    # Decimal is what NUMERIC columns hold, it is quantized without the type checks of to_money
+    return [_quantize(number, places) if type(number) is Decimal else to_money(number) for number in numbers]
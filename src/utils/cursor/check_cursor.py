@@ -0,0 +1,51 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from hashlib import sha256
+from typing import Tuple
+
+import orjson
+
+CURSOR_SEPARATOR = "|"
+# Hex digits of the filters hash kept in the cursor, enough to tell apart the filters of one client
+FILTERS_HASH_LENGTH = 12
+
+
+def hash_cursor_filters(filters: dict) -> str:
+    """
+    Short hash of the filters a cursor was issued for, the key order does not matter.
+
+    :param filters: dict: JSON serializable filter values.
+    :return: str: Hex hash.
+    """
+    return sha256(orjson.dumps(filters, option=orjson.OPT_SORT_KEYS)).hexdigest()[:FILTERS_HASH_LENGTH]
+
+
+def encode_check_cursor(check_datetime: datetime, check_id: int, sorting_rule: str, filters_hash: str) -> str:
+    """
+    Encode the last seen check position into an opaque cursor.
+    The sorting rule and filters hash tie the cursor to the query which produced it.
+
+    :param check_datetime: datetime: Check creation datetime.
+    :param check_id: int: Check id, breaks ties between checks with the same datetime.
+    :param sorting_rule: str: Sorting rule of the page, asc or desc.
+    :param filters_hash: str: Filters hash from hash_cursor_filters.
+    :return: str: Url safe cursor.
+    """
+    raw = CURSOR_SEPARATOR.join((check_datetime.isoformat(), str(check_id), sorting_rule, filters_hash))
+    return urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_check_cursor(cursor: str) -> Tuple[datetime, int, str, str]:
+    """
+    Decode cursor created by encode_check_cursor.
+
+    :param cursor: str: Cursor value.
+    :return: Tuple[datetime, int, str, str]: Check datetime, check id, sorting rule and filters hash.
+    :raises ValueError: If the cursor is malformed.
+    """
+    try:
+        raw = urlsafe_b64decode((cursor + "=" * (-len(cursor) % 4)).encode()).decode()
+        check_datetime, check_id, sorting_rule, filters_hash = raw.split(CURSOR_SEPARATOR)
+        return datetime.fromisoformat(check_datetime), int(check_id), sorting_rule, filters_hash
+    except ValueError as e:
+        raise ValueError("Invalid cursor") from e
@@ -0,0 +1,35 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def orjson_default(value: Any) -> Any:
+    """
+    Encode values orjson does not support natively, UUID and datetime are native.
+    Decimal is rendered as a string, like pydantic does, so money keeps its exact places.
+    """
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", by_alias=True)
+    return jsonable_encoder(value)
+
+
+class ORJSONModelResponse(ORJSONResponse):
+    """
+    Default response class of the app.
+
+    Pydantic model content is rendered by the model's own serializer, without the validation and
+    jsonable_encoder pass FastAPI runs for response_model. Return it from an endpoint only with a
+    trusted model of the declared response_model type built by the service, for example
+    ORJSONModelResponse(answer_check, status_code=201). Other content is rendered with orjson.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content, by_alias=True)
+        return orjson.dumps(content, default=orjson_default, option=orjson.OPT_NON_STR_KEYS)
@@ -1,10 +1,58 @@
-from pprint import pprint
+from typing import Literal
 from uuid import UUID
 
 from pydantic_core import Url
+from starlette.requests import Request
+from starlette.routing import NoMatchFound
+from starlette.types import ASGIApp
 
 from src.settings.checkbox_settings import settings
-from starlette.requests import Request
+
+CHECK_ID_PLACEHOLDER = "{check_id}"
+
+_print_check_path: str | None = None
+
+
+def resolve_print_check_path(app: ASGIApp) -> str:
+    """
+    Resolve the print check endpoint path by route name.
+    Called once at startup (and on the first link if startup did not run), so links do not scan the route table.
+
+    :param app: FastAPI application.
+    :return: str: Print check endpoint path, without root path.
+    """
+    global _print_check_path
+    try:
+        _print_check_path = app.url_path_for(settings.print_check_endpoint_name)
+    except NoMatchFound as e:
+        raise ValueError("Check endpoint path not found") from e
+    return _print_check_path
+
+
+def get_check_link_template(request: Request, link_format: Literal["absolute", "relative"] = "absolute") -> str:
+    """
+    Get check link template, CHECK_ID_PLACEHOLDER is replaced with the check identifier.
+
+    :param request: Request: Request object.
+    :param link_format: absolute link with scheme and host or relative link starting with root path.
+    :return: str: Check link template.
+    """
+    check_endpoint_path = _print_check_path or resolve_print_check_path(request.scope["app"])
+    host = f"{request.url.scheme}://{request.url.netloc}" if link_format == "absolute" else ""
+    str_length_q = f"{settings.str_length}={settings.check_default_line_width}"
+    check_identifier_q = f"{settings.check_identifier}={CHECK_ID_PLACEHOLDER}"
+    return f"{host}{request.scope.get('root_path')}{check_endpoint_path}?{check_identifier_q}&{str_length_q}"
+
+
+def build_check_link(link_template: str, check_identifier: UUID) -> str:
+    """
+    Build check link from the template of get_check_link_template.
+
+    :param link_template: str: Check link template.
+    :param check_identifier: UUID: Check identifier.
+    :return: str: Check link.
+    """
+    return link_template.replace(CHECK_ID_PLACEHOLDER, str(check_identifier))
 
 
 async def get_check_link(check_identifier: UUID, request: Request) -> Url:
@@ -13,20 +61,6 @@ async def get_check_link(check_identifier: UUID, request: Request) -> Url:
 
     :param check_identifier: UUID: Check identifier.
     :param request: Request: Request object.
-    :return: str: Check link.
+    :return: Url: Check link.
     """
-    root_path = request.scope.get("root_path")
-    check_endpoint_path = None
-    for route in request.scope.get("router").__dict__.get("routes"):
-        if route.name == settings.print_check_endpoint_name:
-            check_endpoint_path = route.path
-            break
-        else:
-            continue
-    if not check_endpoint_path:
-        raise ValueError("Check endpoint path not found")
-    host = request.url.scheme + "://" + request.url.netloc
-    str_length_q = f"{settings.str_length}={settings.check_default_line_width}"
-    check_identifier_q = f"{settings.check_identifier}={check_identifier}"
-    url_str = f"{host}{root_path}{check_endpoint_path}?{check_identifier_q}&{str_length_q}"
-    return Url(url_str)
+    return Url(build_check_link(get_check_link_template(request), check_identifier))
@@ -2,13 +2,22 @@ import sys
 
 from loguru import logger
 
+from src.settings.checkbox_settings import settings
 
-def set_logger(level: str = "INFO", serialize: bool = False):
+LOG_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | {extra[request_id]} | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+)
+
+
+def configure_logging(level: str = settings.log_level, serialize: bool = settings.json_logs) -> None:
     """
-    Set logger for the module
-    :param level: logger level (default INFO)
-    :param serialize: serialize logs to json (default True)
-    :return: Logger instance
+    Configure the application logger, call it once per process at startup.
+    Records are put into a queue and written by a background thread (enqueue=True),
+    so logging does not block the event loop on stdout.
+    :param level: logger level
+    :param serialize: serialize logs to json
+    :return: None
     """
     logger.configure(
         handlers=[
@@ -16,8 +25,20 @@ def set_logger(level: str = "INFO", serialize: bool = False):
                 "sink": sys.stdout,
                 "serialize": serialize,
                 "level": level,
+                "format": LOG_FORMAT,
+                "enqueue": True,
+                # Variable values in tracebacks may hold passwords and tokens
+                "diagnose": settings.debug_mode,
             }
-        ]
+        ],
+        # Set per request by CorrelationIdMiddleware
+        extra={"request_id": "-"},
     )
 
+
+def set_logger():
+    """
+    Get the application logger, it is configured once at startup by configure_logging
+    :return: Logger instance
+    """
     return logger
@@ -0,0 +1,92 @@
+import os
+from typing import Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+)
+
+# Set by `run.py serve` before the application is imported, values of every worker are kept in files of this
+# directory and summed up on scrape. prometheus_client picks the value storage when it is imported.
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+# Latency buckets of API requests, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+
+http_request_duration_seconds = Histogram(
+    "checkbox_http_request_duration_seconds",
+    "Time from receiving the request to sending the last response body chunk",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+http_requests_in_progress = Gauge(
+    "checkbox_http_requests_in_progress",
+    "Requests being served",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+db_pool_capacity = Gauge(
+    "checkbox_db_pool_capacity_connections",
+    "Connections the db pool may open, pool size plus max overflow",
+    multiprocess_mode="livesum",
+)
+db_pool_checked_out = Gauge(
+    "checkbox_db_pool_checked_out_connections",
+    "Connections checked out from the db pool",
+    multiprocess_mode="livesum",
+)
+db_pool_checkout_wait_seconds = Histogram(
+    "checkbox_db_pool_checkout_wait_seconds",
+    "Time waiting for a free db connection or opening a new one",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+db_pool_checkout_timeouts_total = Counter(
+    "checkbox_db_pool_checkout_timeouts_total",
+    "Checkouts which failed waiting for a free db connection",
+)
+cache_requests_total = Counter(
+    "checkbox_cache_requests_total",
+    "Cache lookups by result, hit ratio is hit / (hit + miss)",
+    ["cache", "result"],
+)
+stock_reservation_conflicts_total = Counter(
+    "checkbox_stock_reservation_conflicts_total",
+    "Checks rejected because some products have not enough units in stock",
+    ["operation"],
+)
+
+
+def is_multiprocess_mode() -> bool:
+    return bool(os.environ.get(MULTIPROC_DIR_ENV))
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Render all metrics in the Prometheus text format.
+    In multiprocess mode values of all workers, alive and dead, are collected from the multiprocess directory.
+
+    :return: Tuple of the rendered metrics and their content type.
+    """
+    if is_multiprocess_mode():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead(pid: int) -> None:
+    """
+    Drop live gauges of an exited worker, counters and histograms of it are kept.
+
+    :param pid: Worker process id.
+    :return: None
+    """
+    if is_multiprocess_mode():
+        multiprocess.mark_process_dead(pid)
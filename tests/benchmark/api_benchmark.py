@@ -0,0 +1,369 @@
+"""
+API load and latency benchmark.
+
+Seeds products through the factories of tests/facker/backup.py and users through the auth API, then drives
+check creation, checks info and check printing at a fixed concurrency through httpx AsyncClient and reports
+latency percentiles, RPS and db statements per request as JSON.
+
+Run against the local Postgres and Redis from .env, migrated with `python run.py migrate`:
+
+    python -m tests.benchmark.api_benchmark --products 50 --users 10 --requests 500 --concurrency 20 -o bench.json
+"""
+
+import argparse
+import asyncio
+import math
+import subprocess
+import time
+from datetime import datetime
+from decimal import Decimal
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List, Optional
+from uuid import uuid4
+
+import orjson
+from httpx import AsyncClient, Response
+from sqlalchemy import delete, event, select
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+from starlette.types import ASGIApp
+
+from src.models.check_model import Check, Product, SoldProduct, UserEssence
+from src.models.user_model import User
+from src.repositories.prodact_price_repository import ProductPriceRepository
+from src.repositories.product_repository import ProductRepository
+from src.repositories.stock_repository import StockRepository
+from tests.facker.backup import ProductFactory, ProductPriceFactory, StockFactory
+
+SCENARIOS = ("create", "checkinfo", "printcheck")
+PERCENTILES = (50, 95, 99)
+BENCHMARK_PASSWORD = "Password1"
+BENCHMARK_STOCK = 1_000_000
+
+
+class StatementCounter:
+    """Counts SQL statements executed through the engine while attached."""
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args) -> None:
+        self.count += 1
+
+    def __enter__(self) -> "StatementCounter":
+        self.count = 0
+        event.listen(self.engine.sync_engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        event.remove(self.engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    rank = max(math.ceil(percent / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(
+    latencies: List[float], errors: int, statuses: Counter, elapsed: float, statements: int, concurrency: int
+) -> dict:
+    """
+    Build the report of one scenario.
+
+    :param latencies: Request latencies in seconds.
+    :param errors: Number of requests answered with an unexpected status.
+    :param statuses: Number of responses by status code.
+    :param elapsed: Wall time of the scenario in seconds.
+    :param statements: Number of SQL statements executed during the scenario.
+    :param concurrency: Number of concurrent clients.
+    :return: dict: Scenario report, latencies in milliseconds.
+    """
+    sorted_latencies = sorted(latencies)
+    requests_count = len(sorted_latencies)
+    return {
+        "requests": requests_count,
+        "errors": errors,
+        "statuses": {str(status_code): count for status_code, count in sorted(statuses.items())},
+        "concurrency": concurrency,
+        "rps": round(requests_count / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            **{f"p{percent}": round(percentile(sorted_latencies, percent) * 1000, 3) for percent in PERCENTILES},
+            "mean": round(sum(sorted_latencies) / requests_count * 1000, 3),
+            "max": round(sorted_latencies[-1] * 1000, 3),
+        },
+        "statements_per_request": round(statements / requests_count, 2),
+    }
+
+
+async def seed_products(session_factory: async_sessionmaker, count: int, run_id: str) -> List[dict]:
+    """
+    Insert products with price and stock built by the factories, stock is large enough for the whole run.
+
+    :return: List of dicts with product name and price.
+    """
+    products: List[dict] = []
+    async with session_factory() as session:
+        for index in range(count):
+            product = ProductFactory.build(product_title=f"bench-{run_id}-{index}", product_min_quantity_sell=1)
+            product_in_db = await ProductRepository(session=session).create(
+                {
+                    "product_identifier": product.product_identifier,
+                    "product_title": product.product_title,
+                    "product_description": product.product_description,
+                    "product_units": product.product_units,
+                    "product_min_quantity_sell": product.product_min_quantity_sell,
+                }
+            )
+            price = ProductPriceFactory.build(product_id=product_in_db.id)
+            await ProductPriceRepository(session=session).create(
+                {
+                    "product_id": price.product_id,
+                    "price": price.price,
+                    "discount": price.discount,
+                    "discount_update": price.discount_update,
+                    "price_update": price.price_update,
+                }
+            )
+            stock = StockFactory.build(product_id=product_in_db.id, quantity_in_stock=BENCHMARK_STOCK)
+            await StockRepository(session=session).create(
+                {
+                    "product_id": stock.product_id,
+                    "quantity_in_stock": stock.quantity_in_stock,
+                    "stock_last_update": stock.stock_last_update,
+                    "stock_product_identifier": stock.stock_product_identifier,
+                }
+            )
+            products.append({"name": product.product_title, "price": str(price.price)})
+        await session.commit()
+    return products
+
+
+async def seed_users(client: AsyncClient, count: int, run_id: str) -> List[dict]:
+    """
+    Register users through the auth API and log them in.
+
+    :return: List of authorization headers.
+    """
+    headers: List[dict] = []
+    for index in range(count):
+        email = f"bench-{run_id}-{index}@example.com"
+        user = {
+            "first_name": "Bench",
+            "last_name": f"User{index}",
+            "email": email,
+            "phone_number": "+380501234567",
+            "password": BENCHMARK_PASSWORD,
+        }
+        (await client.post("/auth/create/user", json=user)).raise_for_status()
+        response = await client.post("/auth/token", data={"username": email, "password": BENCHMARK_PASSWORD})
+        response.raise_for_status()
+        headers.append({"Authorization": f"Bearer {response.json()['access_token']}"})
+    return headers
+
+
+async def delete_seeded_rows(session_factory: async_sessionmaker, run_id: str) -> None:
+    """
+    Delete products, users and checks seeded by the run, rows of other runs and of the application are kept.
+    Stock, prices, user essences and daily sales are removed by the ON DELETE CASCADE of their foreign keys.
+
+    :param session_factory: Session factory the run was seeded with.
+    :param run_id: Id of the run, from the benchmark report.
+    :return: None
+    """
+    prefix = f"bench-{run_id}-%"
+    essence_ids = select(UserEssence.id).join(User, User.id == UserEssence.user_id).where(User.email.like(prefix))
+    check_ids = select(Check.id).where(Check.check_user_essence.in_(essence_ids))
+    async with session_factory() as session:
+        await session.execute(delete(SoldProduct).where(SoldProduct.sold_check_id.in_(check_ids)))
+        await session.execute(delete(Check).where(Check.check_user_essence.in_(essence_ids)))
+        await session.execute(delete(User).where(User.email.like(prefix)))
+        await session.execute(delete(Product).where(Product.product_title.like(prefix)))
+        await session.commit()
+
+
+def build_check(products: List[dict], request_number: int) -> dict:
+    """Check of up to three products, picked deterministically so runs are comparable."""
+    check_products = [
+        {"name": product["name"], "price": product["price"], "quantity": 1}
+        for product in (products[(request_number + shift) % len(products)] for shift in range(3))
+    ]
+    total = sum(Decimal(product["price"]) for product in check_products)
+    return {"products": check_products, "payment": {"type": "cashless", "amount": str(total)}}
+
+
+async def run_scenario(
+    send: Callable[[int], Awaitable[Response]],
+    requests_count: int,
+    concurrency: int,
+    engine: AsyncEngine,
+    expected_statuses: tuple = (200,),
+) -> dict:
+    """
+    Send requests_count requests from `concurrency` concurrent clients.
+
+    :param send: Sends the request of the given number.
+    :param requests_count: Number of requests.
+    :param concurrency: Number of concurrent clients.
+    :param engine: Engine the statements are counted on.
+    :param expected_statuses: Response statuses which are not errors.
+    :return: dict: Scenario report.
+    """
+    latencies: List[float] = []
+    errors = 0
+    statuses: Counter = Counter()
+    next_request = iter(range(requests_count))
+
+    async def client_loop() -> None:
+        nonlocal errors
+        for request_number in next_request:
+            start = time.perf_counter()
+            response = await send(request_number)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+            if response.status_code not in expected_statuses:
+                errors += 1
+
+    with StatementCounter(engine) as counter:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return summarize(latencies, errors, statuses, elapsed, counter.count, concurrency)
+
+
+def get_revision() -> Optional[str]:
+    """Git revision of the benchmarked tree, None outside of a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_benchmark(
+    app: ASGIApp,
+    engine: AsyncEngine,
+    session_factory: async_sessionmaker,
+    products_count: int = 20,
+    users_count: int = 5,
+    requests_count: int = 200,
+    concurrency: int = 10,
+    scenarios: tuple = SCENARIOS,
+    base_url: str = "http://benchmark/api/v1/",
+    run_id: Optional[str] = None,
+) -> dict:
+    """
+    Seed data and run the scenarios in order.
+
+    :param app: Application under test.
+    :param engine: Engine the application uses, statements are counted on it.
+    :param session_factory: Session factory of the engine, used for seeding.
+    :param products_count: Number of seeded products.
+    :param users_count: Number of seeded users, requests are spread over them round robin.
+    :param requests_count: Number of requests of each scenario.
+    :param concurrency: Number of concurrent clients.
+    :param scenarios: Scenarios to run, from SCENARIOS.
+    :param base_url: Base url of the requests.
+    :param run_id: Prefix id of the seeded rows, generated when not given.
+    :return: dict: Benchmark report.
+    """
+    run_id = run_id or uuid4().hex[:8]
+    products = await seed_products(session_factory, products_count, run_id)
+    async with AsyncClient(app=app, base_url=base_url, timeout=60) as client:
+        users = await seed_users(client, users_count, run_id)
+        # One check per user, so checkinfo and printcheck have data without the create scenario
+        check_ids: List[str] = []
+        for index, headers in enumerate(users):
+            response = await client.post("/check/create", json=build_check(products, index), headers=headers)
+            response.raise_for_status()
+            check_ids.append(response.json()["check_id"])
+
+        async def send_create(request_number: int) -> Response:
+            response = await client.post(
+                "/check/create",
+                json=build_check(products, request_number),
+                headers=users[request_number % len(users)],
+            )
+            if response.status_code == 201:
+                check_ids.append(response.json()["check_id"])
+            return response
+
+        async def send_checkinfo(request_number: int) -> Response:
+            return await client.get("/check/checkinfo", params={"size": 10}, headers=users[request_number % len(users)])
+
+        async def send_printcheck(request_number: int) -> Response:
+            return await client.get(
+                "/check/printcheck", params={"check_identifier": check_ids[request_number % len(check_ids)]}
+            )
+
+        senders: Dict[str, tuple] = {
+            "create": (send_create, (201,)),
+            "checkinfo": (send_checkinfo, (200,)),
+            "printcheck": (send_printcheck, (200,)),
+        }
+        report: Dict[str, dict] = {}
+        for scenario in scenarios:
+            send, expected_statuses = senders[scenario]
+            report[scenario] = await run_scenario(send, requests_count, concurrency, engine, expected_statuses)
+    return {
+        "started_at": datetime.utcnow().isoformat(),
+        "revision": get_revision(),
+        "run_id": run_id,
+        "config": {
+            "products": products_count,
+            "users": users_count,
+            "requests": requests_count,
+            "concurrency": concurrency,
+        },
+        "scenarios": report,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the checks API, the report is printed as JSON")
+    parser.add_argument("--products", type=int, default=20, help="Number of seeded products")
+    parser.add_argument("--users", type=int, default=5, help="Number of seeded users")
+    parser.add_argument("--requests", type=int, default=200, help="Number of requests of each scenario")
+    parser.add_argument("--concurrency", type=int, default=10, help="Number of concurrent clients")
+    parser.add_argument(
+        "--scenarios", default=",".join(SCENARIOS), help=f"Comma separated scenarios, from {', '.join(SCENARIOS)}"
+    )
+    parser.add_argument("-o", "--output", help="Write the report to this file instead of stdout")
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = parse_args()
+    scenarios = tuple(scenario for scenario in args.scenarios.split(",") if scenario)
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    from src.database.database_connect import engine, async_session_factory
+    from src.main import app
+
+    # tests.facker.backup imports the test configuration, the benchmark runs the app on its own engine
+    app.dependency_overrides.clear()
+    await app.router.startup()
+    try:
+        report = await run_benchmark(
+            app,
+            engine,
+            async_session_factory,
+            products_count=args.products,
+            users_count=args.users,
+            requests_count=args.requests,
+            concurrency=args.concurrency,
+            scenarios=scenarios,
+        )
+    finally:
+        await app.router.shutdown()
+        await engine.dispose()
+    output = orjson.dumps(report, option=orjson.OPT_INDENT_2)
+    if args.output:
+        with open(args.output, "wb") as file:
+            file.write(output)
+    else:
+        print(output.decode())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+"""
+Error handling middleware benchmark.
+
+Compares /check/checkinfo RPS of the application with the pure ASGI ExceptionHandlerMiddleware against the same
+application wrapped in the BaseHTTPMiddleware based handler it replaced. Reports the best of interleaved rounds
+as JSON, nothing is asserted.
+
+Run against the local Postgres and Redis from .env, migrated with `python run.py migrate`:
+
+    python -m tests.benchmark.middleware_benchmark --requests 200 --rounds 3
+"""
+
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+import orjson
+from fastapi.responses import JSONResponse
+from httpx import ASGITransport, AsyncClient
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp
+
+from tests.benchmark.api_benchmark import seed_users
+
+BASE_URL = "http://benchmark/api/v1/"
+
+
+class LegacyExceptionHandlerMiddleware(BaseHTTPMiddleware):
+    """The BaseHTTPMiddleware based handler replaced by ExceptionHandlerMiddleware."""
+
+    async def dispatch(self, request, call_next):
+        try:
+            return await call_next(request)
+        except Exception:
+            return JSONResponse(
+                status_code=500,
+                content={"error": "Internal Server Error", "message": "An unexpected error occurred."},
+            )
+
+
+async def measure_checkinfo_rps(asgi_app: ASGIApp, headers: dict, requests_count: int) -> float:
+    """Sequential /check/checkinfo requests per second."""
+    async with AsyncClient(transport=ASGITransport(app=asgi_app), base_url=BASE_URL) as client:
+        start = time.perf_counter()
+        for _ in range(requests_count):
+            response = await client.get("/check/checkinfo", headers=headers)
+            response.raise_for_status()
+        return requests_count / (time.perf_counter() - start)
+
+
+async def run_benchmark(app: ASGIApp, requests_count: int, rounds: int) -> dict:
+    """
+    Measure both variants in interleaved rounds, so they see the same db state and warm caches.
+
+    :param app: Application under test.
+    :param requests_count: Number of requests of each round.
+    :param rounds: Number of rounds of each variant.
+    :return: dict: Best RPS of each variant.
+    """
+    async with AsyncClient(transport=ASGITransport(app=app), base_url=BASE_URL) as client:
+        headers = (await seed_users(client, 1, uuid4().hex[:8]))[0]
+    legacy_app = LegacyExceptionHandlerMiddleware(app)
+    rps = {"asgi": 0.0, "base_http": 0.0}
+    for _ in range(rounds):
+        rps["asgi"] = max(rps["asgi"], await measure_checkinfo_rps(app, headers, requests_count))
+        rps["base_http"] = max(rps["base_http"], await measure_checkinfo_rps(legacy_app, headers, requests_count))
+    return {"requests": requests_count, "rounds": rounds, "rps": {name: round(value, 1) for name, value in rps.items()}}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare error handling middlewares, the report is printed as JSON")
+    parser.add_argument("--requests", type=int, default=200, help="Number of requests of each round")
+    parser.add_argument("--rounds", type=int, default=3, help="Number of rounds of each variant")
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = parse_args()
+    from src.database.database_connect import engine
+    from src.main import app
+
+    # tests.facker.backup imports the test configuration, the benchmark runs the app on its own engine
+    app.dependency_overrides.clear()
+    await app.router.startup()
+    try:
+        report = await run_benchmark(app, args.requests, args.rounds)
+    finally:
+        await app.router.shutdown()
+        await engine.dispose()
+    print(orjson.dumps(report, option=orjson.OPT_INDENT_2).decode())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,61 @@
+"""
+Money conversion micro-benchmark.
+
+Compares per call time of to_money and to_money_many with the number_to_decimal implementation they replaced,
+on the values of one listing page. Reports nanoseconds per value as JSON, nothing is asserted:
+
+    python -m tests.benchmark.money_benchmark --number 10 --repeat 5
+"""
+
+import argparse
+import timeit
+from decimal import Decimal, Context, ROUND_HALF_UP
+
+import orjson
+
+from src.utils.convert.money import to_money, to_money_many
+
+# Values of one listing page: check totals and sold product prices are Decimal from NUMERIC columns
+LISTING_VALUES = [Decimal("100.00"), Decimal("119.9999999999999955591079015"), Decimal("54975.98"), Decimal("0")] * 250
+
+
+def legacy_number_to_decimal(number: float | Decimal | int) -> Decimal:
+    """The number_to_decimal implementation replaced by to_money."""
+    TWOPLACES = Decimal("0.01")
+    DECIMAL_CONTEXT = Context(prec=28, rounding=ROUND_HALF_UP)
+    if not isinstance(number, (float, Decimal, int)):
+        raise ValueError("Input must be a float or Decimal")
+    if isinstance(number, int):
+        number = float(number)
+    return Decimal(str(number), context=DECIMAL_CONTEXT).quantize(TWOPLACES)
+
+
+def run_benchmark(number: int = 10, repeat: int = 3) -> dict:
+    """
+    Time the conversions of LISTING_VALUES, best of `repeat` runs of `number` loops.
+
+    :return: dict: Nanoseconds per converted value of each implementation.
+    """
+    variants = {
+        "legacy_number_to_decimal": lambda: [legacy_number_to_decimal(value) for value in LISTING_VALUES],
+        "to_money": lambda: [to_money(value) for value in LISTING_VALUES],
+        "to_money_many": lambda: to_money_many(LISTING_VALUES),
+    }
+    calls = len(LISTING_VALUES) * number
+    return {
+        name: round(min(timeit.repeat(variant, number=number, repeat=repeat)) / calls * 1e9, 1)
+        for name, variant in variants.items()
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark money conversion, the report is printed as JSON")
+    parser.add_argument("--number", type=int, default=10, help="Loops over the listing values in one run")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs, the best one is reported")
+    args = parser.parse_args()
+    report = {"values": len(LISTING_VALUES), "ns_per_value": run_benchmark(args.number, args.repeat)}
+    print(orjson.dumps(report, option=orjson.OPT_INDENT_2).decode())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,21 @@
 import asyncio
-from typing import AsyncGenerator
+from contextlib import contextmanager
+from typing import AsyncGenerator, Iterator
 
 import asyncpg
 import pytest
 from fastapi import HTTPException
 from fastapi.testclient import TestClient
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
 from httpx import AsyncClient
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.pool import NullPool
 from starlette.middleware.cors import CORSMiddleware
 
-from src.database.database_connect import get_db
+from src.database.database_connect import get_db, get_session_factory
+from src.database.query_stats import QueryStats, instrument_engine, track_queries
 from src.middleware.http_error_handling_middleware import ExceptionHandlerMiddleware
 from src.models.base import Base
 from src.settings.checkbox_settings import settings
@@ -23,6 +27,7 @@ from sqlalchemy import text
 DATABASE_URL_TEST = settings.get_test_db_url()
 
 engine_test = create_async_engine(DATABASE_URL_TEST, poolclass=NullPool)
+instrument_engine(engine_test)
 async_session_maker = async_sessionmaker(engine_test, class_=AsyncSession, expire_on_commit=False)
 Base.metadata.bind = engine_test
 
@@ -42,8 +47,42 @@ async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+@pytest.fixture
+def receipt_cache():
+    # In-memory cache backend, so requests take the same paths as with Redis in production
+    FastAPICache.init(InMemoryBackend(), prefix="test-cache")
+    yield FastAPICache.get_backend()
+    InMemoryBackend._store.clear()
+    FastAPICache.reset()
+
+
+@pytest.fixture
+async def sync_id_sequences():
+    # SQL fixtures insert explicit ids, move serial sequences past them
+    async with engine_test.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            await conn.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                    f"COALESCE((SELECT max(id) FROM {table.name}), 0) + 1, false)"
+                )
+            )
+
+
+@contextmanager
+def assert_max_queries(max_queries: int) -> Iterator[QueryStats]:
+    """
+    Fail when the block executes more than max_queries SQL statements, for example
+    with assert_max_queries(5): await ac.get("/check/checkinfo", headers=user_data)
+    """
+    with track_queries() as query_stats:
+        yield query_stats
+    assert query_stats.count <= max_queries, f"{query_stats.count} SQL statements executed, the budget is {max_queries}"
+
+
 origins = ["*"]
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_session_factory] = lambda: async_session_maker
 
 
 @pytest.fixture(autouse=True, scope="session")
@@ -173,7 +173,7 @@ class ProductFactory(factory.Factory):
 
     product_identifier = factory.Faker("uuid4")
     product_title = factory.Iterator(PRODUCT_TITLES)
-    product_description = factory.Faker("sentence", max_nb_chars=50)
+    product_description = factory.Faker("text", max_nb_chars=50)
     product_units = factory.Faker("random_element", elements=["kilogram", "piece"])
     product_min_quantity_sell = factory.Faker("pyfloat", positive=True, min_value=0.1, max_value=1, right_digits=1)
 
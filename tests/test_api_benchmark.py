@@ -0,0 +1,54 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import text
+
+from src.main import app
+from src.models.base import Base
+from tests.benchmark.api_benchmark import run_benchmark, percentile, delete_seeded_rows, SCENARIOS
+from tests.conftest import engine_test, async_session_maker
+
+
+@pytest.fixture
+async def run_id():
+    run_id = uuid4().hex[:8]
+    yield run_id
+    await delete_seeded_rows(async_session_maker, run_id)
+    # Other tests insert rows with explicit ids from SQL files and expect the serial ids to start from them
+    async with engine_test.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            await conn.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                    f"COALESCE((SELECT max(id) FROM {table.name}), 0) + 1, false)"
+                )
+            )
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([0.5], 95) == 0.5
+
+
+async def test_benchmark_report(run_id):
+    report = await run_benchmark(
+        app,
+        engine_test,
+        async_session_maker,
+        products_count=3,
+        users_count=2,
+        requests_count=6,
+        concurrency=2,
+        run_id=run_id,
+    )
+    assert report["run_id"] == run_id
+    assert set(report["scenarios"]) == set(SCENARIOS)
+    for scenario_report in report["scenarios"].values():
+        assert scenario_report["requests"] == 6
+        assert scenario_report["errors"] == 0
+        assert scenario_report["rps"] > 0
+        latency = scenario_report["latency_ms"]
+        assert latency["p50"] <= latency["p95"] <= latency["p99"] <= latency["max"]
+    assert report["scenarios"]["create"]["statements_per_request"] > 0
@@ -1,13 +1,22 @@
+import asyncio
+import csv
+import io
 from pprint import pprint
 
+import orjson
 import pytest
 from httpx import AsyncClient
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, date
+from decimal import Decimal
 
 from sqlalchemy import text
 from starlette.responses import HTMLResponse
 
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+
+from src.services.checks.receipt_cache import receipt_cache_key, receipt_etag
 from tests.conftest import engine_test
 
 
@@ -58,6 +67,36 @@ async def populate_database_for_get_test():
         await conn.commit()
 
 
+class InMemoryRedis:
+    """Commands of the Redis client used by the idempotency store, on a dict, expiration is ignored."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, name):
+        return self.data.get(name)
+
+    async def set(self, name, value, ex=None, nx=False):
+        if nx and name in self.data:
+            return None
+        self.data[name] = value.encode() if isinstance(value, str) else value
+        return True
+
+    async def eval(self, script, numkeys, name, token):
+        if self.data.get(name) == token.encode():
+            del self.data[name]
+            return 1
+        return 0
+
+
+@pytest.fixture
+def idempotency_redis():
+    redis = InMemoryRedis()
+    FastAPICache.init(RedisBackend(redis), prefix="test-cache")
+    yield redis
+    FastAPICache.reset()
+
+
 def read_sql_file(file_path):
     sql_statements = []
     with open(file_path, "r", encoding="utf-8") as file:
@@ -123,6 +162,99 @@ async def test_successful_check_info_retrieval(
     assert response.status_code == 200
 
 
+async def test_check_info_retrieval_last_page(ac: AsyncClient, user_data):
+    response = await ac.get("/check/checkinfo", params={"page": 8, "size": 2}, headers=user_data)
+    response_json = response.json()
+    assert response.status_code == 200
+    assert 1 <= len(response_json.get("checks")) <= 2
+    assert response_json.get("pagination").get("previous_page") == 7
+    assert response_json.get("pagination").get("next_page") is None
+
+
+async def test_check_info_retrieval_with_page_out_of_bounds(ac: AsyncClient, user_data):
+    response = await ac.get("/check/checkinfo", params={"page": 9, "size": 2}, headers=user_data)
+    assert response.status_code == 409
+
+
+async def test_check_info_retrieval_with_cursor(ac: AsyncClient, user_data):
+    response = await ac.get("/check/checkinfo", params={"page": 1, "size": 2}, headers=user_data)
+    response_json = response.json()
+    total_elements = response_json.get("pagination").get("total_elements")
+    check_ids = [check["id"] for check in response_json.get("checks")]
+    cursor = response_json.get("next_cursor")
+    while cursor:
+        response = await ac.get("/check/checkinfo", params={"size": 2, "cursor": cursor}, headers=user_data)
+        assert response.status_code == 200
+        response_json = response.json()
+        assert response_json.get("pagination") is None
+        check_ids.extend(check["id"] for check in response_json.get("checks"))
+        cursor = response_json.get("next_cursor")
+    assert len(check_ids) == total_elements
+    assert len(set(check_ids)) == total_elements
+
+
+async def test_check_info_retrieval_with_invalid_cursor(ac: AsyncClient, user_data):
+    response = await ac.get("/check/checkinfo", params={"cursor": "invalid"}, headers=user_data)
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "changed_params",
+    [{"sorting_rule": "desc"}, {"purchase_type": "cash"}, {"total_price": 100, "total_price_filtering_rule": "gt"}],
+)
+async def test_check_info_retrieval_with_cursor_of_other_query(ac: AsyncClient, user_data, changed_params):
+    response = await ac.get("/check/checkinfo", params={"size": 2, "sorting_rule": "asc"}, headers=user_data)
+    cursor = response.json().get("next_cursor")
+    assert cursor
+    params = {"size": 2, "sorting_rule": "asc", "cursor": cursor}
+    response = await ac.get("/check/checkinfo", params=params, headers=user_data)
+    assert response.status_code == 200
+    response = await ac.get("/check/checkinfo", params={**params, **changed_params}, headers=user_data)
+    assert response.status_code == 400
+    assert response.json()["error"] == "Invalid cursor"
+
+
+async def test_check_info_retrieval_with_relative_links(ac: AsyncClient, user_data):
+    response = await ac.get("/check/checkinfo", params={"size": 3}, headers=user_data)
+    absolute_checks = response.json()["checks"]
+    assert response.json()["url_template"] is None
+    response = await ac.get("/check/checkinfo", params={"size": 3, "link_format": "relative"}, headers=user_data)
+    assert response.status_code == 200
+    url_template = response.json()["url_template"]
+    assert url_template == "/api/v1/check/printcheck?check_identifier={check_id}&str_length=50"
+    for absolute_check, relative_check in zip(absolute_checks, response.json()["checks"]):
+        assert relative_check["url"] is None
+        assert absolute_check["url"] == "http://0.0.0.0:8001" + url_template.replace("{check_id}", relative_check["id"])
+
+
+async def test_check_export_ndjson(ac: AsyncClient, user_data):
+    response = await ac.get("/check/checkinfo", params={"page": 1, "size": 2}, headers=user_data)
+    total_elements = response.json().get("pagination").get("total_elements")
+    response = await ac.get("/check/export", headers=user_data)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    checks = [orjson.loads(line) for line in response.text.splitlines()]
+    assert len(checks) == total_elements
+    assert len({check["id"] for check in checks}) == total_elements
+    assert all(check["check_products"] for check in checks)
+
+
+async def test_check_export_csv_with_filters(ac: AsyncClient, user_data):
+    params = {"purchase_type": "cash", "total_price": 300, "total_price_filtering_rule": "ge"}
+    response = await ac.get("/check/export", params={**params, "format": "csv"}, headers=user_data)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert rows
+    assert all(float(row["total_price"]) >= 300 for row in rows)
+    assert all(row["purchasing_method"] == "cash" for row in rows)
+
+
+async def test_check_export_with_invalid_format(ac: AsyncClient, user_data):
+    response = await ac.get("/check/export", params={"format": "xml"}, headers=user_data)
+    assert response.status_code == 422
+
+
 async def test_check_info_retrieval_with_invalid_sorting_rule(ac: AsyncClient, check_info_query_params, user_data):
     check_info_query_params["sorting_rule"] = "invalid"
     response = await ac.get("/check/checkinfo", params=check_info_query_params, headers=user_data)
@@ -181,6 +313,54 @@ async def test_print_check_endpoint_with_valid_check_identifier(ac: AsyncClient)
     assert response.status_code == 200
 
 
+async def test_print_check_endpoint_renders_check_data(ac: AsyncClient):
+    params = {"check_identifier": "d57ab94d-0bb8-45fc-80bc-bf469d06b18f", "str_length": 50}
+    response = await ac.get("/check/printcheck", params=params)
+    assert response.status_code == 200
+    assert "John Doe" in response.text
+    assert response.text.count("product1") == 2
+    assert "500.00" in response.text
+
+
+async def test_print_check_endpoint_not_modified(ac: AsyncClient):
+    params = {"check_identifier": "eee2334b-9fa1-4a24-964d-473429a87ae0", "str_length": 50}
+    response = await ac.get("/check/printcheck", params=params)
+    assert response.status_code == 200
+    assert "immutable" in response.headers["cache-control"]
+    etag = response.headers["etag"]
+    response = await ac.get("/check/printcheck", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+
+async def test_print_check_endpoint_not_modified_for_not_existing_check(ac: AsyncClient):
+    check_identifier = "00000000-0000-4000-8000-000000000000"
+    params = {"check_identifier": check_identifier, "str_length": 50}
+    response = await ac.get(
+        "/check/printcheck", params=params, headers={"If-None-Match": receipt_etag(check_identifier, 50)}
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize(
+    "receipt_format, content_type, prefix",
+    [
+        ("text", "text/plain; charset=utf-8", b" "),
+        ("escpos", "application/octet-stream", b"\x1b@"),
+        ("pdf", "application/pdf", b"%PDF-"),
+    ],
+)
+async def test_print_check_endpoint_formats(ac: AsyncClient, receipt_format, content_type, prefix):
+    params = {"check_identifier": "d57ab94d-0bb8-45fc-80bc-bf469d06b18f", "str_length": 50, "format": receipt_format}
+    response = await ac.get("/check/printcheck", params=params)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == content_type
+    assert response.content.startswith(prefix)
+    assert b"product1" in response.content
+    html_response = await ac.get("/check/printcheck", params={**params, "format": "html"})
+    assert html_response.headers["etag"] != response.headers["etag"]
+
+
 async def test_print_check_endpoint_with_invalid_check_identifier(ac: AsyncClient):
     check_identifier = "eee2334b-9fa1-4a24-964d-473429a87ae5"
     str_length = 50
@@ -201,3 +381,227 @@ async def test_print_check_endpoint_with_str_length_out_of_bounds(ac: AsyncClien
     }
     response = await ac.get("/check/printcheck", params=params)
     assert response.status_code == 422
+
+
+# Test for check creation side effects
+async def test_check_creation_writes_totals_and_stock(ac: AsyncClient, user_data):
+    check_data = {
+        "products": [
+            {"name": "product1", "price": 100, "quantity": 2},
+            {"name": "product1", "price": 100, "quantity": 1.5},
+        ],
+        "payment": {"type": "cashless", "amount": 400},
+    }
+    async with engine_test.begin() as conn:
+        stock_before = (await conn.execute(text("SELECT quantity_in_stock FROM stock WHERE id = 1"))).scalar_one()
+    response = await ac.post("/check/create", json=check_data, headers=user_data)
+    assert response.status_code == 201
+    response_json = response.json()
+    assert response_json["total"] == "350.00"
+    assert response_json["rest"] == "50.00"
+    assert len(response_json["products"]) == 2
+    async with engine_test.begin() as conn:
+        stock_after = (await conn.execute(text("SELECT quantity_in_stock FROM stock WHERE id = 1"))).scalar_one()
+        check_total = (
+            await conn.execute(
+                text("SELECT check_total_price FROM checks WHERE check_identifier = :identifier"),
+                {"identifier": response_json["check_id"]},
+            )
+        ).scalar_one()
+    assert stock_before - stock_after == pytest.approx(3.5)
+    assert check_total == 350
+
+
+async def test_check_creation_with_not_enough_stock(ac: AsyncClient, user_data):
+    check_data = {
+        "products": [{"name": "product2", "price": 54975.98, "quantity": 10}],
+        "payment": {"type": "cash", "amount": 549759.80},
+    }
+    response = await ac.post("/check/create", json=check_data, headers=user_data)
+    assert response.status_code == 409
+    async with engine_test.begin() as conn:
+        stock = (await conn.execute(text("SELECT quantity_in_stock FROM stock WHERE id = 2"))).scalar_one()
+    assert stock == 9
+
+
+async def test_concurrent_check_creation_does_not_oversell(ac: AsyncClient, user_data, sync_id_sequences):
+    check_data = {
+        "products": [{"name": "product2", "price": 54975.98, "quantity": 3}],
+        "payment": {"type": "cash", "amount": 164927.94},
+    }
+    responses = await asyncio.gather(*[ac.post("/check/create", json=check_data, headers=user_data) for _ in range(4)])
+    status_codes = sorted(response.status_code for response in responses)
+    assert status_codes == [201, 201, 201, 409]
+    async with engine_test.begin() as conn:
+        stock = (await conn.execute(text("SELECT quantity_in_stock FROM stock WHERE id = 2"))).scalar_one()
+    assert stock == 0
+
+
+async def test_check_creation_warms_receipt_cache(ac: AsyncClient, user_data, receipt_cache):
+    check_data = {
+        "products": [{"name": "product1", "price": 100, "quantity": 1}],
+        "payment": {"type": "cash", "amount": 100},
+    }
+    response = await ac.post("/check/create", json=check_data, headers=user_data)
+    assert response.status_code == 201
+    check_identifier = response.json()["check_id"]
+    cached_receipt = await receipt_cache.get(receipt_cache_key(check_identifier, 50))
+    assert cached_receipt is not None
+    response = await ac.get("/check/printcheck", params={"check_identifier": check_identifier, "str_length": 50})
+    assert response.status_code == 200
+    assert response.text == cached_receipt.decode()
+    assert await receipt_cache.get(receipt_cache_key(check_identifier, 60)) is None
+    response = await ac.get("/check/printcheck", params={"check_identifier": check_identifier, "str_length": 60})
+    assert response.status_code == 200
+    assert (await receipt_cache.get(receipt_cache_key(check_identifier, 60))).decode() == response.text
+
+
+async def test_bulk_check_creation_with_partial_failure(ac: AsyncClient, user_data, sync_id_sequences):
+    checks_data = [
+        {
+            "products": [{"name": "product4", "price": 55092.70, "quantity": 100}],
+            "payment": {"type": "cash", "amount": 5509270},
+        },
+        {
+            "products": [{"name": "product4", "price": 55092.70, "quantity": 100}],
+            "payment": {"type": "cash", "amount": 5509270},
+        },
+        {
+            "products": [
+                {"name": "product3", "price": 78014.20, "quantity": 1},
+                {"name": "product4", "price": 55092.70, "quantity": 50},
+            ],
+            "payment": {"type": "cashless", "amount": 2832649.20},
+        },
+        {"products": [{"name": "product404", "price": 1, "quantity": 1}], "payment": {"type": "cash", "amount": 1}},
+        {"products": [{"name": "product3", "price": 1, "quantity": 1}], "payment": {"type": "cash", "amount": 1}},
+    ]
+    response = await ac.post("/check/create/bulk", json=checks_data, headers=user_data)
+    assert response.status_code == 200
+    answer = response.json()
+    assert answer["created"] == 2
+    assert answer["failed"] == 3
+    assert [result["status"] for result in answer["results"]] == ["created", "failed", "created", "failed", "failed"]
+    assert answer["results"][1]["error"]["message"] == ["Product product4 has not enough units in stock"]
+    assert answer["results"][3]["error"]["error"] == "Products not found"
+    assert answer["results"][4]["error"]["message"] == ["Product product3 price is incorrect"]
+    created_check = answer["results"][2]["check"]
+    assert [product["name"] for product in created_check["products"]] == ["product3", "product4"]
+    assert created_check["total"] == "2832649.20"
+    async with engine_test.begin() as conn:
+        stock = dict((await conn.execute(text("SELECT id, quantity_in_stock FROM stock WHERE id IN (3, 4)"))).all())
+        sold_count = (
+            await conn.execute(
+                text(
+                    "SELECT count(*) FROM sold_products JOIN checks ON checks.id = sold_products.sold_check_id "
+                    "WHERE checks.check_identifier IN (:first, :second)"
+                ),
+                {"first": answer["results"][0]["check"]["check_id"], "second": created_check["check_id"]},
+            )
+        ).scalar_one()
+    assert stock == {3: 902, 4: 13}
+    assert sold_count == 3
+
+
+async def test_bulk_check_creation_with_empty_list(ac: AsyncClient, user_data):
+    response = await ac.post("/check/create/bulk", json=[], headers=user_data)
+    assert response.status_code == 422
+
+
+async def test_sales_stats_match_checks(ac: AsyncClient, user_data):
+    response = await ac.get("/check/stats", headers=user_data)
+    assert response.status_code == 200
+    before = response.json()
+    check_data = {
+        "products": [{"name": "product1", "price": 100, "quantity": 2}],
+        "payment": {"type": "cashless", "amount": 250},
+    }
+    response = await ac.post("/check/create", json=check_data, headers=user_data)
+    assert response.status_code == 201
+    today = response.json()["created_at"][:10]
+    response = await ac.get("/check/stats", headers=user_data)
+    after = response.json()
+    assert after["checks_count"] == before["checks_count"] + 1
+    assert Decimal(after["total_sum"]) == Decimal(before["total_sum"]) + 200
+    assert Decimal(after["rest_sum"]) == Decimal(before["rest_sum"]) + 50
+    # Seeded checks are inserted with SQL, so only today's checks of the user are in the aggregates
+    async with engine_test.begin() as conn:
+        checks_count, total_sum, rest_sum = (
+            await conn.execute(
+                text(
+                    "SELECT count(*), sum(check_total_price), sum(check_rest) FROM checks "
+                    "JOIN user_essence ON user_essence.id = checks.check_user_essence "
+                    "JOIN users ON users.id = user_essence.user_id "
+                    "WHERE users.email = 'johndoetest@example.com' AND CAST(check_datetime AS DATE) = :today"
+                ),
+                {"today": date.fromisoformat(today)},
+            )
+        ).one()
+    response = await ac.get("/check/stats", params={"start_date": today, "end_date": today}, headers=user_data)
+    assert response.status_code == 200
+    today_stats = response.json()
+    assert today_stats["checks_count"] == checks_count
+    assert Decimal(today_stats["total_sum"]) == total_sum
+    assert Decimal(today_stats["rest_sum"]) == rest_sum
+    response = await ac.get(
+        "/check/stats", params={"start_date": today, "purchase_type": "cashless"}, headers=user_data
+    )
+    assert [(day["day"], day["purchasing_method"]) for day in response.json()["days"]] == [(today, "cashless")]
+
+
+async def test_sales_stats_with_invalid_date_range(ac: AsyncClient, user_data):
+    params = {"start_date": "2024-05-06", "end_date": "2024-05-01"}
+    response = await ac.get("/check/stats", params=params, headers=user_data)
+    assert response.status_code == 400
+    assert response.json()["error"] == "Invalid date range"
+    response = await ac.get("/check/stats", params={"start_date": "2024-02-31"}, headers=user_data)
+    assert response.status_code == 400
+
+
+async def get_product1_stock() -> float:
+    async with engine_test.begin() as conn:
+        return (
+            await conn.execute(
+                text(
+                    "SELECT quantity_in_stock FROM stock JOIN products ON products.id = stock.product_id "
+                    "WHERE products.product_title = 'product1'"
+                )
+            )
+        ).scalar_one()
+
+
+async def test_check_creation_with_idempotency_key(ac: AsyncClient, user_data, idempotency_redis):
+    check_data = {
+        "products": [{"name": "product1", "price": 100, "quantity": 1}],
+        "payment": {"type": "cash", "amount": 100},
+    }
+    headers = {**user_data, "Idempotency-Key": "terminal-1-check-1"}
+    stock = await get_product1_stock()
+    first = await ac.post("/check/create", json=check_data, headers=headers)
+    assert first.status_code == 201
+    assert "Idempotent-Replayed" not in first.headers
+    retry = await ac.post("/check/create", json=check_data, headers=headers)
+    assert retry.status_code == 201
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.content == first.content
+    assert await get_product1_stock() == stock - 1
+
+    check_data["payment"]["amount"] = 200
+    response = await ac.post("/check/create", json=check_data, headers=headers)
+    assert response.status_code == 422
+    assert response.json()["error"] == "Idempotency key reused"
+
+
+async def test_concurrent_check_creation_with_idempotency_key(ac: AsyncClient, user_data, idempotency_redis):
+    check_data = {
+        "products": [{"name": "product1", "price": 100, "quantity": 1}],
+        "payment": {"type": "cash", "amount": 100},
+    }
+    headers = {**user_data, "Idempotency-Key": "terminal-1-check-2"}
+    stock = await get_product1_stock()
+    responses = await asyncio.gather(*(ac.post("/check/create", json=check_data, headers=headers) for _ in range(3)))
+    assert [response.status_code for response in responses] == [201, 201, 201]
+    assert len({response.json()["check_id"] for response in responses}) == 1
+    assert sum("Idempotent-Replayed" in response.headers for response in responses) == 2
+    assert await get_product1_stock() == stock - 1
+    assert not [key for key in idempotency_redis.data if key.endswith(":lock")]
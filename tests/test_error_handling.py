@@ -0,0 +1,25 @@
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from src.middleware.http_error_handling_middleware import ExceptionHandlerMiddleware
+
+
+async def test_http_exception_is_rendered_as_http_exception_model(ac: AsyncClient, user_data):
+    response = await ac.get("/check/checkinfo", params={"cursor": "not-a-cursor"}, headers=user_data)
+    assert response.status_code == 400
+    assert set(response.json()) == {"error", "message"}
+    assert response.json()["error"] == "Invalid cursor"
+
+
+async def test_unhandled_exception_returns_internal_server_error():
+    failing_app = FastAPI()
+    failing_app.add_middleware(ExceptionHandlerMiddleware)
+
+    @failing_app.get("/fail")
+    async def fail():
+        raise RuntimeError("boom")
+
+    async with AsyncClient(transport=ASGITransport(app=failing_app), base_url="http://test") as client:
+        response = await client.get("/fail")
+    assert response.status_code == 500
+    assert response.json()["error"] == "Internal Server Error"
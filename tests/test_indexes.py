@@ -0,0 +1,82 @@
+from datetime import date, datetime
+from typing import Awaitable, Callable, List, Set
+from uuid import UUID
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.repositories.check_repository import CheckRepository
+from src.repositories.essence_repository import UserEssenceRepository
+from src.repositories.product_repository import ProductRepository
+from src.services.checks.schemas.check_get_schema import FilteringParams
+from tests.conftest import engine_test
+
+CHECK_IDENTIFIER = UUID("eee2334b-9fa1-4a24-964d-473429a87ae0")
+LISTING_FILTERS = FilteringParams(
+    start_date=date(2024, 5, 1), total_price=100, total_price_filtering_rule="gt", purchase_type="cash"
+)
+
+# Repository call and the indexes the plans of its statements, including selectin loads, must use
+HOT_CALLS = [
+    (
+        lambda session: CheckRepository(session).get_check_by_identifier(CHECK_IDENTIFIER),
+        {"ix_checks_check_identifier"},
+    ),
+    (
+        lambda session: CheckRepository(session).get_check_receipt_rows(CHECK_IDENTIFIER),
+        {"ix_checks_check_identifier", "ix_sold_products_sold_check_id"},
+    ),
+    (lambda session: CheckRepository(session).check_exists(CHECK_IDENTIFIER), {"ix_checks_check_identifier"}),
+    (
+        lambda session: CheckRepository(session).get_user_checks(1, LISTING_FILTERS, "asc", limit=10, offset=0),
+        {"ix_checks_user_essence_datetime_id"},
+    ),
+    (
+        lambda session: CheckRepository(session).get_user_checks(
+            1, sorting_rule="desc", limit=11, after=(datetime(2024, 5, 5, 20), 50)
+        ),
+        {"ix_checks_user_essence_datetime_id"},
+    ),
+    (lambda session: CheckRepository(session).count_user_checks(1), {"ix_checks_user_essence_datetime_id"}),
+    # Stock and prices are loaded only for found products, product1 and product2 are seeded by tests/insert.sql
+    (
+        lambda session: ProductRepository(session).get_all_by_names(["product1", "product2"]),
+        {"ix_stock_product_id", "ix_product_price_product_id"},
+    ),
+    (lambda session: UserEssenceRepository(session).get_user_essence_with_owner(1), {"ix_user_essence_user_id"}),
+]
+
+
+async def explain_repository_call(call: Callable[[AsyncSession], Awaitable]) -> List[str]:
+    """
+    Run the repository call, then EXPLAIN every statement it executed with the same parameters.
+    Everything runs in one transaction which is rolled back.
+    """
+    statements = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    async with engine_test.connect() as conn:
+        async with conn.begin() as transaction:
+            # Test tables are tiny, so sequential scans are disabled to check that the index is usable at all
+            await conn.execute(text("SET LOCAL enable_seqscan = off"))
+            event.listen(conn.sync_connection, "before_cursor_execute", record_statement)
+            try:
+                await call(AsyncSession(bind=conn))
+            finally:
+                event.remove(conn.sync_connection, "before_cursor_execute", record_statement)
+            plans = [
+                "\n".join((await conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)).scalars().all())
+                for statement, parameters in statements
+            ]
+            await transaction.rollback()
+    return plans
+
+
+@pytest.mark.parametrize("call, index_names", HOT_CALLS)
+async def test_hot_query_uses_index(call, index_names: Set[str]):
+    plans = "\n".join(await explain_repository_call(call))
+    for index_name in index_names:
+        assert index_name in plans, plans
@@ -0,0 +1,27 @@
+from decimal import Decimal
+from uuid import UUID
+
+import orjson
+from pydantic import BaseModel, Field
+
+from src.utils.json.json_response import ORJSONModelResponse
+
+
+class AnswerExample(BaseModel):
+    check_id: UUID = Field(serialization_alias="id")
+    total: Decimal
+
+
+def test_orjson_response_encodes_decimal_and_uuid():
+    check_id = UUID("73e5944e-83e2-4468-a719-4ec8ebaa7eab")
+    response = ORJSONModelResponse({"check_id": check_id, "total": Decimal("200.50")})
+    assert orjson.loads(response.body) == {"check_id": str(check_id), "total": "200.50"}
+
+
+def test_orjson_response_renders_model_by_alias_without_validation():
+    # model_construct skips validation, the response must not validate it again either
+    answer = AnswerExample.model_construct(check_id=UUID(int=1), total=Decimal("10.00"))
+    response = ORJSONModelResponse(answer, status_code=201)
+    assert response.status_code == 201
+    assert response.headers["content-type"] == "application/json"
+    assert orjson.loads(response.body) == {"id": str(UUID(int=1)), "total": "10.00"}
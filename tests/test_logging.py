@@ -0,0 +1,28 @@
+from httpx import AsyncClient
+from loguru import logger
+
+from src.middleware.correlation_id_middleware import REQUEST_ID_HEADER
+
+
+async def test_request_id_is_generated(ac: AsyncClient):
+    response = await ac.get("/metrics/pool")
+    assert len(response.headers[REQUEST_ID_HEADER]) == 32
+
+
+async def test_malformed_request_id_is_replaced(ac: AsyncClient):
+    response = await ac.get("/metrics/pool", headers={REQUEST_ID_HEADER: "bad id\r\nInjected: 1"})
+    assert response.headers[REQUEST_ID_HEADER] != "bad id\r\nInjected: 1"
+
+
+async def test_request_id_is_bound_to_log_records(ac: AsyncClient, user_data):
+    records = []
+    handler_id = logger.add(records.append, format="{extra[request_id]}|{message}", level="ERROR")
+    try:
+        response = await ac.get(
+            "/check/checkinfo", params={"cursor": "invalid"}, headers={**user_data, REQUEST_ID_HEADER: "terminal-42"}
+        )
+    finally:
+        logger.remove(handler_id)
+    assert response.headers[REQUEST_ID_HEADER] == "terminal-42"
+    assert records
+    assert all(record.startswith("terminal-42|") for record in records)
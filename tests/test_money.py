@@ -0,0 +1,30 @@
+from decimal import Decimal
+
+import pytest
+
+from src.utils.convert.money import to_money, to_money_many
+
+
+@pytest.mark.parametrize(
+    "number, expected",
+    [
+        (100, Decimal("100.00")),
+        (Decimal("119.9999999999999955591079015"), Decimal("120.00")),
+        (917.2, Decimal("917.20")),
+        (1.005, Decimal("1.01")),
+        (Decimal("2.675"), Decimal("2.68")),
+        (10**20, Decimal("100000000000000000000.00")),
+    ],
+)
+def test_to_money(number, expected):
+    assert to_money(number) == expected
+    assert str(to_money(number)) == str(expected)
+
+
+def test_to_money_rejects_other_types():
+    with pytest.raises(ValueError):
+        to_money("100")
+
+
+def test_to_money_many():
+    assert to_money_many([Decimal("1.234"), 2, 3.5]) == [Decimal("1.23"), Decimal("2.00"), Decimal("3.50")]
@@ -0,0 +1,30 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from src.services.auth.password_hashing import PasswordHasher
+
+
+@pytest.fixture
+def password_hasher():
+    hasher = PasswordHasher(executor_type="thread", workers=1, queue_size=0)
+    yield hasher
+    hasher.shutdown()
+
+
+async def test_password_hasher_hash_and_verify(password_hasher):
+    hashed_password = await password_hasher.hash("password")
+    assert await password_hasher.verify("password", hashed_password)
+    assert not await password_hasher.verify("wrong password", hashed_password)
+    assert password_hasher.pending == 0
+
+
+async def test_password_hasher_rejects_above_queue_size(password_hasher):
+    running = asyncio.create_task(password_hasher.hash("password"))
+    await asyncio.sleep(0)
+    with pytest.raises(HTTPException) as exc_info:
+        await password_hasher.hash("password")
+    assert exc_info.value.status_code == 503
+    await running
+    assert password_hasher.pending == 0
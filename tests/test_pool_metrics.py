@@ -0,0 +1,47 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.database.pool_metrics import TimedAsyncAdaptedQueuePool, pool_checkout_stats
+from src.services.metrics.pool_metrics import get_pool_metrics
+from src.settings.checkbox_settings import settings
+
+
+@pytest.fixture
+async def timed_engine():
+    pool_checkout_stats.reset()
+    engine = create_async_engine(
+        settings.get_test_db_url(),
+        poolclass=TimedAsyncAdaptedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+    yield engine
+    await engine.dispose()
+    pool_checkout_stats.reset()
+
+
+async def test_pool_metrics_endpoint(ac: AsyncClient):
+    response = await ac.get("/metrics/pool")
+    assert response.status_code == 200
+    assert response.json()["pool_size"] == settings.db_pool_size
+    assert response.json()["max_overflow"] == settings.db_max_overflow
+
+
+async def test_pool_metrics_record_checkouts_and_saturation(timed_engine):
+    async with timed_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        metrics = get_pool_metrics(timed_engine.pool)
+        assert metrics.checked_out == 1
+        assert metrics.saturation == 1.0
+        with pytest.raises(PoolTimeoutError):
+            async with timed_engine.connect():
+                pass
+    metrics = get_pool_metrics(timed_engine.pool)
+    assert metrics.checked_out == 0
+    assert metrics.checkouts == 1
+    assert metrics.checkout_timeouts == 1
+    assert metrics.checkout_wait_seconds_max >= 0.1
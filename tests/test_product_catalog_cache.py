@@ -0,0 +1,68 @@
+from datetime import datetime
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+
+from src.services.checks.product_catalog_cache import ProductCatalogCache
+from src.services.checks.schemas.checks_schemas import CatalogProduct, ReadProductPrice
+
+
+def make_product(product_id: int) -> CatalogProduct:
+    return CatalogProduct(
+        id=product_id,
+        product_identifier=uuid4(),
+        product_title=f"product{product_id}",
+        product_description="description",
+        product_units="piece",
+        product_min_quantity_sell=1.0,
+        product_price=ReadProductPrice(
+            id=product_id,
+            product_id=product_id,
+            price=Decimal("10.00"),
+            discount=Decimal("0.00"),
+            discount_update=datetime.utcnow(),
+            price_update=datetime.utcnow(),
+        ),
+        stock_id=product_id,
+    )
+
+
+@pytest.fixture
+def catalog_cache():
+    return ProductCatalogCache(max_size=2, ttl=60)
+
+
+def test_catalog_cache_returns_cached_and_missing(catalog_cache):
+    catalog_cache.put_many([make_product(1)])
+    found, missing = catalog_cache.get_many(["product1", "product2", "product1"])
+    assert list(found) == ["product1"]
+    assert missing == ["product2"]
+
+
+def test_catalog_cache_evicts_least_recently_used(catalog_cache):
+    catalog_cache.put_many([make_product(1), make_product(2)])
+    catalog_cache.get_many(["product1"])
+    catalog_cache.put_many([make_product(3)])
+    found, missing = catalog_cache.get_many(["product1", "product2", "product3"])
+    assert set(found) == {"product1", "product3"}
+    assert missing == ["product2"]
+    assert len(catalog_cache) == 2
+
+
+def test_catalog_cache_expires_entries():
+    catalog_cache = ProductCatalogCache(max_size=2, ttl=-1)
+    catalog_cache.put_many([make_product(1)])
+    found, missing = catalog_cache.get_many(["product1"])
+    assert found == {}
+    assert missing == ["product1"]
+    assert len(catalog_cache) == 0
+
+
+def test_catalog_cache_is_cleared_on_version_change(catalog_cache):
+    catalog_cache.set_version("1")
+    catalog_cache.put_many([make_product(1)])
+    catalog_cache.set_version("1")
+    assert len(catalog_cache) == 1
+    catalog_cache.set_version("2")
+    assert len(catalog_cache) == 0
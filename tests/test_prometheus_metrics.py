@@ -0,0 +1,124 @@
+import os
+import subprocess
+import sys
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+from sqlalchemy import delete
+
+from src.models.check_model import Product
+from src.repositories.prodact_price_repository import ProductPriceRepository
+from src.repositories.product_repository import ProductRepository
+from src.repositories.stock_repository import StockRepository
+from src.utils.metrics.prometheus_metrics import MULTIPROC_DIR_ENV
+from tests.conftest import async_session_maker
+from tests.facker.backup import ProductFactory, ProductPriceFactory, StockFactory
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.fixture
+async def low_stock_product(sync_id_sequences):
+    """Product with one unit in stock, removed with its price and stock after the test."""
+    product = ProductFactory.build(product_title=f"metrics-{uuid4().hex[:8]}", product_min_quantity_sell=1)
+    async with async_session_maker() as session:
+        product_in_db = await ProductRepository(session=session).create(
+            {
+                "product_identifier": product.product_identifier,
+                "product_title": product.product_title,
+                "product_description": product.product_description,
+                "product_units": product.product_units,
+                "product_min_quantity_sell": product.product_min_quantity_sell,
+            }
+        )
+        price = ProductPriceFactory.build(product_id=product_in_db.id, price=Decimal("10.00"))
+        await ProductPriceRepository(session=session).create(
+            {
+                "product_id": price.product_id,
+                "price": price.price,
+                "discount": price.discount,
+                "discount_update": price.discount_update,
+                "price_update": price.price_update,
+            }
+        )
+        stock = StockFactory.build(product_id=product_in_db.id, quantity_in_stock=1)
+        await StockRepository(session=session).create(
+            {
+                "product_id": stock.product_id,
+                "quantity_in_stock": stock.quantity_in_stock,
+                "stock_last_update": stock.stock_last_update,
+                "stock_product_identifier": stock.stock_product_identifier,
+            }
+        )
+        await session.commit()
+    yield {"name": product.product_title, "price": "10.00"}
+    async with async_session_maker() as session:
+        await session.execute(delete(Product).where(Product.id == product_in_db.id))
+        await session.commit()
+
+
+async def test_metrics_endpoint(ac: AsyncClient, user_data):
+    requests_before = sample(
+        "checkbox_http_request_duration_seconds_count", method="GET", route="get_check_endpoint", status="200"
+    )
+    unmatched_before = sample(
+        "checkbox_http_request_duration_seconds_count", method="GET", route="unmatched", status="404"
+    )
+    response = await ac.get("/check/checkinfo", headers=user_data)
+    assert response.status_code == 200
+    response = await ac.get("/check/not-exist")
+    assert response.status_code == 404
+
+    response = await ac.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'route="get_check_endpoint",status="200"' in response.text
+    assert "checkbox_db_pool_capacity_connections" in response.text
+    assert (
+        sample("checkbox_http_request_duration_seconds_count", method="GET", route="get_check_endpoint", status="200")
+        == requests_before + 1
+    )
+    assert (
+        sample("checkbox_http_request_duration_seconds_count", method="GET", route="unmatched", status="404")
+        == unmatched_before + 1
+    )
+    # The gauge is read after all requests, the metrics request included, have finished
+    assert sample("checkbox_http_requests_in_progress", method="GET") == 0
+
+
+async def test_cache_and_stock_conflict_metrics(ac: AsyncClient, user_data, low_stock_product):
+    conflicts_before = sample("checkbox_stock_reservation_conflicts_total", operation="single")
+    lookups_before = sample("checkbox_cache_requests_total", cache="product_catalog", result="hit") + sample(
+        "checkbox_cache_requests_total", cache="product_catalog", result="miss"
+    )
+    check_data = {
+        "products": [{**low_stock_product, "quantity": 10}],
+        "payment": {"type": "cash", "amount": "100.00"},
+    }
+    response = await ac.post("/check/create", json=check_data, headers=user_data)
+    assert response.status_code == 409
+    assert "not enough units" in response.text
+
+    assert sample("checkbox_stock_reservation_conflicts_total", operation="single") == conflicts_before + 1
+    lookups_after = sample("checkbox_cache_requests_total", cache="product_catalog", result="hit") + sample(
+        "checkbox_cache_requests_total", cache="product_catalog", result="miss"
+    )
+    assert lookups_after == lookups_before + 1
+
+
+def test_metrics_are_summed_over_worker_processes(tmp_path):
+    env = {**os.environ, MULTIPROC_DIR_ENV: str(tmp_path)}
+    worker = (
+        "from src.utils.metrics.prometheus_metrics import stock_reservation_conflicts_total as c;"
+        "c.labels(operation='single').inc()"
+    )
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", worker], env=env, check=True)
+    scrape = "from src.utils.metrics.prometheus_metrics import render_metrics;print(render_metrics()[0].decode())"
+    output = subprocess.run([sys.executable, "-c", scrape], env=env, check=True, capture_output=True, text=True).stdout
+    assert 'checkbox_stock_reservation_conflicts_total{operation="single"} 2.0' in output
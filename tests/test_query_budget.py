@@ -0,0 +1,52 @@
+import pytest
+from httpx import AsyncClient
+
+from src.services.checks.receipt_cache import receipt_cache_key
+from tests.conftest import assert_max_queries
+
+CHECK_DATA = {
+    "products": [{"name": "product1", "price": 100, "quantity": 1}],
+    "payment": {"type": "cash", "amount": 100},
+}
+
+
+async def test_query_stats_headers(ac: AsyncClient, user_data):
+    with assert_max_queries(3) as query_stats:
+        response = await ac.get("/check/checkinfo", headers=user_data)
+    assert response.status_code == 200
+    assert response.headers["X-DB-Queries"] == str(query_stats.count)
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+
+    with pytest.raises(AssertionError, match="the budget is 0"):
+        with assert_max_queries(0):
+            await ac.get("/check/checkinfo", headers=user_data)
+
+
+async def test_check_creation_query_budget(ac: AsyncClient, user_data, receipt_cache):
+    # Products (on catalog cache miss), stock reservation, user essence with the owner name, check, daily sales
+    # and sold products. The cache backend is installed, so the receipt cache is warmed like in production
+    with assert_max_queries(6):
+        response = await ac.post("/check/create", json=CHECK_DATA, headers=user_data)
+    assert response.status_code == 201
+    assert await receipt_cache.get(receipt_cache_key(response.json()["check_id"], 50)) is not None
+    # Statement count does not depend on the number of checks
+    with assert_max_queries(7):
+        response = await ac.post("/check/create/bulk", json=[CHECK_DATA] * 5, headers=user_data)
+    assert response.json()["created"] == 5
+
+
+async def test_check_reading_query_budget(ac: AsyncClient, user_data):
+    # Count, page and sold products of the page checks
+    with assert_max_queries(3):
+        response = await ac.get("/check/checkinfo", params={"size": 20}, headers=user_data)
+    next_cursor = response.json()["next_cursor"]
+    check_identifier = response.json()["checks"][0]["id"]
+    with assert_max_queries(2):
+        response = await ac.get("/check/checkinfo", params={"size": 20, "cursor": next_cursor}, headers=user_data)
+    assert response.status_code == 200
+    with assert_max_queries(1):
+        response = await ac.get("/check/printcheck", params={"check_identifier": check_identifier})
+    assert response.status_code == 200
+    with assert_max_queries(1):
+        response = await ac.get("/check/stats", headers=user_data)
+    assert response.status_code == 200
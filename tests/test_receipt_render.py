@@ -0,0 +1,70 @@
+from decimal import Decimal
+
+import pytest
+
+from src.services.checks.receipt_render import get_receipt_layout, render_receipt
+from src.services.checks.schemas.print_schema import Item, ReceiptData
+
+
+@pytest.fixture
+def receipt_data() -> ReceiptData:
+    return ReceiptData(
+        owner_name="John <b>Doe</b>",
+        total=Decimal("1234.50"),
+        purchasing_method="cash",
+        rest=Decimal("5.00"),
+        date="2024-05-06 10:00:00",
+        items=[
+            Item(
+                quantity=2,
+                unit_price=Decimal("617.25"),
+                description="Milk (1l) & bread",
+                total_price=Decimal("1234.50"),
+            )
+        ],
+    )
+
+
+def test_text_receipt_layout(receipt_data):
+    lines = render_receipt(receipt_data, 50, "text").decode().splitlines()
+    assert lines[0].strip() == "John <b>Doe</b>"
+    assert lines[1] == "=" * 50
+    assert lines[2] == "2.00 x 617.25".ljust(30) + "1,234.50".rjust(20)
+    assert lines[3] == "Milk (1l) & bread"
+    assert "cash".rjust(30) + "1,239.50".rjust(20) in lines
+    assert "Rest".rjust(30) + "5.00".rjust(20) in lines
+    assert all(len(line) == 50 for line in lines if line != "Milk (1l) & bread")
+
+
+def test_narrow_receipt_layout(receipt_data):
+    lines = render_receipt(receipt_data, 10, "text").decode().splitlines()
+    assert lines[2] == "2.00 x 617.25" + "1,234.50".rjust(20)
+    assert get_receipt_layout(10) is get_receipt_layout(10)
+
+
+def test_html_receipt_is_escaped_once(receipt_data):
+    receipt = render_receipt(receipt_data, 50, "html").decode()
+    assert receipt.startswith("<!DOCTYPE html>")
+    assert "John &lt;b&gt;Doe&lt;/b&gt;" in receipt
+    assert "Milk (1l) &amp; bread" in receipt
+    assert "&amp;amp;" not in receipt
+
+
+def test_escpos_receipt(receipt_data):
+    receipt_data.owner_name = "Іван Петренко"
+    receipt = render_receipt(receipt_data, 50, "escpos")
+    assert receipt.startswith(b"\x1b@\x1bt\x2e")
+    assert receipt.endswith(b"\x1dV\x42\x03")
+    assert "Іван Петренко".encode("cp1251") in receipt
+
+
+def test_pdf_receipt(receipt_data):
+    receipt_data.items = receipt_data.items * 300
+    receipt = render_receipt(receipt_data, 50, "pdf")
+    assert receipt.startswith(b"%PDF-1.4\n")
+    assert receipt.endswith(b"%%EOF\n")
+    assert b"(Milk \\(1l\\) & bread) Tj" in receipt
+    # Every line of the receipt is on the page
+    assert receipt.count(b") Tj") == 2 + 3 * 300 + 7
+    xref_offset = int(receipt.rsplit(b"startxref\n", 1)[1].split(b"\n", 1)[0])
+    assert receipt[xref_offset:].startswith(b"xref\n0 6\n")
@@ -0,0 +1,40 @@
+from datetime import datetime
+
+import pytest
+
+from src.services.auth.schemas.user_auth import TokenPayload
+from src.services.auth.token_claims_cache import TokenClaimsCache
+
+
+def make_payload(user_id: int, expires_in: int = 60) -> TokenPayload:
+    return TokenPayload(
+        sub=f"user{user_id}@example.com", user_id=user_id, exp=int(datetime.utcnow().timestamp()) + expires_in
+    )
+
+
+@pytest.fixture
+def claims_cache():
+    return TokenClaimsCache(max_size=2)
+
+
+def test_claims_cache_returns_cached_payload(claims_cache):
+    payload = make_payload(1)
+    claims_cache.put("token1", payload)
+    assert claims_cache.get("token1") == payload
+    assert claims_cache.get("token2") is None
+
+
+def test_claims_cache_drops_expired_token(claims_cache):
+    claims_cache.put("token1", make_payload(1, expires_in=-1))
+    assert claims_cache.get("token1") is None
+    assert len(claims_cache) == 0
+
+
+def test_claims_cache_evicts_least_recently_used(claims_cache):
+    claims_cache.put("token1", make_payload(1))
+    claims_cache.put("token2", make_payload(2))
+    claims_cache.get("token1")
+    claims_cache.put("token3", make_payload(3))
+    assert claims_cache.get("token2") is None
+    assert claims_cache.get("token1") is not None
+    assert len(claims_cache) == 2